@@ -0,0 +1,251 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SNIFF_BYTES = 64
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# ffmpeg demuxer and file extension per sniffed container
+AUDIO_FORMATS = {
+    "wav": ("wav", ".wav"),
+    "webm": ("matroska", ".webm"),
+    "ogg": ("ogg", ".ogg"),
+    "mp3": ("mp3", ".mp3"),
+    "flac": ("flac", ".flac"),
+    "mp4": ("mp4", ".m4a"),
+}
+# The MP4 index (moov atom) is often written last, so ffmpeg needs to seek in the input
+SEEKABLE_ONLY_FORMATS = {"mp4"}
+
+
+class UnsupportedAudioFormat(ValueError):
+    """Raised when the uploaded bytes do not look like any supported audio container."""
+
+
+def get_ffmpeg_binary() -> str:
+    return os.environ.get("FFMPEG_BINARY") or shutil.which("ffmpeg") or "ffmpeg"
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """Identify the container from its magic bytes instead of trusting the filename."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"  # EBML header: WebM and Matroska share the demuxer
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    return None
+
+
+def _ffmpeg_command(source: str, sample_rate: int, input_format: Optional[str] = None) -> list:
+    # -nostdin only when reading a path; with a pipe, stdin carries the audio
+    cmd = [get_ffmpeg_binary()] + (["-nostdin"] if source != "pipe:0" else [])
+    cmd += ["-loglevel", "error", "-threads", "0"]
+    if input_format:
+        cmd += ["-f", input_format]
+    return cmd + [
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+
+
+def _to_float32(pcm: bytes) -> np.ndarray:
+    audio = np.frombuffer(pcm, np.int16).astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+
+def _run_ffmpeg(source: str, sample_rate: int, data: bytes = None, input_format: Optional[str] = None) -> np.ndarray:
+    proc = subprocess.run(_ffmpeg_command(source, sample_rate, input_format), input=data, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {proc.stderr.decode(errors='ignore')[-500:]}")
+    return _to_float32(proc.stdout)
+
+
+def decode_audio_file(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable file to mono float32 PCM in [-1, 1] at `sample_rate`,
+    the same representation Whisper uses internally.
+    """
+    return _run_ffmpeg(path, sample_rate)
+
+
+def decode_audio_bytes(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode an in-memory encoded stream by piping it through ffmpeg's stdin."""
+    fmt = sniff_audio_format(data[:SNIFF_BYTES])
+    return _run_ffmpeg("pipe:0", sample_rate, data=data, input_format=AUDIO_FORMATS[fmt][0] if fmt else None)
+
+
+def decode_audio_stream(stream: BinaryIO, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode a file-like object (e.g. a request body) without writing it to disk.
+
+    The stream is fed to ffmpeg's stdin in chunks while the PCM output is read
+    back, so the encoded upload is never held in memory as a whole. The container
+    is sniffed from the first bytes; MP4 falls back to a temporary file because
+    ffmpeg has to seek in it.
+    """
+    header = stream.read(SNIFF_BYTES)
+    if not header:
+        raise UnsupportedAudioFormat("Audio file is empty")
+    fmt = sniff_audio_format(header)
+    if fmt is None:
+        raise UnsupportedAudioFormat("Unrecognised audio format (expected WAV, WebM, Ogg, MP3, FLAC or MP4)")
+
+    if fmt in SEEKABLE_ONLY_FORMATS:
+        with tempfile.NamedTemporaryFile(suffix=AUDIO_FORMATS[fmt][1]) as tmp:
+            tmp.write(header)
+            shutil.copyfileobj(stream, tmp, STREAM_CHUNK_BYTES)
+            tmp.flush()
+            return _run_ffmpeg(tmp.name, sample_rate)
+
+    proc = subprocess.Popen(
+        _ffmpeg_command("pipe:0", sample_rate, AUDIO_FORMATS[fmt][0]),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    stderr = []
+
+    def feed():
+        try:
+            proc.stdin.write(header)
+            for chunk in iter(lambda: stream.read(STREAM_CHUNK_BYTES), b""):
+                proc.stdin.write(chunk)
+        except (BrokenPipeError, OSError):
+            pass  # ffmpeg exited early; its stderr explains why
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, name="ffmpeg-feed", daemon=True)
+    drainer = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), name="ffmpeg-stderr", daemon=True)
+    feeder.start()
+    drainer.start()
+    pcm = proc.stdout.read()
+    proc.wait()
+    feeder.join()
+    drainer.join()
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {b''.join(stderr).decode(errors='ignore')[-500:]}")
+    return _to_float32(pcm)
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for one growing encoded stream, e.g. timesliced MediaRecorder chunks.
+
+    One ffmpeg process stays open for the whole stream: every chunk is written to its
+    stdin once and a reader thread collects the PCM it produces, so decoding cost grows
+    with the new audio instead of the whole recording. Sample offsets are absolute;
+    discard() drops PCM the caller no longer needs.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._proc: Optional[subprocess.Popen] = None
+        self._pcm = bytearray()
+        self._first_sample = 0
+        self._stderr = []
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self, header: bytes):
+        fmt = sniff_audio_format(header[:SNIFF_BYTES])
+        self._proc = subprocess.Popen(
+            _ffmpeg_command("pipe:0", self.sample_rate, AUDIO_FORMATS[fmt][0] if fmt else None),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self._threads = [
+            threading.Thread(target=self._read_pcm, name="ffmpeg-stream", daemon=True),
+            threading.Thread(target=lambda: self._stderr.append(self._proc.stderr.read()), name="ffmpeg-stderr",
+                             daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _read_pcm(self):
+        for chunk in iter(lambda: self._proc.stdout.read1(STREAM_CHUNK_BYTES), b""):
+            with self._lock:
+                self._pcm.extend(chunk)
+
+    def feed(self, data: bytes):
+        if self._proc is None:
+            self._start(data)
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass  # ffmpeg exited early; finish() reports its stderr
+
+    @property
+    def decoded_samples(self) -> int:
+        """Absolute number of samples decoded so far."""
+        with self._lock:
+            return self._first_sample + len(self._pcm) // 2
+
+    def samples(self, start: int = 0) -> np.ndarray:
+        """Decoded audio from absolute sample `start` (clamped to what is still kept) to the live edge."""
+        with self._lock:
+            begin = max(0, start - self._first_sample) * 2
+            end = len(self._pcm) - len(self._pcm) % 2
+            return _to_float32(bytes(self._pcm[begin:end]))
+
+    def discard(self, before: int):
+        """Release the PCM before absolute sample `before`."""
+        with self._lock:
+            drop = min(max(0, before - self._first_sample), len(self._pcm) // 2)
+            del self._pcm[:drop * 2]
+            self._first_sample += drop
+
+    def finish(self):
+        """Close the input and wait until ffmpeg has flushed the last samples."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._proc.wait()
+        for thread in self._threads:
+            thread.join()
+        if self._proc.returncode != 0:
+            raise RuntimeError(f"Failed to decode audio: {b''.join(self._stderr).decode(errors='ignore')[-500:]}")
+
+    def close(self):
+        """Stop ffmpeg without waiting for pending output (abandoned streams)."""
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+
+
+def check_ffmpeg() -> bool:
+    """Round-trip a short silent WAV through the ffmpeg pipe to prove decoding works end to end."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b"\x00\x00" * (SAMPLE_RATE // 10))
+    try:
+        return len(decode_audio_bytes(buffer.getvalue())) > 0
+    except (OSError, RuntimeError):
+        return False
+
+
+def duration_seconds(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> float:
+    return len(audio) / float(sample_rate)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Compare chunked long-audio transcription against a single Whisper call on the same file.
+
+Usage: python bench_long_audio.py meeting.webm [window_seconds]
+"""
+
+import sys
+
+from audio_decode import decode_audio_file, duration_seconds
+from long_audio import DEFAULT_WINDOW_S, transcribe_long_audio
+from transcription_engine import TranscriptionEngine
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    window_s = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WINDOW_S
+
+    print("1. Decoding audio...")
+    audio = decode_audio_file(sys.argv[1])
+    print(f"   Duration: {duration_seconds(audio):.0f}s")
+
+    print("2. Starting transcription engine...")
+    engine = TranscriptionEngine()
+    engine.start()
+    print(f"   {engine.num_workers} worker(s)")
+
+    print("3. Transcribing (chunked + single call)...")
+    result = transcribe_long_audio(engine, audio, window_s=window_s, benchmark=True)
+    timing = result["timing"]
+    print(f"✅ {result['chunks']} chunk(s), {len(result['segments'])} segment(s), "
+          f"{result['seam_words_removed']} duplicated word(s) removed at seams")
+    print(f"   Chunked:     {timing['chunked_s']}s")
+    print(f"   Single call: {timing['single_s']}s")
+    print(f"   Speed-up:    ×{timing['speedup']}")
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the indexed commit-to-task matcher with the old per-commit substring scan
+on synthetic tasks and commit messages.
+
+Usage: python bench_task_matcher.py [tasks] [commits]   (defaults: 5000 tasks, 2000 commits)
+
+Both approaches must find exactly the same (task, commit) pairs.
+"""
+
+import random
+import sys
+import time
+
+from task_matcher import TaskMatcher
+
+VERBS = ["fix", "add", "update", "refactor", "remove", "document", "test", "migrate", "review", "ship"]
+NOUNS = ["login bug", "slack webhook", "notion sync", "audio upload", "standup summary", "dashboard chart",
+         "rate limiter", "user mapping", "job queue", "whisper model", "sentiment score", "due dates",
+         "commit matcher", "onboarding flow", "billing page", "export csv", "search index", "api docs"]
+
+
+def synthetic_tasks(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.randint(1, count * 2)}")
+    return sorted(names)
+
+
+def synthetic_commits(count, tasks, rng):
+    commits = []
+    for i in range(count):
+        if rng.random() < 0.3:
+            commits.append(f"{rng.choice(tasks).capitalize()} (#{i})")
+        else:
+            commits.append(f"{rng.choice(VERBS)} {rng.choice(NOUNS)} cleanup and tests, closes #{i}")
+    return commits
+
+
+def naive(tasks, commits):
+    # What check_github_commits did per commit: scan every task name
+    pairs = set()
+    for index, message in enumerate(commits):
+        lowered = message.lower()
+        for name in tasks:
+            if name in lowered:
+                pairs.add((name, index))
+    return pairs
+
+
+def indexed(tasks, commits):
+    matcher = TaskMatcher()
+    for name in tasks:
+        matcher.add(name, name)
+    matcher.build()
+    return {(name, index) for name, indices in matcher.match_batch(commits).items() for index in indices}
+
+
+def main():
+    num_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_commits = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(42)
+    tasks = synthetic_tasks(num_tasks, rng)
+    commits = synthetic_commits(num_commits, tasks, rng)
+    print(f"📋 {len(tasks)} tasks, {len(commits)} commits")
+
+    started = time.perf_counter()
+    expected = naive(tasks, commits)
+    naive_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = indexed(tasks, commits)
+    indexed_s = time.perf_counter() - started
+
+    if found != expected:
+        print(f"❌ Results differ: {len(expected - found)} missing, {len(found - expected)} extra")
+        sys.exit(1)
+    print(f"✅ {len(found)} matches, identical results")
+    print(f"   Substring scan: {naive_s * 1000:.0f}ms")
+    print(f"   Aho-Corasick:   {indexed_s * 1000:.0f}ms (including build)")
+    print(f"   Speed-up:       ×{naive_s / indexed_s:.1f}")
+
+
+if __name__ == "__main__":
+    main()
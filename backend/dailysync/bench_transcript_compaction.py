@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Measure transcript compaction on a sample set: tokens saved per transcript and,
+with a Gemini key, whether the extracted action items stay the same.
+
+Usage: python bench_transcript_compaction.py transcript.txt [more.txt | sample_dir ...] [--offline]
+
+Each transcript is summarized twice (verbatim and compacted) with the response cache
+bypassed; action items are matched with the same token-set similarity used to merge
+map-reduce notes. --offline only reports token savings.
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from long_summary import same_task
+from meeting_summary import JSON_GENERATION_CONFIG, build_summary_prompt, parse_summary_response
+from transcript_compactor import compact_transcript
+
+
+def transcript_paths(args):
+    for arg in args:
+        if os.path.isdir(arg):
+            for name in sorted(os.listdir(arg)):
+                if name.endswith(".txt"):
+                    yield os.path.join(arg, name)
+        else:
+            yield arg
+
+
+def action_items(model, transcript):
+    response = model.generate_content(build_summary_prompt(transcript), generation_config=JSON_GENERATION_CONFIG,
+                                      bypass_cache=True)
+    return [item["task"] for item in parse_summary_response(response.text)["action_items"]]
+
+
+def compare(original, compacted):
+    unmatched = list(compacted)
+    missing = []
+    for task in original:
+        match = next((other for other in unmatched if same_task(task, other)), None)
+        if match is None:
+            missing.append(task)
+        else:
+            unmatched.remove(match)
+    return missing, unmatched
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    load_dotenv()
+    offline = "--offline" in sys.argv or not os.getenv("GEMINI_API_KEY")
+    model = None
+    if not offline:
+        from llm_cache import CachedModel
+        from llm_client import get_client
+        from llm_router import get_router
+        name = get_router().tiers["standard"]
+        model = CachedModel(get_client().model(name), name, template="bench_compaction:v1")
+
+    total_before = total_after = 0
+    total_items = total_same = 0
+    for path in transcript_paths(args):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        compacted, stats = compact_transcript(text)
+        total_before += stats["tokens_before"]
+        total_after += stats["tokens_after"]
+        print(f"📄 {os.path.basename(path)}: {stats['tokens_before']} → {stats['tokens_after']} tokens "
+              f"({stats['saved_pct']}% saved, {stats['fillers_removed']} filler(s), "
+              f"{stats['repeated_words_removed']} repeated word(s))")
+        if offline:
+            continue
+
+        original_items = action_items(model, text)
+        compacted_items = action_items(model, compacted)
+        missing, extra = compare(original_items, compacted_items)
+        total_items += len(original_items)
+        total_same += len(original_items) - len(missing)
+        print(f"   Action items: {len(original_items)} verbatim, {len(compacted_items)} compacted, "
+              f"{len(original_items) - len(missing)} matched")
+        for task in missing:
+            print(f"   ❌ only in verbatim:  {task}")
+        for task in extra:
+            print(f"   ➕ only in compacted: {task}")
+
+    if total_before:
+        print(f"\n✅ Total: {total_before} → {total_after} tokens "
+              f"({100.0 * (total_before - total_after) / total_before:.1f}% saved)")
+    if total_items:
+        print(f"   Action items preserved: {total_same}/{total_items} ({100.0 * total_same / total_items:.0f}%)")
+    elif offline:
+        print("   (offline: action items not compared)")
+
+
+if __name__ == "__main__":
+    main()
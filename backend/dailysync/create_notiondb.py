@@ -2,6 +2,8 @@ import requests
 import os
 import json
 from dotenv import load_dotenv
+from notion_bulk_writer import get_bulk_writer
+from task_index import get_dedup_mode, get_task_index, summary_meeting_key
 
 load_dotenv()
 
@@ -69,37 +71,26 @@ def create_meeting_task_database():
         print("❌ Failed to create database:", data)
         return None
 
-def add_task_to_database(database_id, task):
-    url = "https://api.notion.com/v1/pages"
-    headers = {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28"
-    }
+def add_tasks_to_database(database_id, tasks, scope=""):
+    """
+    Create the task pages through the shared bulk writer: a few concurrent requests
+    within Notion's rate limit, Retry-After honored, and tasks already written for
+    the same meeting (scope) and assignee skipped or updated per NOTION_DEDUP_MODE.
+    Returns one result per task.
+    """
+    results = get_bulk_writer().add_tasks(database_id, tasks, scope=scope, index=get_task_index(),
+                                          dedup=get_dedup_mode())
+    for task, result in zip(tasks, results):
+        if result["status"] in ("created", "updated"):
+            print(f"✅ {result['status'].capitalize()} task: {task['task']}")
+        elif result["status"] in ("skipped", "duplicate"):
+            print(f"⏭️ Task already in Notion: {task['task']}")
+        else:
+            print(f"❌ Failed to add task '{task['task']}':", result["error"])
+    return results
 
-    payload = {
-        "parent": { "database_id": database_id },
-        "properties": {
-            "Task": {
-                "title": [{ "type": "text", "text": { "content": task["task"] } }]
-            },
-            "Assignee": {
-                "rich_text": [{ "type": "text", "text": { "content": task["assignee"] } }]
-            },
-            "Status": {
-                "select": { "name": task["status"] }
-            },
-            "Due": {
-                "date": { "start": task["due"] }
-            }
-        }
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-    if response.status_code == 200:
-        print(f"✅ Added task: {task['task']}")
-    else:
-        print(f"❌ Failed to add task '{task['task']}':", response.json())
+def add_task_to_database(database_id, task):
+    return add_tasks_to_database(database_id, [task])[0]
 
 # --- MAIN FLOW ---
 if __name__ == "__main__":
@@ -111,4 +102,4 @@ if __name__ == "__main__":
 
         for task in data["tasks"]:
             task["status"] = "To Do"
-            add_task_to_database(db_id, task)
+        add_tasks_to_database(db_id, data["tasks"], scope=summary_meeting_key(data))
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_apscheduler import APScheduler
 import requests
@@ -6,15 +6,43 @@ import os
 import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-import whisper
 import logging
 import uuid
 import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import tempfile
 import shutil
 import subprocess
+from job_queue import JobQueue
+from transcription_engine import TranscriptionEngine
+from audio_decode import AUDIO_FORMATS, SNIFF_BYTES, check_ffmpeg, decode_audio_file, duration_seconds, sniff_audio_format
+from long_audio import transcribe_long_audio
+from live_transcription import LiveTranscriptionManager
+from job_events import JobEventHub
+from vad import NOISE_MARGIN, SUSPECT_SHARE, apply_vad, NoSpeechDetected
+from transcription_cache import TranscriptionCache, audio_cache_key, audio_hash
+from model_registry import parse_model_list, select_model
+from stage_graph import SkipStage, StageFailed, StageGraph
+from sentiment_analyzer import SentimentAnalyzer
+from task_prioritizer import TaskPrioritizer
+from llm_cache import CachedModel, get_default_cache
+from llm_client import get_client
+from llm_router import get_router
+from long_summary import DEFAULT_CHUNK_TOKENS, DEFAULT_THRESHOLD_TOKENS, estimate_tokens, summarize_map_reduce
+from standup_batch import summarize_standups
+from transcript_compactor import compact_transcript
+from offline_summarizer import summarize_offline
+from notion_mirror import get_notion_mirror, notion_filter, query_database
+from task_matcher import TaskMatcher, task_name
+from notion_bulk_writer import get_bulk_writer
+from task_index import get_dedup_mode, get_task_index, meeting_key, summary_meeting_key
+from status_update_buffer import StatusUpdateBuffer
+from meeting_summary import (JSON_GENERATION_CONFIG, build_summary_prompt, parse_summary_response, partial_summary_text,
+                             render_slack, summary_result)
 
 # Import Google Generative AI with error handling
 try:
@@ -80,8 +108,11 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 gemini_model = None
 if GEMINI_API_KEY and GEMINI_AVAILABLE:
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel("gemini-1.5-flash")
+        # Calls share one rate-limited, retrying client (GEMINI_RPM / GEMINI_TPM / GEMINI_MAX_CONCURRENCY);
+        # responses are cached on disk (llm_cache.db), keyed by model, prompt template and prompt.
+        # This is the standard tier; routed_llm() picks a tier per call (LLM_MODEL_TIERS / LLM_ROUTING_*)
+        default_model = get_router().tiers["standard"]
+        gemini_model = CachedModel(get_client().model(default_model), default_model)
         logger.info("✅ Gemini model initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize Gemini model: {e}")
@@ -91,17 +122,24 @@ elif not GEMINI_AVAILABLE:
 elif not GEMINI_API_KEY:
     logger.warning("⚠️ GEMINI_API_KEY not found - AI features will be disabled")
 
-# Lazy-load Whisper model to reduce startup time and memory
-whisper_model = None
-
-def get_whisper_model():
-    """Load and cache the Whisper model on first use."""
-    global whisper_model
-    if whisper_model is None:
-        logger.info("🎧 Loading Whisper model 'base'...")
-        whisper_model = whisper.load_model("base")
-        logger.info("✅ Whisper model loaded")
-    return whisper_model
+# Pool of warm Whisper worker processes (started with the background services).
+# Worker count defaults to the CPU count, capped by WHISPER_MEMORY_BUDGET_MB with each worker
+# sized for the WHISPER_MODELS tiers it can hold at once within WHISPER_REGISTRY_BUDGET_MB.
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+transcription_engine = TranscriptionEngine(
+    model_name=WHISPER_MODEL,
+    num_workers=int(os.getenv("WHISPER_WORKERS", "0")) or None,
+    memory_budget_mb=int(os.getenv("WHISPER_MEMORY_BUDGET_MB", "0")) or None,
+    models=parse_model_list(os.getenv("WHISPER_MODELS"), WHISPER_MODEL),
+    registry_budget_mb=int(os.getenv("WHISPER_REGISTRY_BUDGET_MB", "1024")),
+    idle_unload_s=float(os.getenv("WHISPER_IDLE_UNLOAD_S", "900")),
+)
+# Without an explicit model, step down a tier for very long audio or a deep queue
+WHISPER_DOWNGRADE_AUDIO_S = float(os.getenv("WHISPER_DOWNGRADE_AUDIO_S", "1800"))
+WHISPER_DOWNGRADE_QUEUE_DEPTH = int(os.getenv("WHISPER_DOWNGRADE_QUEUE_DEPTH", "0")) or 2 * transcription_engine.num_workers
+live_transcription = LiveTranscriptionManager(transcription_engine)
+# Per-job SSE channels: stage changes, the summary as it streams in, then the result
+job_events = JobEventHub()
 
 slack_client = WebClient(token=SLACK_BOT_TOKEN) if SLACK_BOT_TOKEN else None
 
@@ -116,6 +154,45 @@ GITHUB_HEADERS = {
 }
 last_seen_sha = None
 
+# Local SQLite copy of the Notion task database: paginated bootstrap, then last_edited_time syncs
+NOTION_MIRROR_ENABLED = os.getenv("NOTION_MIRROR_ENABLED", "true").lower() == "true"
+notion_mirror = get_notion_mirror() if NOTION_MIRROR_ENABLED else None
+# Re-processed meetings: skip tasks already written (skip), refresh their title and due date (update), or off
+NOTION_DEDUP_MODE = get_dedup_mode()
+# Status changes from commit matching: coalesced per page, written once at the end of each poll
+status_updates = StatusUpdateBuffer(
+    get_bulk_writer(),
+    on_written=lambda page: notion_mirror.record_page(os.getenv("DATABASE_ID"), page) if notion_mirror else None,
+)
+
+# Durable job queue for /transcribe (SQLite + spooled uploads)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(os.path.dirname(__file__), "jobs.db"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", os.path.join(os.path.dirname(__file__), "job_spool"))
+# Recordings at least this long are split at silences and transcribed in parallel
+LONG_AUDIO_THRESHOLD_S = float(os.getenv("LONG_AUDIO_THRESHOLD_S", "600"))
+# Strip silence before Whisper and reject uploads with no speech at all
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+# Speech threshold over the noise floor, and how much of a gap may sit just below it before the gap is kept
+VAD_NOISE_MARGIN = float(os.getenv("VAD_NOISE_MARGIN", str(NOISE_MARGIN)))
+VAD_SUSPECT_SHARE = float(os.getenv("VAD_SUSPECT_SHARE", str(SUSPECT_SHARE)))
+# Re-uploads of the same recording reuse the stored transcript (LRU, size-bounded)
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+transcription_cache = TranscriptionCache(
+    db_path=os.getenv("TRANSCRIPTION_CACHE_PATH", os.path.join(os.path.dirname(__file__), "transcription_cache.db")),
+    max_bytes=int(float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "256")) * 1024 * 1024),
+)
+
+# Fillers and repetition loops are stripped from transcripts before they reach Gemini
+TRANSCRIPT_COMPACTION_ENABLED = os.getenv("TRANSCRIPT_COMPACTION_ENABLED", "true").lower() == "true"
+# Without Gemini (no key, outage, quota), summarize locally instead of returning an error
+OFFLINE_SUMMARY_FALLBACK = os.getenv("OFFLINE_SUMMARY_FALLBACK", "true").lower() == "true"
+# Transcripts above this estimated size are summarized map-reduce style in parallel chunks
+SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS = int(os.getenv("SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS", str(DEFAULT_THRESHOLD_TOKENS)))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", str(DEFAULT_CHUNK_TOKENS)))
+SUMMARY_MAP_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "4"))
+# Prompt budget per batched standup call (several users per Gemini round trip)
+STANDUP_BATCH_TOKENS = int(os.getenv("STANDUP_BATCH_TOKENS", "6000"))
+
 # --- Main API Routes ---
 @app.route("/")
 def home():
@@ -124,12 +201,28 @@ def home():
         "message": "nullpointer.ai Unified Meeting System",
         "endpoints": {
             "/": "Home page with API status",
-            "/health": "Health check",
+            "/health": "Liveness check",
+            "/ready": "Readiness: Whisper warmed up, ffmpeg working, job workers running (503 until ready)",
             "/config": "Configuration & integration status (no secrets)",
-            "/transcribe": "[POST] Upload audio for transcription and summary",
+            "/transcribe": "[POST] Upload audio; returns a job ID for background transcription and summary",
+            "/jobs": "List recent transcription jobs (optional ?status=&limit=)",
+            "/jobs/<id>": "Job stage, timings and result",
+            "/jobs/<id>/events": "Server-Sent Events with stage changes, the streaming summary and the result",
+            "/cache/stats": "Transcription cache hit rate, size and audio saved",
+            "/stream/start": "[POST] Start a live transcription session",
+            "/stream/<id>/chunk": "[POST] Append a timesliced audio chunk (X-Chunk-Seq header)",
+            "/stream/<id>/events": "Server-Sent Events with partial and finalized transcript segments",
+            "/stream/<id>/stop": "[POST] Finalize the transcript and queue summary/Slack/Notion",
             "/check-commits": "Manually check GitHub commits and show history",
             "/commit-history": "Show full commit history for the repository",
-            "/send-standup": "Manually send daily standup",
+            "/send-standup": "Manually send daily standup (?refresh=true bypasses the LLM cache)",
+            "/llm/stats": "Gemini client rate limits, retries, queue wait and latency",
+            "/llm-cache/stats": "LLM response cache hit rate, entries and size",
+            "/llm-cache/invalidate": "[POST] Drop cached LLM responses (optional JSON: template, model)",
+            "/notion/mirror": "Notion task mirror staleness, page count and sync history",
+            "/notion/mirror/sync": "[POST] Sync the Notion task mirror now (?full=true for a full resync)",
+            "/notion/writes": "Notion page writes: created, duplicates skipped, retries, rate-limit waits, task index, "
+                              "coalesced status updates",
             "/init-db": "Manually initialize Notion database",
         },
     })
@@ -138,11 +231,41 @@ def home():
 def health():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
+@app.route("/ready")
+def ready():
+    """Readiness, separate from liveness: 503 until this node can actually serve /transcribe."""
+    engine_stats = transcription_engine.stats()
+    checks = {
+        "model": {
+            "ready": transcription_engine.ready,
+            "model": engine_stats["model"],
+            "ready_workers": engine_stats["ready_workers"],
+            "workers": engine_stats["workers"],
+        },
+        "ffmpeg": {"ready": bool(warmup_state["ffmpeg"])},
+        "job_queue": {"ready": job_queue.running},
+    }
+    # Integrations are optional, so they are reported but do not gate readiness
+    integrations = {
+        "gemini": bool(gemini_model),
+        "slack": bool(slack_client),
+        "notion": bool(NOTION_TOKEN),
+        "github": bool(TOKEN_GITHUB and REPO_OWNER and REPO_NAME),
+    }
+    is_ready = all(check["ready"] for check in checks.values())
+    return jsonify({
+        "ready": is_ready,
+        "checks": checks,
+        "integrations": integrations,
+        "warmup": {k: v for k, v in warmup_state.items() if k != "ffmpeg"},
+    }), 200 if is_ready else 503
+
 @app.route("/config")
 def config():
     """Return safe configuration status without exposing secrets."""
     return jsonify({
         "ffmpeg_found": bool(ffmpeg_path),
+        "transcription_engine": transcription_engine.stats(),
         "gemini_available": GEMINI_AVAILABLE,
         "env": {
             "NOTION_TOKEN": bool(NOTION_TOKEN),
@@ -161,7 +284,7 @@ def config():
 
 @app.route("/transcribe", methods=["POST"])
 def transcribe_audio():
-    audio_path = None
+    """Accept an upload, spool it to disk and queue it for background processing."""
     try:
         if "file" not in request.files:
             return jsonify({"error": "No file uploaded"}), 400
@@ -170,103 +293,175 @@ def transcribe_audio():
         meeting_title = request.form.get("meetingTitle", "Untitled Meeting")
         slack_enabled = request.form.get("slackEnabled", "false").lower() == "true"
         notion_enabled = request.form.get("notionEnabled", "false").lower() == "true"
+        long_audio = request.form.get("longAudio", "auto").lower()  # auto | true | false
+        benchmark = request.form.get("benchmark", "false").lower() == "true"
+        whisper_model = request.form.get("whisperModel", "").lower() or None  # tiny | base | small
+        latency = request.form.get("latency", "").lower() or None  # fast | balanced | accurate
+        if whisper_model and whisper_model not in transcription_engine.models:
+            return jsonify({
+                "error": f"Unknown whisperModel '{whisper_model}'",
+                "available": transcription_engine.models,
+            }), 400
 
-        # Create a temporary file with proper extension
-        temp_dir = tempfile.gettempdir()
-        audio_path = os.path.join(temp_dir, f"temp_audio_{uuid.uuid4()}.wav")
-        
-        # Ensure the file is properly saved
-        audio_file.save(audio_path)
-        
-        # Verify the file exists and has content
-        if not os.path.exists(audio_path):
-            return jsonify({"error": "Failed to save audio file"}), 500
-            
-        file_size = os.path.getsize(audio_path)
-        if file_size == 0:
-            return jsonify({"error": "Audio file is empty"}), 500
+        # Identify the container from its header rather than the filename
+        header = audio_file.stream.read(SNIFF_BYTES)
+        if not header:
+            return jsonify({"error": "Audio file is empty"}), 400
+        audio_format = sniff_audio_format(header)
+        if audio_format is None:
+            return jsonify({"error": "Unrecognised audio format (expected WAV, WebM, Ogg, MP3, FLAC or MP4)"}), 415
 
-        logger.info(f"Audio file saved to: {audio_path} (size: {file_size} bytes)")
-        logger.info("Starting transcription...")
-        
-        # Use absolute path and ensure it's a string for Whisper
-        abs_path = os.path.abspath(audio_path)
-        logger.info(f"Using absolute path for Whisper: {abs_path}")
-        
-        # Verify file still exists before transcription
-        if not os.path.exists(abs_path):
-            return jsonify({"error": "Audio file not found during transcription"}), 500
-        
-        # Try to set ffmpeg path if not already set
-        if not os.environ.get("FFMPEG_BINARY"):
-            ffmpeg_path = find_ffmpeg()
-            if ffmpeg_path:
-                os.environ["FFMPEG_BINARY"] = ffmpeg_path
-                logger.info(f"Set FFMPEG_BINARY to: {ffmpeg_path}")
-        
-        try:
-            # Lazy-load Whisper model on demand
-            model = get_whisper_model()
-            result = model.transcribe(abs_path)
-            transcription = result["text"]
-            logger.info("Transcription completed.")
-        except Exception as whisper_error:
-            logger.error(f"Whisper transcription failed: {whisper_error}")
-            # Return a helpful error message
-            return jsonify({
-                "error": "Audio transcription failed. Please ensure ffmpeg is installed and accessible. Error: " + str(whisper_error)
-            }), 500
+        # Spool the upload next to the job database so queued jobs survive a restart
+        os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+        audio_path = os.path.join(JOB_SPOOL_DIR, f"upload_{uuid.uuid4()}{AUDIO_FORMATS[audio_format][1]}")
+        with open(audio_path, "wb") as spool:
+            spool.write(header)
+            shutil.copyfileobj(audio_file.stream, spool)
+            file_size = spool.tell()
 
-        logger.info("Generating summary...")
-        summary = generate_meeting_summary(transcription)
-        logger.info("Summary generated.")
+        start_background_services()
+        job_id = job_queue.enqueue({
+            "audio_path": audio_path,
+            "meeting_title": meeting_title,
+            "slack_enabled": slack_enabled,
+            "notion_enabled": notion_enabled,
+            "long_audio": long_audio,
+            "benchmark": benchmark,
+            "whisper_model": whisper_model,
+            "latency": latency,
+        })
+        logger.info(f"📥 Queued transcription job {job_id} ({file_size} bytes, {audio_format})")
+        return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
 
-        data = {
-            "id": str(uuid.uuid4()),
-            "title": meeting_title,
-            "timestamp": datetime.now().isoformat(),
-            "transcript": transcription,
-            "summary": summary,
-        }
+    except Exception as e:
+        logger.error(f"Error queueing transcription: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-        # Always send to Slack (not just when enabled)
-        if slack_client and SLACK_CHANNEL_ID:
-            try:
-                send_summary_to_slack(data)
-                logger.info("✅ Meeting summary sent to Slack")
-            except Exception as e:
-                logger.error(f"Error sending to Slack: {str(e)}")
-        else:
-            logger.warning("Slack client or channel ID not configured")
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
 
-        # Always process Notion tasks and update JSON (not just when enabled)
-        if summary.get("structured_data_json"):
-            try:
-                # Update meeting_summary_input.json with new data
-                update_meeting_summary_json(summary["structured_data_json"], meeting_title)
-                
-                # Only add tasks to existing database if it exists, don't create new one
-                add_tasks_to_existing_database(summary["structured_data_json"])
-                
-                logger.info("✅ Meeting summary processed and JSON updated")
-            except Exception as e:
-                logger.error(f"Error processing meeting summary: {str(e)}")
-        else:
-            logger.error("No structured data available for processing")
+@app.route("/jobs/<job_id>/events")
+def job_event_stream(job_id):
+    """Server-Sent Events: `stage`, `summary` (text so far), then `done` or `failed`."""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return Response(
+        stream_with_context(job_events.subscribe(job)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/jobs")
+def list_jobs():
+    status = request.args.get("status")
+    limit = request.args.get("limit", 50, type=int)
+    try:
+        return jsonify({"jobs": job_queue.list(status=status, limit=limit)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify({"enabled": TRANSCRIPTION_CACHE_ENABLED, **transcription_cache.stats()})
+
+@app.route("/llm-cache/stats")
+def llm_cache_stats():
+    return jsonify(get_default_cache().stats())
 
-        return jsonify(data)
+@app.route("/llm/stats")
+def llm_stats():
+    if not gemini_model:
+        return jsonify({"error": "Gemini is not configured"}), 503
+    return jsonify(get_client().stats())
 
+@app.route("/notion/mirror")
+def notion_mirror_status():
+    if not notion_mirror:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **notion_mirror.status(os.getenv("DATABASE_ID"))})
+
+@app.route("/notion/mirror/sync", methods=["POST"])
+def notion_mirror_sync():
+    database_id = os.getenv("DATABASE_ID")
+    if not (notion_mirror and database_id):
+        return jsonify({"error": "Notion mirror disabled or DATABASE_ID not set"}), 400
+    try:
+        result = notion_mirror.sync(database_id, full=request.args.get("full", "false").lower() == "true")
     except Exception as e:
-        logger.error(f"Error in transcription: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-    finally:
-        # Clean up the temporary file
-        if audio_path and os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-                logger.info(f"Cleaned up temporary file: {audio_path}")
-            except Exception as e:
-                logger.warning(f"Could not remove temporary file {audio_path}: {e}")
+        return jsonify({"error": str(e)}), 502
+    return jsonify({"status": "success", **result})
+
+@app.route("/notion/writes")
+def notion_write_stats():
+    return jsonify({**get_bulk_writer().stats(), "dedup_mode": NOTION_DEDUP_MODE, "task_index": get_task_index().stats(),
+                    "status_updates": status_updates.stats()})
+
+@app.route("/llm-cache/invalidate", methods=["POST"])
+def llm_cache_invalidate():
+    payload = request.get_json(silent=True) or {}
+    removed = get_default_cache().invalidate(template=payload.get("template"), model_name=payload.get("model"))
+    return jsonify({"status": "success", "removed": removed})
+
+@app.route("/stream/start", methods=["POST"])
+def start_live_stream():
+    payload = request.get_json(silent=True) or request.form
+    start_background_services()
+    session = live_transcription.create_session(payload.get("meetingTitle", "Live Meeting"))
+    return jsonify({
+        "session_id": session.id,
+        "chunk_url": f"/stream/{session.id}/chunk",
+        "events_url": f"/stream/{session.id}/events",
+        "stop_url": f"/stream/{session.id}/stop",
+    }), 201
+
+@app.route("/stream/<session_id>/chunk", methods=["POST"])
+def add_live_chunk(session_id):
+    session = live_transcription.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    chunk = request.files["chunk"].read() if "chunk" in request.files else request.get_data()
+    if not chunk:
+        return jsonify({"error": "Empty chunk"}), 400
+    seq = request.headers.get("X-Chunk-Seq", type=int)
+    try:
+        live_transcription.add_chunk(session, chunk, seq)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify({"status": "accepted", "bytes": session.bytes_received}), 202
+
+@app.route("/stream/<session_id>/events")
+def live_stream_events(session_id):
+    session = live_transcription.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return Response(
+        stream_with_context(session.channel.subscribe()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/stream/<session_id>/stop", methods=["POST"])
+def stop_live_stream(session_id):
+    """Finalize the live transcript and hand it to the job queue for summary, Slack and Notion."""
+    session = live_transcription.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    result = live_transcription.finish(session)
+    if not result["text"]:
+        return jsonify({"error": "No speech was transcribed", "transcript": ""}), 422
+    job_id = job_queue.enqueue({
+        "transcript": result["text"],
+        "segments": result["segments"],
+        "meeting_title": session.title,
+        "meeting_key": meeting_key(session.id, "live"),
+    })
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}",
+                    "transcript": result["text"]}), 202
 
 @app.route('/check-commits')
 def manual_check_commits():
@@ -307,7 +502,8 @@ def show_commit_history():
 
 @app.route('/send-standup')
 def manual_send_standup():
-    send_daily_standup()
+    # ?refresh=true regenerates every update instead of reusing cached LLM responses
+    send_daily_standup(refresh=request.args.get("refresh", "false").lower() == "true")
     return jsonify({"status": "success", "message": "Standup sent"})
 
 @app.route('/init-db')
@@ -317,8 +513,285 @@ def manual_init_db():
 
 
 # --- Audio Processing, AI Summarization, and Notifications ---
-def generate_meeting_summary(text):
+def routed_llm(task, prompt_tokens, template, budget=None):
+    """
+    (model, routing decision) for one call: the tier is chosen from the task,
+    the prompt size and the latency budget. (None, None) when Gemini is not configured.
+    """
+    if not gemini_model:
+        return None, None
+    return get_router().model_for(task, prompt_tokens, template, budget=budget)
+
+def process_transcription_job(job, ctx):
+    """
+    Run the post-upload pipeline for a queued job as a stage graph and return the meeting data.
+
+    transcribe -> compact -> summarize -> slack / notion / persist_json
+                          -> sentiment -> prioritize (also after summarize)
+    Independent stages run concurrently on the shared pipeline pool; only
+    transcribe is critical, any other failure is recorded and skips its dependents.
+    """
+    payload = job["payload"]
+    audio_path = payload.get("audio_path")
+    meeting_title = payload.get("meeting_title", "Untitled Meeting")
+    budget = payload.get("latency")   # the same fast | balanced | accurate hint also routes Gemini tiers
+    routing = {}
+    keep_spool = False
+
+    def transcribe(results):
+        if "transcript" in payload:
+            # Already transcribed live over /stream
+            return {"text": payload["transcript"], "segments": payload.get("segments", []), "mode": "live",
+                    "meeting_key": payload.get("meeting_key") or meeting_key(payload["transcript"], "transcript")}
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Spooled audio file is missing: {audio_path}")
+
+        # Try to set ffmpeg path if not already set
+        if not os.environ.get("FFMPEG_BINARY"):
+            ffmpeg_path = find_ffmpeg()
+            if ffmpeg_path:
+                os.environ["FFMPEG_BINARY"] = ffmpeg_path
+                logger.info(f"Set FFMPEG_BINARY to: {ffmpeg_path}")
+        try:
+            audio = decode_audio_file(os.path.abspath(audio_path))
+            # Hashed once: the transcription cache key and the meeting identity both derive from it
+            pcm_hash = audio_hash(audio)
+            result = transcribe_decoded_audio(
+                audio,
+                long_audio=payload.get("long_audio", "auto"),
+                benchmark=payload.get("benchmark", False),
+                whisper_model=payload.get("whisper_model"),
+                latency=payload.get("latency"),
+                pcm_hash=pcm_hash,
+            )
+            # A re-upload of the same recording is the same meeting for Notion de-duplication
+            result["meeting_key"] = meeting_key(pcm_hash.hexdigest())
+            logger.info("Transcription completed.")
+            return result
+        except NoSpeechDetected:
+            raise
+        except Exception as whisper_error:
+            logger.error(f"Whisper transcription failed: {whisper_error}")
+            raise RuntimeError(
+                "Audio transcription failed. Please ensure ffmpeg is installed and accessible. Error: " + str(whisper_error)
+            )
+
+    def compact(results):
+        # Strip fillers and repetition loops once, before any Gemini prompt sees the transcript
+        text = results["transcribe"]["text"]
+        if not TRANSCRIPT_COMPACTION_ENABLED:
+            return {"text": text, "stats": None}
+        compacted, stats = compact_transcript(text)
+        logger.info(f"✂️ Transcript compacted: {stats['tokens_before']} → {stats['tokens_after']} tokens "
+                    f"({stats['saved_pct']}% saved)")
+        return {"text": compacted, "stats": stats}
+
+    def summarize(results):
+        text = results["compact"]["text"]
+        if gemini_model:
+            # Instant local summary for clients to show until Gemini's replaces it
+            job_events.publish(job["id"], "provisional", {"summary": generate_offline_summary(text, mode="provisional")})
+        # Forward the summary text to /jobs/<id>/events while Gemini is still generating
+        result = generate_meeting_summary(
+            text,
+            on_partial=lambda text: job_events.publish(job["id"], "summary", {"text": text}),
+            budget=budget,
+        )
+        if result.get("routing"):
+            routing["summary"] = result["routing"]
+        return result
+
+    def structured_summary(results):
+        structured = results["summarize"].get("structured_data_json")
+        if not structured:
+            raise SkipStage("No structured data available for processing")
+        return structured
+
+    def sentiment(results):
+        text = results["compact"]["text"]
+        model, routing["sentiment"] = routed_llm("sentiment", estimate_tokens(text), "sentiment:v1", budget)
+        return SentimentAnalyzer(model).analyze_meeting_sentiment(text)
+
+    def prioritize(results):
+        tasks = [dict(item) for item in structured_summary(results).get("action_items", [])]
+        context = {"sentiment": results["sentiment"].get("overall_sentiment", "neutral")}
+        model, routing["prioritization"] = routed_llm(
+            "prioritization", estimate_tokens(json.dumps(tasks)), "task_priorities:v1", budget)
+        return TaskPrioritizer(model).prioritize_tasks(tasks, context)
+
+    def slack(results):
+        # Always send to Slack (not just when enabled)
+        if not (slack_client and SLACK_CHANNEL_ID):
+            raise SkipStage("Slack client or channel ID not configured")
+        send_summary_to_slack({"title": meeting_title, "summary": results["summarize"]})
+        logger.info("✅ Meeting summary sent to Slack")
+
+    def persist_json(results):
+        update_meeting_summary_json(structured_summary(results), meeting_title, results["transcribe"]["meeting_key"])
+
+    def notion(results):
+        # Only add tasks to existing database if it exists, don't create new one
+        add_tasks_to_existing_database(structured_summary(results), meeting=results["transcribe"]["meeting_key"])
+
+    graph = (StageGraph()
+             .add("transcribe", transcribe, critical=True)
+             .add("compact", compact, after=["transcribe"])
+             .add("summarize", summarize, after=["compact"])
+             .add("sentiment", sentiment, after=["compact"])
+             .add("prioritize", prioritize, after=["summarize", "sentiment"])
+             .add("slack", slack, after=["summarize"])
+             .add("persist_json", persist_json, after=["summarize"])
+             .add("notion", notion, after=["summarize"]))
+
+    def on_start(name):
+        ctx.start_stage(name)
+        job_events.publish(job["id"], "stage", {"stage": name, "status": "running"})
+
+    def on_finish(name, status, error):
+        if status == "skipped":
+            ctx.skip_stage(name)
+        else:
+            ctx.finish_stage(name, error=error)
+        job_events.publish(job["id"], "stage", {"stage": name, "status": status, "error": error})
+
     try:
+        try:
+            run = graph.run(pipeline_executor, on_start=on_start, on_finish=on_finish)
+        except StageFailed as e:
+            raise e.error
+        result = run.results["transcribe"]
+        logger.info(f"🧭 Pipeline finished in {run.wall_ms:.0f}ms "
+                    f"(sum of stages {sum(run.durations_ms.values()):.0f}ms)")
+        return {
+            "id": job["id"],
+            "title": meeting_title,
+            "timestamp": datetime.now().isoformat(),
+            "transcript": result["text"],
+            "segments": result.get("segments", []),
+            "transcription": {k: result[k] for k in ("mode", "model", "chunks", "timing", "vad", "cache") if k in result},
+            "compaction": (run.results.get("compact") or {}).get("stats"),
+            "summary": run.results.get("summarize"),
+            "sentiment": run.results.get("sentiment"),
+            "prioritized_tasks": run.results.get("prioritize"),
+            # Gemini tier chosen per stage, with the reason
+            "routing": {stage: decision for stage, decision in routing.items() if decision},
+            "pipeline": run.summary(graph),
+        }
+    except Exception:
+        # A failed job is re-queued until its last attempt, and the retry needs the upload
+        keep_spool = not ctx.last_attempt
+        raise
+    finally:
+        # Clean up the spooled upload once the job has succeeded or is out of attempts
+        if not keep_spool and audio_path and os.path.exists(audio_path):
+            try:
+                os.remove(audio_path)
+                logger.info(f"Cleaned up spooled file: {audio_path}")
+            except Exception as e:
+                logger.warning(f"Could not remove spooled file {audio_path}: {e}")
+
+def transcribe_decoded_audio(audio, long_audio="auto", benchmark=False, whisper_model=None, latency=None,
+                             pcm_hash=None):
+    """
+    Transcribe decoded PCM: drop silence with the VAD pre-pass, then switch to
+    parallel chunked mode for long recordings. Timestamps refer to the original audio.
+    Results are cached by audio content, so a re-upload skips Whisper entirely.
+    """
+    model, model_reason = select_model(
+        transcription_engine.models,
+        transcription_engine.model_name,
+        requested=whisper_model,
+        latency=latency,
+        audio_s=duration_seconds(audio),
+        queue_depth=transcription_engine.queue_depth,
+        downgrade_audio_s=WHISPER_DOWNGRADE_AUDIO_S,
+        downgrade_queue_depth=WHISPER_DOWNGRADE_QUEUE_DEPTH,
+    )
+    logger.info(f"🎚️ Using Whisper '{model}' ({model_reason})")
+
+    cache_key = None
+    if TRANSCRIPTION_CACHE_ENABLED and not benchmark:
+        cache_key = audio_cache_key(audio, model, {
+            "vad": [VAD_NOISE_MARGIN, VAD_SUSPECT_SHARE] if VAD_ENABLED else False,
+            "long_audio": long_audio,
+            "long_audio_threshold_s": LONG_AUDIO_THRESHOLD_S,
+        }, pcm_hash=pcm_hash)
+        cached = transcription_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ Transcription cache hit ({duration_seconds(audio):.0f}s of audio)")
+            cached["cache"] = "hit"
+            return cached
+
+    original_audio = audio
+    vad_result = None
+    if VAD_ENABLED:
+        # Raises NoSpeechDetected before any model call
+        vad_result = apply_vad(audio, noise_margin=VAD_NOISE_MARGIN, suspect_share=VAD_SUSPECT_SHARE)
+        audio = vad_result.audio
+
+    duration = duration_seconds(audio)
+    use_long_mode = long_audio == "true" or (long_audio == "auto" and duration >= LONG_AUDIO_THRESHOLD_S)
+    if use_long_mode:
+        result = transcribe_long_audio(transcription_engine, audio, benchmark=benchmark, model=model)
+    else:
+        started = time.time()
+        result = transcription_engine.transcribe(audio, model=model)
+        result["mode"] = "single"
+        result["timing"] = {"audio_s": round(duration, 1), "single_s": round(time.time() - started, 2)}
+
+    result["model"] = {"name": model, "reason": model_reason}
+    if vad_result:
+        vad_result.remap_result(result)
+        result["vad"] = vad_result.stats()
+
+    if cache_key:
+        try:
+            transcription_cache.put(cache_key, result, original_audio.nbytes, duration_seconds(original_audio))
+        except Exception as e:
+            logger.warning(f"Could not cache transcription: {e}")
+        result["cache"] = "miss"
+    return result
+
+# Shared, bounded pool for the post-transcription stages of every job
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PIPELINE_WORKERS", "8")),
+    thread_name_prefix="pipeline-stage",
+)
+
+job_queue = JobQueue(
+    process_transcription_job,
+    db_path=JOB_DB_PATH,
+    num_workers=int(os.getenv("TRANSCRIBE_JOB_WORKERS", str(transcription_engine.num_workers))),
+    on_finish=job_events.finish,
+)
+
+def add_due_dates(structured_data_json):
+    """Action items are due 7 days from now."""
+    due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+    for item in structured_data_json.get("action_items", []):
+        item["due"] = due_date
+
+def generate_offline_summary(text, mode="offline"):
+    """Local TextRank summary and rule-based action items; same shape as the Gemini result."""
+    structured_data_json = summarize_offline(text)
+    add_due_dates(structured_data_json)
+    result = summary_result(structured_data_json)
+    result["mode"] = mode
+    return result
+
+def generate_meeting_summary(text, on_partial=None, budget=None):
+    """
+    Summarize a transcript into the structured JSON plus rendered text. With
+    `on_partial`, the single-call path streams the response and calls
+    on_partial(summary_text_so_far) as the "summary" field grows.
+    The Gemini tier is routed by prompt size and `budget` (fast | balanced | accurate)
+    and recorded under "routing". Falls back to the offline summarizer when Gemini is unavailable.
+    """
+    try:
+        if OFFLINE_SUMMARY_FALLBACK and not (GEMINI_API_KEY and gemini_model):
+            logger.warning("⚠️ Gemini not configured - using the offline summarizer")
+            return generate_offline_summary(text)
+
         if not GEMINI_API_KEY:
             logger.error("GEMINI_API_KEY not found in environment variables")
             return {
@@ -333,39 +806,52 @@ def generate_meeting_summary(text):
                 "structured_data_json": None
             }
 
-        # Calculate due date (7 days from now)
-        due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+        tokens = estimate_tokens(text)
+        chunks = 1
+        if tokens > SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS:
+            # Too long for one good prompt: summarize chunks in parallel, then merge.
+            # Each map call only sees one chunk, so the tier is routed by the chunk size
+            model, decision = routed_llm("summary", SUMMARY_CHUNK_TOKENS, "meeting_summary:v2", budget)
+            structured_data_json, chunks = summarize_map_reduce(
+                model, text,
+                chunk_tokens=SUMMARY_CHUNK_TOKENS,
+                max_workers=SUMMARY_MAP_WORKERS,
+                hedge=True,
+            )
+            if on_partial:
+                on_partial(structured_data_json.get("summary", ""))
+        else:
+            # One structured call; the markdown and Slack text are rendered from it locally
+            prompt = build_summary_prompt(text)
+            model, decision = routed_llm("summary", estimate_tokens(prompt), "meeting_summary:v2", budget)
+            if on_partial:
+                raw, shown = "", ""
+                # hedge=True: a duplicate request is raced against slow ones when LLM_HEDGE_ENABLED
+                for piece in model.stream_text(prompt, generation_config=JSON_GENERATION_CONFIG, hedge=True):
+                    raw += piece
+                    partial = partial_summary_text(raw)
+                    if partial != shown:
+                        shown = partial
+                        on_partial(partial)
+            else:
+                raw = model.generate_content(prompt, generation_config=JSON_GENERATION_CONFIG, hedge=True).text
+            # The complete JSON is still validated before anything downstream (Notion, Slack) uses it
+            structured_data_json = parse_summary_response(raw)
 
-        json_prompt = f"""
-Analyze this meeting transcript and provide a structured summary in JSON format.
-Transcript: {text}
-Required format: {{"summary": "...", "topics": [], "action_items": [{{"task": "...", "assignee": "..."}}]}}
-
-Rules: Extract action items and assignees. Do NOT include due dates in the JSON - they will be added automatically. Output ONLY valid JSON.
-"""
-        json_response = gemini_model.generate_content(json_prompt)
-        structured_data_clean = re.sub(r"```(?:json)?", "", json_response.text, flags=re.IGNORECASE).strip()
-        structured_data_json = json.loads(structured_data_clean)
-
-        # Add due date to all action items
-        for item in structured_data_json.get("action_items", []):
-            item["due"] = due_date
-
-        text_prompt = f"""
-Analyze this meeting transcript and provide a detailed summary formatted with markdown.
-Transcript: {text}
-Include:
-1. A concise summary.
-2. Main topics.
-3. Action items.
-4. Important details.
-"""
-        text_response = gemini_model.generate_content(text_prompt)
-        formatted_text = text_response.text
-
-        return {"structured_data_json": structured_data_json, "formatted_text": formatted_text}
+        add_due_dates(structured_data_json)
+
+        result = summary_result(structured_data_json)
+        result["mode"] = "map_reduce" if chunks > 1 else "single"
+        result["chunks"] = chunks
+        result["routing"] = decision
+        return result
     except Exception as e:
         logger.error(f"Error generating summary: {str(e)}")
+        if OFFLINE_SUMMARY_FALLBACK:
+            logger.warning("⚠️ Falling back to the offline summarizer")
+            result = generate_offline_summary(text, mode="offline_fallback")
+            result["llm_error"] = str(e)
+            return result
         return {
             "formatted_text": f"❌ **Error generating summary**: {str(e)}\n\nPlease check your API configuration and try again.",
             "structured_data_json": None
@@ -376,13 +862,15 @@ def send_summary_to_slack(data):
         logger.warning("Slack client or channel ID not configured.")
         return
     try:
-        message = f"*Meeting Summary: {data['title']}*\n\n{data['summary']['formatted_text']}"
+        structured = data["summary"].get("structured_data_json")
+        body = render_slack(structured) if structured else data["summary"]["formatted_text"]
+        message = f"*Meeting Summary: {data['title']}*\n\n{body}"
         slack_client.chat_postMessage(channel=SLACK_CHANNEL_ID, text=message, mrkdwn=True)
         logger.info("✅ Summary sent to Slack.")
     except SlackApiError as e:
         logger.error(f"❌ Error sending summary to Slack: {e}")
 
-def update_meeting_summary_json(summary_data, meeting_title):
+def update_meeting_summary_json(summary_data, meeting_title, meeting=None):
     """Update the meeting_summary_input.json file with new meeting data"""
     try:
         # Calculate due date (7 days from now)
@@ -392,6 +880,7 @@ def update_meeting_summary_json(summary_data, meeting_title):
         repo_fallback = f"https://github.com/{REPO_OWNER}/{REPO_NAME}" if REPO_OWNER and REPO_NAME else ""
         task_data = {
             "github_link": os.getenv("GITHUB_REPO_URL", repo_fallback),
+            "meeting_key": meeting,
             "tasks": []
         }
         
@@ -399,7 +888,7 @@ def update_meeting_summary_json(summary_data, meeting_title):
         for item in summary_data.get("action_items", []):
             task = {
                 "task": item["task"],
-                "assignee": item["assignee"] if item["assignee"] else "Unassigned",
+                "assignee": item.get("assignee") or "Unassigned",
                 "status": "To Do",
                 "due": due_date  # Use calculated due date instead of item["due"]
             }
@@ -417,8 +906,8 @@ def update_meeting_summary_json(summary_data, meeting_title):
         logger.error(f"Error updating meeting_summary_input.json: {str(e)}")
         return None
 
-def add_tasks_to_existing_database(summary_json):
-    """Add tasks to existing Notion database"""
+def add_tasks_to_existing_database(summary_json, meeting=""):
+    """Add tasks to existing Notion database, de-duplicated within `meeting` (task_index.meeting_key)"""
     try:
         # Check if database already exists
         db_id = os.getenv("DATABASE_ID")
@@ -433,19 +922,13 @@ def add_tasks_to_existing_database(summary_json):
         # Add tasks to existing database
         if "action_items" in summary_json and summary_json["action_items"]:
             logger.info(f"📝 Adding {len(summary_json['action_items'])} tasks to existing Notion database...")
-            success_count = 0
-            for item in summary_json["action_items"]:
-                try:
-                    add_task_to_database(db_id, {
-                        "task": item.get("task", "Untitled Task"),
-                        "assignee": item.get("assignee", "Unassigned"),
-                        "status": "To Do",
-                        "due": due_date,  # Use calculated due date instead of item.get("due")
-                    })
-                    success_count += 1
-                except Exception as task_error:
-                    logger.error(f"❌ Failed to add task '{item.get('task', 'Untitled Task')}': {task_error}")
-                    continue
+            results = add_tasks_to_database(db_id, [{
+                "task": item.get("task", "Untitled Task"),
+                "assignee": item.get("assignee", "Unassigned"),
+                "status": "To Do",
+                "due": due_date,  # Use calculated due date instead of item.get("due")
+            } for item in summary_json["action_items"]], scope=meeting)
+            success_count = sum(result["status"] != "failed" for result in results)
             
             if success_count > 0:
                 logger.info(f"✅ Successfully added {success_count}/{len(summary_json['action_items'])} tasks to Notion database")
@@ -492,35 +975,46 @@ def create_meeting_task_database():
         logger.error("❌ Failed to create database: %s", data)
         return None
 
-def add_task_to_database(database_id, task):
-    url = "https://api.notion.com/v1/pages"
-    properties = {"Task": {"title": [{"type": "text", "text": {"content": task["task"]}}]},"Assignee": {"rich_text": [{"type": "text", "text": {"content": task["assignee"]}}]},"Status": {"select": {"name": task["status"]}}}
-    if task.get("due"):
-        properties["Due"] = {"date": {"start": task["due"]}}
-    payload = {"parent": {"database_id": database_id}, "properties": properties}
-    response = requests.post(url, headers=NOTION_HEADERS, json=payload)
-    if response.status_code == 200:
-        logger.info(f"✅ Added task to Notion: {task['task']}")
-    else:
-        logger.error(f"❌ Failed to add task to Notion: {response.json()}")
+def add_tasks_to_database(database_id, tasks, scope=""):
+    """
+    Create task pages concurrently within Notion's rate limit (NOTION_WRITE_RPS). Tasks already
+    written for the same meeting (`scope`) and assignee are skipped or updated per NOTION_DEDUP_MODE,
+    so re-processing a meeting does not duplicate them.
+    Returns one result per task: created / updated / skipped / duplicate / failed.
+    """
+    results = get_bulk_writer().add_tasks(database_id, tasks, scope=scope, index=get_task_index(),
+                                          dedup=NOTION_DEDUP_MODE)
+    for task, result in zip(tasks, results):
+        if result["status"] in ("created", "updated"):
+            logger.info(f"✅ {result['status'].capitalize()} task in Notion: {task['task']}")
+            if notion_mirror:
+                notion_mirror.record_page(database_id, result["page"])
+        elif result["status"] == "duplicate":
+            logger.info(f"⏭️ Task already in Notion ({result['match']} match): {task['task']}")
+        elif result["status"] == "failed":
+            logger.error(f"❌ Failed to add task to Notion: {task['task']} ({result['error']})")
+    return results
 
-def get_all_tasks():
+def get_all_tasks(status=None, exclude_status=None, assignee=None):
+    """
+    Task pages from the local Notion mirror (synced when older than NOTION_MIRROR_MAX_AGE_S).
+    With the mirror disabled, the filters are pushed down to a paginated Notion query.
+    """
     database_id = os.getenv("DATABASE_ID")
     if not database_id:
         logger.error("❌ DATABASE_ID not found in environment variables")
         return []
     
     try:
-        url = f"https://api.notion.com/v1/databases/{database_id}/query"
-        response = requests.post(url, headers=NOTION_HEADERS)
-        if response.status_code == 200:
-            return response.json()["results"]
-        elif response.status_code == 404:
+        if notion_mirror:
+            return notion_mirror.tasks(database_id, status=status, exclude_status=exclude_status, assignee=assignee)
+        return list(query_database(database_id, NOTION_HEADERS, notion_filter(status, exclude_status, assignee)))
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
             logger.error(f"❌ Database with ID {database_id} not found. Please check your DATABASE_ID or run /init-db to create a new database.")
-            return []
         else:
-            logger.error(f"❌ Failed to retrieve tasks: {response.json()}")
-            return []
+            logger.error(f"❌ Failed to retrieve tasks: {e}")
+        return []
     except Exception as e:
         logger.error(f"❌ Error accessing Notion database: {e}")
         return []
@@ -536,21 +1030,17 @@ def get_recent_commits():
         logger.error("❌ GitHub API Error: %s - %s", response.status_code, response.json())
         return []
 
-def update_task_status_if_matched(commit_msg):
-    tasks = get_all_tasks()
-    for task in tasks:
-        task_name = task["properties"]["Task"]["title"][0]["text"]["content"].strip().lower()
-        if task_name in commit_msg.lower():
-            page_id = task["id"]
-            current_status = task["properties"]["Status"]["select"]["name"]
-            if current_status != "Done":
-                payload = {"properties": {"Status": {"select": {"name": "Done"}}}}
-                url = f"https://api.notion.com/v1/pages/{page_id}"
-                response = requests.patch(url, headers=NOTION_HEADERS, json=payload)
-                if response.status_code == 200:
-                    logger.info(f"✅ Task '{task_name}' marked as Done.")
-                else:
-                    logger.error(f"❌ Failed to update task '{task_name}': %s", response.json())
+def update_tasks_matched_by_commits(commit_msgs):
+    """
+    Queue Done for every open task whose name appears in any of the commit messages.
+    Tasks are loaded once per poll and matched against all messages in a single pass;
+    one queued update per matched page, however many commits mention it.
+    """
+    tasks = {task["id"]: task for task in get_all_tasks(exclude_status="Done")}
+    matches = TaskMatcher.from_pages(tasks.values()).match_batch(commit_msgs)
+    logger.info(f"🔗 {len(matches)} of {len(tasks)} open task(s) matched by {len(commit_msgs)} commit(s)")
+    for page_id in matches:
+        status_updates.set_status(page_id, "Done", name=task_name(tasks[page_id]))
 
 
 # --- Daily Standup Automation ---
@@ -590,14 +1080,8 @@ def fetch_github_commits():
     return commits_by_user
 
 def fetch_notion_tasks():
-    database_id = os.getenv("DATABASE_ID")
-    if not database_id: return {}
-    url = f"https://api.notion.com/v1/databases/{database_id}/query"
-    response = requests.post(url, headers=NOTION_HEADERS)
-    if response.status_code != 200: return {}
-    
     tasks_by_user = {}
-    for page in response.json().get('results', []):
+    for page in get_all_tasks():
         assignee_list = page['properties']['Assignee']['rich_text']
         if not assignee_list: continue
         user_info = get_user_mapping(notion_name=assignee_list[0]['text']['content'])
@@ -612,33 +1096,46 @@ def fetch_notion_tasks():
         })
     return tasks_by_user
 
-def summarize_user_activity(user_commits, user_tasks):
+def summarize_user_activity(user_commits, user_tasks, bypass_cache=False):
     prompt = f"""Generate a concise standup update in this exact format (no bullet numbers, no extra lines):\n\n✅ What I did:\n- [List completed items]\n\n🚧 In progress:\n- [List WIP items]\n\n❌ Blockers:\n- [List blockers or \"None\"]\n\nBase this on:\nGitHub Commits: {user_commits}\nNotion Tasks: {user_tasks}"""
     try:
-        response = gemini_model.generate_content(prompt)
+        model, _ = routed_llm("standup", estimate_tokens(prompt), "standup:v1")
+        response = model.generate_content(prompt, bypass_cache=bypass_cache)
         summary = response.text.strip().replace("• ", "- ")
         return "\n".join(line.strip() for line in summary.split("\n") if line.strip())
     except Exception as e:
         logger.error(f"❌ Summarization error: {e}")
         return "⚠️ Update unavailable (summary error)"
 
-def generate_standup_summary():
+def generate_standup_summary(refresh=False):
     commits = fetch_github_commits()
     tasks = fetch_notion_tasks()
     all_users = set(commits.keys()).union(set(tasks.keys()))
-    summaries = {}
+    activity = {}
     
     for slack_id in all_users:
         user_commits = commits.get(slack_id, [])
         user_tasks = tasks.get(slack_id, [])
         if not user_commits and not user_tasks: continue
-        
-        display_name = next((u['slack_display_name'] for u in load_user_mapping().values() if u['slack_id'] == slack_id), slack_id)
-        summaries[display_name] = summarize_user_activity(
-            [c['message'] for c in user_commits],
-            [f"{t['task']} ({t['status']})" for t in user_tasks]
-        )
-    return summaries
+        activity[slack_id] = {
+            "commits": [c['message'] for c in user_commits],
+            "tasks": [f"{t['task']} ({t['status']})" for t in user_tasks],
+        }
+
+    # Many users per Gemini round trip; anyone missing from a reply gets the per-user call
+    batch_model, _ = routed_llm("standup", STANDUP_BATCH_TOKENS, "standup_batch:v1")
+    updates = summarize_standups(
+        batch_model,
+        activity,
+        single=lambda user_commits, user_tasks: summarize_user_activity(user_commits, user_tasks, bypass_cache=refresh),
+        max_batch_tokens=STANDUP_BATCH_TOKENS,
+        bypass_cache=refresh,
+    )
+    mapping = load_user_mapping().values()
+    return {
+        next((u['slack_display_name'] for u in mapping if u['slack_id'] == slack_id), slack_id): update
+        for slack_id, update in updates.items()
+    }
 
 def format_standup_message(per_user_updates):
     blocks = []
@@ -681,7 +1178,11 @@ def check_github_commits():
             author = commit.get("author", {}).get("login", "Unknown")
             date = commit["commit"]["author"]["date"]
             logger.info(f"🔹 Commit by {author} on {date}: {msg}")
-            update_task_status_if_matched(msg)
+        try:
+            update_tasks_matched_by_commits([commit["commit"]["message"] for commit in commits])
+        finally:
+            # One bounded concurrent batch per cycle, however many commits matched
+            status_updates.flush()
         
         # Update last seen SHA for future reference
         if commits:
@@ -690,9 +1191,9 @@ def check_github_commits():
     else:
         logger.warning("⚠️ Could not fetch commits.")
 
-def send_daily_standup():
+def send_daily_standup(refresh=False):
     logger.info(f"📤 Generating and sending daily standup at {datetime.now()}")
-    standup_data = generate_standup_summary()
+    standup_data = generate_standup_summary(refresh=refresh)
     if not standup_data:
         logger.warning("⚠️ No activity found for any mapped users.")
         return
@@ -709,8 +1210,9 @@ def initialize_database():
                 data = json.load(f)
             for task in data.get("tasks", []):
                 task["status"] = "To Do"
-                add_task_to_database(db_id, task)
-            logger.info(f"✅ Added {len(data.get('tasks', []))} tasks to new database")
+            results = add_tasks_to_database(db_id, data.get("tasks", []), scope=summary_meeting_key(data))
+            added = sum(result["status"] != "failed" for result in results)
+            logger.info(f"✅ Added {added}/{len(results)} tasks to new database")
         except FileNotFoundError:
             logger.warning("meeting_summary_input.json not found, skipping initial task population.")
         except Exception as e:
@@ -720,6 +1222,36 @@ def initialize_database():
     
     load_dotenv(override=True)
 
+_background_services_started = False
+warmup_state = {"ffmpeg": None, "started_at": None, "finished_at": None, "duration_s": None}
+
+def warm_up():
+    """Check the ffmpeg pipe and wait for every Whisper worker to finish its warm-up inference."""
+    started = time.time()
+    warmup_state["started_at"] = datetime.now().isoformat()
+    warmup_state["ffmpeg"] = check_ffmpeg()
+    if not warmup_state["ffmpeg"]:
+        logger.error("❌ ffmpeg warm-up decode failed - uploads cannot be transcribed")
+    if transcription_engine.wait_ready():
+        warmup_state["finished_at"] = datetime.now().isoformat()
+        warmup_state["duration_s"] = round(time.time() - started, 1)
+        logger.info(f"🔥 Warm-up finished in {warmup_state['duration_s']}s")
+    else:
+        logger.error("❌ Whisper workers failed to warm up")
+
+def start_background_services():
+    """
+    Start the job workers once per process (also resumes jobs queued before a restart)
+    and warm up in the background so /ready flips once the node can serve.
+    """
+    global _background_services_started
+    if _background_services_started:
+        return
+    _background_services_started = True
+    transcription_engine.start()
+    job_queue.start()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
 def setup_scheduler():
     scheduler.init_app(app)
     scheduler.add_job(id='check_github_commits', func=check_github_commits, trigger='interval', minutes=5)
@@ -728,5 +1260,6 @@ def setup_scheduler():
     logger.info("⏰ Scheduler started with jobs for GitHub checks and daily standups.")
 
 if __name__ == "__main__":
+    start_background_services()
     setup_scheduler()
     app.run(host="0.0.0.0", port=5000, debug=False)
@@ -3,6 +3,10 @@ import os
 import time
 import json
 from dotenv import load_dotenv
+from notion_mirror import get_notion_mirror
+from task_matcher import TaskMatcher, task_name
+from notion_bulk_writer import get_bulk_writer
+from status_update_buffer import StatusUpdateBuffer
 
 # Explicitly load the .env file from the project root
 ROOT_ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env'))
@@ -20,6 +24,12 @@ headers_notion = {
     "Notion-Version": "2022-06-28"
 }
 
+# Polled every 10s below; the mirror only asks Notion for pages edited since its last sync
+notion_mirror = get_notion_mirror()
+
+# Status changes are coalesced per page and written concurrently once at the end of each poll
+status_updates = StatusUpdateBuffer(get_bulk_writer(), on_written=lambda page: notion_mirror.record_page(DATABASE_ID, page))
+
 headers_github = {
     "Authorization": f"Bearer {TOKEN_GITHUB}",
     "Accept": "application/vnd.github+json"
@@ -35,34 +45,30 @@ def get_recent_commits():
         print(response.json())
         return []
 
-def get_all_tasks():
-    url = f"https://api.notion.com/v1/databases/{DATABASE_ID}/query"
-    response = requests.post(url, headers=headers_notion)
-    if response.status_code == 200:
-        return response.json()["results"]
-    else:
-        print("❌ Failed to retrieve tasks:", response.json())
+def get_all_tasks(status=None, exclude_status=None, assignee=None):
+    try:
+        return notion_mirror.tasks(DATABASE_ID, status=status, exclude_status=exclude_status, assignee=assignee)
+    except Exception as e:
+        print("❌ Failed to retrieve tasks:", e)
         return []
 
-def update_task_status_if_matched(commit_msg):
-    tasks = get_all_tasks()
-    for task in tasks:
-        task_name = task["properties"]["Task"]["title"][0]["text"]["content"].strip().lower()
-        page_id = task["id"]
-        current_status = task["properties"]["Status"]["select"]["name"]
-
-        if task_name in commit_msg.lower() and current_status != "Done":
-            payload = {
-                "properties": {
-                    "Status": { "select": { "name": "Done" } }
-                }
-            }
-            url = f"https://api.notion.com/v1/pages/{page_id}"
-            response = requests.patch(url, headers=headers_notion, json=payload)
-            if response.status_code == 200:
-                print(f"✅ Task '{task_name}' marked as Done.")
-            else:
-                print(f"❌ Failed to update task '{task_name}':", response.json())
+def update_tasks_matched_by_commits(commit_msgs):
+    """Queue a Done status for every open task matched by a commit; flush_status_updates() writes them."""
+    # Open tasks are loaded once and matched against every new commit in one pass
+    tasks = {task["id"]: task for task in get_all_tasks(exclude_status="Done")}
+    matches = TaskMatcher.from_pages(tasks.values()).match_batch(commit_msgs)
+
+    for page_id in matches:
+        status_updates.set_status(page_id, "Done", name=task_name(tasks[page_id]))
+
+def flush_status_updates():
+    """Write the queued status changes as one batch; failed ones stay queued for the next poll."""
+    for result in status_updates.flush():
+        name = result["name"] or result["page_id"]
+        if result["status"] == "updated":
+            print(f"✅ Task '{name}' marked as Done.")
+        else:
+            print(f"❌ Failed to update task '{name}':", result["error"])
 
 if __name__ == "__main__":
     last_seen_sha = None
@@ -80,13 +86,15 @@ if __name__ == "__main__":
             if new_commits:
                 print(f"🆕 {len(new_commits)} new commit(s) found.")
                 for commit in reversed(new_commits):  # oldest first
-                    msg = commit["commit"]["message"]
-                    print("🔹 Processing commit:", msg)
-                    update_task_status_if_matched(msg)
+                    print("🔹 Processing commit:", commit["commit"]["message"])
+                update_tasks_matched_by_commits([commit["commit"]["message"] for commit in new_commits])
                 last_seen_sha = commits[0]["sha"]
             else:
                 print("⏳ No new commit found.")
         else:
             print("⚠️ Could not fetch commits.")
 
+        # Once per cycle, so updates retained by a failed flush are retried even without new commits
+        flush_status_updates()
+
         time.sleep(10)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from live_transcription import EventChannel, format_sse
+
+RETENTION_S = 600.0   # finished jobs keep their event history this long for late subscribers
+
+
+class JobEventHub:
+    """
+    One EventChannel per background job, so clients can follow a job over SSE
+    (stage changes, the summary as it streams in, then the final result)
+    instead of polling GET /jobs/<id>.
+    """
+
+    def __init__(self, retention_s: float = RETENTION_S):
+        self.retention_s = retention_s
+        self._channels: Dict[str, EventChannel] = {}
+        self._closed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def channel(self, job_id: str) -> EventChannel:
+        with self._lock:
+            self._expire()
+            if job_id not in self._channels:
+                self._channels[job_id] = EventChannel()
+            return self._channels[job_id]
+
+    def get(self, job_id: str) -> Optional[EventChannel]:
+        with self._lock:
+            return self._channels.get(job_id)
+
+    def publish(self, job_id: str, event: str, data: Dict):
+        channel = self.channel(job_id)
+        if not channel.closed:
+            channel.publish(event, data)
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Publish the terminal event ("done" or "failed") and close the channel."""
+        channel = self.channel(job_id)
+        if channel.closed:
+            return
+        if status == "succeeded":
+            channel.publish("done", {"result": result})
+        else:
+            channel.publish("failed", {"error": error})
+        channel.close()
+        with self._lock:
+            self._closed_at[job_id] = time.time()
+
+    def subscribe(self, job: Dict) -> Iterator[str]:
+        """SSE stream for a job; a job that finished before anyone subscribed gets its terminal event at once."""
+        if job["status"] in ("succeeded", "failed") and self.get(job["id"]) is None:
+            event = "done" if job["status"] == "succeeded" else "failed"
+            data = {"result": job.get("result")} if event == "done" else {"error": job.get("error")}
+            return iter([format_sse(event, data)])
+        return self.channel(job["id"]).subscribe()
+
+    def _expire(self):
+        cutoff = time.time() - self.retention_s
+        for job_id in [j for j, closed_at in self._closed_at.items() if closed_at < cutoff]:
+            self._channels.pop(job_id, None)
+            self._closed_at.pop(job_id, None)
@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "jobs.db")
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class JobContext:
+    """
+    Handle passed to a job handler so it can report stage progress.
+    Stage timings are persisted immediately and show up in GET /jobs/<id>.
+    """
+
+    def __init__(self, queue: "JobQueue", job: Dict):
+        self.queue = queue
+        self.job_id = job["id"]
+        self.payload = job["payload"]
+        self.attempts = job["attempts"]
+
+    @property
+    def last_attempt(self) -> bool:
+        """True when a failure of this run is final (the job will not be re-queued)."""
+        return self.attempts >= self.queue.max_attempts
+
+    def start_stage(self, name: str):
+        self.queue._record_stage(self.job_id, name, started=True)
+
+    def finish_stage(self, name: str, error: Optional[str] = None):
+        self.queue._record_stage(self.job_id, name, started=False, error=error)
+
+    def skip_stage(self, name: str):
+        self.queue._record_stage(self.job_id, name, started=False, skipped=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.start_stage(name)
+        try:
+            yield
+        except Exception as e:
+            self.finish_stage(name, error=str(e))
+            raise
+        self.finish_stage(name)
+
+
+class JobQueue:
+    """
+    Durable job queue backed by SQLite.
+
+    Jobs are persisted before enqueue() returns, so queued work survives a
+    restart. A job whose handler raises, or that was running when the process
+    died, is put back in the queue until it reaches max_attempts.
+    """
+
+    def __init__(self, handler: Callable[[Dict, JobContext], Dict], db_path: str = DEFAULT_DB_PATH,
+                 num_workers: int = 1, max_attempts: int = 2, poll_interval: float = 2.0,
+                 on_finish: Optional[Callable[[str, str, Optional[Dict], Optional[str]], None]] = None):
+        self.handler = handler
+        self.on_finish = on_finish  # called as on_finish(job_id, status, result, error) once the row is updated
+        self.db_path = db_path
+        self.num_workers = max(1, num_workers)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    stages TEXT NOT NULL DEFAULT '{}',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    # --- Public API ---
+    def enqueue(self, payload: Dict) -> str:
+        """Persist a new job and wake a worker. Returns the job ID."""
+        job_id = str(uuid.uuid4())
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, stage, payload, created_at) VALUES (?, 'queued', 'queued', ?, ?)",
+                (job_id, json.dumps(payload), _now()),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        if status and status not in JOB_STATUSES:
+            raise ValueError(f"Unknown job status '{status}' (expected one of: {', '.join(JOB_STATUSES)})")
+        query = "SELECT * FROM jobs"
+        params: List = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._row_to_job(row, include_result=False) for row in rows]
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Recover interrupted jobs and start the worker threads."""
+        if self._workers:
+            return
+        self._recover_interrupted_jobs()
+        self._stopping.clear()
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"🧵 Job queue started with {self.num_workers} worker(s) ({self.db_path})")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    # --- Internals ---
+    def _recover_interrupted_jobs(self):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', stage = 'failed', finished_at = ?, "
+                "error = 'Job interrupted too many times' WHERE status = 'running' AND attempts >= ?",
+                (_now(), self.max_attempts),
+            )
+            recovered = conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued' WHERE status = 'running'"
+            ).rowcount
+        if recovered:
+            logger.info(f"♻️ Re-queued {recovered} job(s) interrupted by a restart")
+
+    def _claim_next(self) -> Optional[Dict]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', stage = 'starting', started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (_now(), row["id"]),
+            )
+            # Hand the handler the claimed state (status, stage, attempts), not the queued row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return self._row_to_job(row)
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            job = self._claim_next()
+            if not job:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict):
+        logger.info(f"▶️ Running job {job['id']}")
+        try:
+            result = self.handler(job, JobContext(self, job))
+            self._finish(job["id"], "succeeded", result=result)
+            logger.info(f"✅ Job {job['id']} finished")
+        except Exception as e:
+            if job["attempts"] < self.max_attempts:
+                logger.warning(f"🔁 Job {job['id']} failed (attempt {job['attempts']}/{self.max_attempts}), "
+                               f"re-queued: {e}")
+                self._requeue(job["id"], error=str(e))
+                return
+            logger.error(f"❌ Job {job['id']} failed: {e}")
+            self._finish(job["id"], "failed", error=str(e))
+
+    def _requeue(self, job_id: str, error: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'queued', stage = 'queued', error = ? WHERE id = ?",
+                         (error, job_id))
+        self._wakeup.set()
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, status, json.dumps(result) if result is not None else None, error, _now(), job_id),
+            )
+        if self.on_finish:
+            try:
+                self.on_finish(job_id, status, result, error)
+            except Exception as e:
+                logger.warning(f"on_finish hook failed for job {job_id}: {e}")
+
+    def _record_stage(self, job_id: str, name: str, started: bool, error: Optional[str] = None,
+                      skipped: bool = False):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return
+            stages = json.loads(row["stages"] or "{}")
+            if started:
+                stages[name] = {"status": "running", "started_at": now}
+                conn.execute("UPDATE jobs SET stage = ?, stages = ? WHERE id = ?",
+                             (name, json.dumps(stages), job_id))
+                return
+            if skipped and name not in stages:
+                stages[name] = {"status": "skipped"}
+                conn.execute("UPDATE jobs SET stages = ? WHERE id = ?", (json.dumps(stages), job_id))
+                return
+            entry = stages.setdefault(name, {"started_at": now})
+            entry["finished_at"] = now
+            entry["duration_ms"] = round((now - entry["started_at"]) * 1000, 1)
+            entry["status"] = "failed" if error else "skipped" if skipped else "done"
+            if error:
+                entry["error"] = error
+            conn.execute("UPDATE jobs SET stages = ? WHERE id = ?", (json.dumps(stages), job_id))
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row, include_result: bool = True) -> Dict:
+        job = {
+            "id": row["id"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "payload": json.loads(row["payload"]),
+            "error": row["error"],
+            "stages": json.loads(row["stages"] or "{}"),
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
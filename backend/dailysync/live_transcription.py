@@ -0,0 +1,258 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from audio_decode import SAMPLE_RATE, StreamDecoder
+
+logger = logging.getLogger(__name__)
+
+MIN_NEW_AUDIO_S = 4.0      # wait for at least this much untranscribed audio before a pass
+STABILITY_MARGIN_S = 3.0   # segments ending this close to the live edge stay partial
+MAX_PENDING_S = 25.0       # force-finalize when the partial tail grows beyond this
+OVERLAP_S = 0.5            # already-finalized audio re-sent as context at the start of a pass
+SESSION_TTL_S = 3 * 3600
+KEEPALIVE_S = 15.0
+MAX_HISTORY = 2000         # events kept for replay per channel
+
+
+def format_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventChannel:
+    """
+    Fan-out of server-sent events to any number of subscribers. Past events are
+    replayed to late subscribers so a reconnecting client does not lose segments.
+
+    The replay history keeps the last `max_history` events. An event published
+    with latest_only=True (e.g. a partial transcript) supersedes the previous one
+    instead of accumulating, and is dropped once a regular event follows it.
+    """
+
+    def __init__(self, max_history: int = MAX_HISTORY):
+        self._history: deque = deque(maxlen=max_history)
+        self._latest: Optional[str] = None
+        self._subscribers: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def publish(self, event: str, data: Dict, latest_only: bool = False):
+        message = format_sse(event, data)
+        with self._lock:
+            if latest_only:
+                self._latest = message
+            else:
+                self._history.append(message)
+                self._latest = None
+            for subscriber in self._subscribers:
+                subscriber.put(message)
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            for subscriber in self._subscribers:
+                subscriber.put(None)
+
+    def subscribe(self) -> Iterator[str]:
+        subscriber: queue.Queue = queue.Queue()
+        with self._lock:
+            backlog = list(self._history) + ([self._latest] if self._latest else [])
+            if self.closed:
+                backlog.append(None)
+            else:
+                self._subscribers.append(subscriber)
+        try:
+            for message in backlog:
+                if message is None:
+                    return
+                yield message
+            while True:
+                try:
+                    message = subscriber.get(timeout=KEEPALIVE_S)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+
+class LiveSession:
+    def __init__(self, title: str):
+        self.id = str(uuid.uuid4())
+        self.title = title
+        self.channel = EventChannel()
+        self.decoder = StreamDecoder()
+        self.bytes_received = 0
+        self.next_seq = 0
+        self.out_of_order: Dict[int, bytes] = {}
+        self.finalized_samples = 0
+        self.segments: List[Dict] = []
+        self.partial_text = ""
+        self.lock = threading.Lock()
+        self.pass_running = False
+        self.pass_requested = False
+        self.finished = False
+        self.updated_at = time.time()
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(s["text"] for s in self.segments).strip()
+
+
+class LiveTranscriptionManager:
+    """
+    Incremental transcription of audio that arrives in timesliced chunks.
+
+    MediaRecorder chunks are fragments of one WebM stream, so each session feeds
+    them in order to one long-running decoder. A pass transcribes only the audio
+    after the last finalized segment (plus a short overlap for context), and PCM
+    before that point is released. Segments that end well before the live edge
+    are finalized; the rest is published as a partial transcript.
+    """
+
+    def __init__(self, engine, max_concurrent_passes: int = 2):
+        self.engine = engine
+        self.sessions: Dict[str, LiveSession] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_passes, thread_name_prefix="live-pass")
+
+    def create_session(self, title: str) -> LiveSession:
+        self._expire_idle_sessions()
+        session = LiveSession(title)
+        with self._lock:
+            self.sessions[session.id] = session
+        logger.info(f"🎙️ Live session {session.id} started: {title}")
+        return session
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        return self.sessions.get(session_id)
+
+    def add_chunk(self, session: LiveSession, data: bytes, seq: Optional[int] = None):
+        """Append a chunk (reordering by sequence number) and schedule a transcription pass."""
+        with session.lock:
+            if session.finished:
+                raise ValueError("Session already finished")
+            if seq is None:
+                seq = session.next_seq
+            session.out_of_order[seq] = data
+            while session.next_seq in session.out_of_order:
+                chunk = session.out_of_order.pop(session.next_seq)
+                session.decoder.feed(chunk)
+                session.bytes_received += len(chunk)
+                session.next_seq += 1
+            session.updated_at = time.time()
+        self._schedule_pass(session)
+
+    def finish(self, session: LiveSession) -> Dict:
+        """Transcribe whatever is left, publish the final transcript and close the event stream."""
+        with session.lock:
+            session.finished = True
+        # Wait for an in-flight pass so the final pass sees a consistent state
+        while session.pass_running:
+            time.sleep(0.1)
+        try:
+            self._run_pass(session, final=True)
+        except Exception as e:
+            logger.error(f"Final live pass failed for {session.id}: {e}")
+            session.channel.publish("error", {"message": str(e)})
+        finally:
+            session.decoder.close()
+        result = {"text": session.transcript, "segments": session.segments}
+        session.channel.publish("final", result)
+        session.channel.close()
+        with self._lock:
+            self.sessions.pop(session.id, None)
+        return result
+
+    # --- Internals ---
+    def _schedule_pass(self, session: LiveSession):
+        with session.lock:
+            if session.pass_running:
+                session.pass_requested = True
+                return
+            session.pass_running = True
+        self._executor.submit(self._pass_loop, session)
+
+    def _pass_loop(self, session: LiveSession):
+        while True:
+            try:
+                self._run_pass(session, final=False)
+            except Exception as e:
+                # Decoding a truncated stream can fail transiently; the next chunk retries
+                logger.warning(f"Live pass failed for {session.id}: {e}")
+            with session.lock:
+                if not session.pass_requested or session.finished:
+                    session.pass_running = False
+                    return
+                session.pass_requested = False
+
+    def _run_pass(self, session: LiveSession, final: bool):
+        if final:
+            session.decoder.finish()
+        with session.lock:
+            start_sample = session.finalized_samples
+        tail_s = (session.decoder.decoded_samples - start_sample) / SAMPLE_RATE
+        if not final and tail_s < MIN_NEW_AUDIO_S:
+            return
+        if tail_s <= 0:
+            return
+
+        # Segment times below are relative to the window, which starts OVERLAP_S before the finalized audio
+        window_start = max(0, start_sample - int(OVERLAP_S * SAMPLE_RATE))
+        audio = session.decoder.samples(window_start)
+        overlap_s = (start_sample - window_start) / SAMPLE_RATE
+        window_s = len(audio) / SAMPLE_RATE
+        result = self.engine.transcribe(audio)
+        offset_s = window_start / SAMPLE_RATE
+        stable_until = window_s if final or tail_s > MAX_PENDING_S else window_s - STABILITY_MARGIN_S
+
+        finalized_end = None
+        partial = []
+        for segment in result.get("segments", []):
+            text = segment.get("text", "").strip()
+            # Speech mostly inside the overlap was finalized by the previous pass
+            if not text or (segment["start"] + segment["end"]) / 2 < overlap_s:
+                continue
+            if segment["end"] <= stable_until and not partial:
+                entry = {
+                    "id": len(session.segments),
+                    "start": round(offset_s + segment["start"], 2),
+                    "end": round(offset_s + segment["end"], 2),
+                    "text": text,
+                }
+                session.segments.append(entry)
+                session.channel.publish("segment", entry)
+                finalized_end = segment["end"]
+            else:
+                partial.append(text)
+        if finalized_end is None and not partial:
+            # Nothing but silence: skip it, so long pauses do not make every later pass bigger
+            finalized_end = max(overlap_s, stable_until)
+
+        with session.lock:
+            if finalized_end is not None:
+                session.finalized_samples = max(start_sample, window_start + int(finalized_end * SAMPLE_RATE))
+            session.partial_text = " ".join(partial)
+        session.decoder.discard(session.finalized_samples - int(OVERLAP_S * SAMPLE_RATE))
+        if not final:
+            session.channel.publish("partial", {"text": session.partial_text, "start": round(offset_s + overlap_s, 2)},
+                                    latest_only=True)
+
+    def _expire_idle_sessions(self):
+        cutoff = time.time() - SESSION_TTL_S
+        with self._lock:
+            for session_id in [sid for sid, s in self.sessions.items() if s.updated_at < cutoff]:
+                self.sessions[session_id].channel.close()
+                self.sessions[session_id].decoder.close()
+                del self.sessions[session_id]
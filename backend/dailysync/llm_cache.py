@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "llm_cache.db")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_S = 24 * 3600.0
+
+
+def normalize_prompt(prompt) -> str:
+    """Collapse whitespace so indentation or trailing-space edits do not miss the cache."""
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, sort_keys=True, default=str)
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def cache_key(model_name: str, template: str, prompt, generation_config: Optional[Dict] = None) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, template, json.dumps(generation_config or {}, sort_keys=True, default=str),
+                 normalize_prompt(prompt)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM response text, shared by every Gemini call site.
+
+    Entries expire after their TTL and are evicted least-recently-used first
+    once the stored text exceeds max_bytes. Counters are persisted so /llm-cache/stats
+    reflects every process using the same database.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 default_ttl_s: float = DEFAULT_TTL_S, enabled: bool = True):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.default_ttl_s = default_ttl_s
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_template ON responses (template)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: float = 1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def count_bypass(self):
+        with self._lock, self._connect() as conn:
+            self._bump(conn, "bypassed")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT response, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and row[1] is not None and row[1] < now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bump(conn, "expired")
+                row = None
+            if not row:
+                self._bump(conn, "misses")
+                return None
+            conn.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._bump(conn, "hits")
+        return row[0]
+
+    def put(self, key: str, model_name: str, template: str, response: str, ttl_s: Optional[float] = None):
+        size = len(response.encode())
+        if size > self.max_bytes:
+            return
+        ttl_s = self.default_ttl_s if ttl_s is None else ttl_s
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, template, response, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, template, response, size, now, now + ttl_s if ttl_s else None, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump(conn, "evictions", evicted)
+
+    def invalidate(self, template: Optional[str] = None, model_name: Optional[str] = None,
+                   key: Optional[str] = None) -> int:
+        """Drop matching entries (all of them when no filter is given). Returns the number removed."""
+        clauses, params = [], []
+        for column, value in (("template", template), ("model", model_name), ("key", key)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        query = "DELETE FROM responses" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self._lock, self._connect() as conn:
+            removed = conn.execute(query, params).rowcount
+        logger.info(f"🧹 Invalidated {removed} cached LLM response(s)")
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            by_template = dict(conn.execute("SELECT template, COUNT(*) FROM responses GROUP BY template").fetchall())
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "entries_by_template": by_template,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.default_ttl_s,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "bypassed": int(counters.get("bypassed", 0)),
+            "expired": int(counters.get("expired", 0)),
+            "evictions": int(counters.get("evictions", 0)),
+        }
+
+
+class CachedResponse:
+    """Stand-in for a Gemini response served from the cache; callers only read `.text`."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.cached = True
+
+
+class CachedModel:
+    """
+    Wraps a `genai.GenerativeModel` and serves `generate_content` from the cache.
+
+    `template` names the prompt (with its version, e.g. "standup:v1"); bump the
+    version when a prompt changes so stale responses are not reused. Use
+    `with_template()` to hand a call site its own view of the same model and cache.
+    """
+
+    def __init__(self, model, model_name: str, cache: Optional[LLMResponseCache] = None,
+                 template: str = "default:v1", ttl_s: Optional[float] = None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or get_default_cache()
+        self.template = template
+        self.ttl_s = ttl_s
+
+    def with_template(self, template: str, ttl_s: Optional[float] = None) -> "CachedModel":
+        return CachedModel(self.model, self.model_name, self.cache, template, self.ttl_s if ttl_s is None else ttl_s)
+
+    def generate_content(self, contents, generation_config=None, bypass_cache: bool = False, **kwargs):
+        if not self.cache.enabled or bypass_cache or kwargs.get("stream"):
+            if self.cache.enabled:
+                self.cache.count_bypass()
+            return self.model.generate_content(contents, generation_config=generation_config, **kwargs)
+
+        key = cache_key(self.model_name, self.template, contents, generation_config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"⚡ LLM cache hit ({self.template})")
+            return CachedResponse(cached)
+
+        response = self.model.generate_content(contents, generation_config=generation_config, **kwargs)
+        try:
+            text = response.text
+        except Exception:
+            return response  # blocked or empty responses are not cached
+        self.cache.put(key, self.model_name, self.template, text, self.ttl_s)
+        return response
+
+    def stream_text(self, contents, generation_config=None, bypass_cache: bool = False, **kwargs) -> Iterator[str]:
+        """
+        Yield the response text as it is generated. A cache hit is yielded in one
+        piece; a fully streamed response is cached like a generate_content() result.
+        """
+        key = cache_key(self.model_name, self.template, contents, generation_config)
+        if self.cache.enabled and not bypass_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"⚡ LLM cache hit ({self.template})")
+                yield cached
+                return
+        elif self.cache.enabled:
+            self.cache.count_bypass()
+
+        if hasattr(self.model, "stream_text"):
+            pieces = self.model.stream_text(contents, generation_config=generation_config, **kwargs)
+        else:
+            pieces = (chunk.text for chunk in
+                      self.model.generate_content(contents, generation_config=generation_config, stream=True, **kwargs))
+        text = []
+        for piece in pieces:
+            text.append(piece)
+            yield piece
+        if self.cache.enabled and text:
+            self.cache.put(key, self.model_name, self.template, "".join(text), self.ttl_s)
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMResponseCache:
+    """Process-wide cache configured from LLM_CACHE_* environment variables."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                db_path=os.getenv("LLM_CACHE_PATH", DEFAULT_DB_PATH),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                default_ttl_s=float(os.getenv("LLM_CACHE_TTL_S", str(DEFAULT_TTL_S))),
+                enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+            )
+        return _default_cache
@@ -0,0 +1,457 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Deque, Dict, Iterator, Optional
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Import google-generativeai with error handling
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+    genai = None
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    RETRYABLE_EXCEPTIONS = (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:
+    google_exceptions = None
+    RETRYABLE_EXCEPTIONS = ()
+
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = 800   # reserved per call until the real usage is known
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+SAMPLE_WINDOW = 500
+HISTOGRAM_BOUNDS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised when a Gemini call still fails after all retries."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    if RETRYABLE_EXCEPTIONS and isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int) and code in RETRYABLE_CODES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ("429", "quota", "resource has been exhausted", "503", "unavailable"))
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "exhausted" in message
+
+
+def _estimate_tokens(contents) -> int:
+    return len(str(contents)) // CHARS_PER_TOKEN + 1
+
+
+def _percentile(samples, pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+class LatencyHistogram:
+    """Cumulative latency counts per bucket (upper bound in ms; "+Inf" catches the rest)."""
+
+    def __init__(self, bounds_ms=HISTOGRAM_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self._counts = [0] * (len(bounds_ms) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float):
+        index = next((i for i, bound in enumerate(self.bounds_ms) if ms <= bound), len(self.bounds_ms))
+        with self._lock:
+            self._counts[index] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f"<={bound}" for bound in self.bounds_ms] + ["+Inf"]
+        return dict(zip(labels, counts))
+
+
+class ClientModel:
+    """Drop-in for `genai.GenerativeModel` whose calls go through the shared LLMClient."""
+
+    def __init__(self, client: "LLMClient", model_name: str):
+        self.client = client
+        self.model_name = model_name
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        return self.client.generate(self.model_name, contents, generation_config=generation_config, **kwargs)
+
+    def stream_text(self, contents, generation_config=None, **kwargs) -> Iterator[str]:
+        return self.client.stream(self.model_name, contents, generation_config=generation_config, **kwargs)
+
+
+class LLMClient:
+    """
+    Process-wide Gemini client.
+
+    Every call waits for a concurrency slot and for the requests-per-minute and
+    tokens-per-minute buckets, then runs with jittered exponential backoff on
+    retryable errors (quota, 5xx, timeouts). Token reservations are corrected
+    with the real usage reported by the API.
+
+    Calls made with hedge=True are hedged when hedging is enabled: if no response
+    (or, for streams, no first token) arrives within the hedge_percentile of recent
+    latency for that model, a duplicate request is sent and the first to answer
+    wins. hedge_max_rate caps the share of calls that get a duplicate.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, rpm: int = 15, tpm: int = 1_000_000,
+                 max_concurrency: int = 4, max_retries: int = 4, base_delay_s: float = 1.0,
+                 max_delay_s: float = 30.0, hedge_enabled: bool = False, hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20, hedge_default_delay_s: float = 10.0, hedge_min_delay_s: float = 1.0,
+                 hedge_max_rate: float = 0.1):
+        if not GEMINI_AVAILABLE:
+            raise RuntimeError("google-generativeai package not available")
+        if api_key:
+            genai.configure(api_key=api_key)
+        self.requests_bucket = TokenBucket.per_minute(rpm)
+        self.tokens_bucket = TokenBucket.per_minute(tpm)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._queue_wait_ms: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._latency_ms: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._first_token_ms: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._stats = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "rate_limited": 0,
+                       "tokens": 0, "in_flight": 0, "waiting": 0,
+                       "hedge_eligible": 0, "hedges": 0, "hedge_wins": 0, "hedges_skipped": 0}
+
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay_s = hedge_default_delay_s
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.hedge_max_rate = hedge_max_rate
+        # Successful-call latency per model, which sets each model's hedge delay
+        self._model_latency_ms: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+        self._model_first_token_ms: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+        self._attempt_histogram = LatencyHistogram()
+        self._request_histogram = LatencyHistogram()
+        self._hedged_histogram = LatencyHistogram()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="llm-hedge")
+
+    def model(self, model_name: str) -> ClientModel:
+        return ClientModel(self, model_name)
+
+    def _genai_model(self, model_name: str):
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def _bump(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from concurrent callers instead of synchronising them
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+    def generate(self, model_name: str, contents, hedge: bool = False, **kwargs):
+        started = time.monotonic()
+        if hedge and self.hedge_enabled:
+            response = self._generate_hedged(model_name, contents, **kwargs)
+        else:
+            response = self._generate(model_name, contents, **kwargs)
+        self._request_histogram.observe((time.monotonic() - started) * 1000)
+        return response
+
+    def _generate(self, model_name: str, contents, **kwargs):
+        model = self._genai_model(model_name)
+        reserved = _estimate_tokens(contents) + EXPECTED_OUTPUT_TOKENS
+        self._bump("calls")
+        last_error: Optional[BaseException] = None
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(reserved)
+            started = time.monotonic()
+            self._bump("in_flight")
+            try:
+                response = model.generate_content(contents, **kwargs)
+            except Exception as e:
+                last_error = e
+                retryable = is_retryable(e)
+                if is_rate_limit(e):
+                    self._bump("rate_limited")
+                if not retryable or attempt == self.max_retries:
+                    break
+                delay = self._backoff(attempt)
+                self._bump("retries")
+                logger.warning(f"⏳ Gemini {model_name} call failed ({e}); retry {attempt + 1}/{self.max_retries} "
+                               f"in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            finally:
+                self._bump("in_flight", -1)
+                self._record_attempt((time.monotonic() - started) * 1000)
+                self._slots.release()
+
+            self._model_latency_ms[model_name].append((time.monotonic() - started) * 1000)
+            self._settle_tokens(response, reserved)
+            self._bump("succeeded")
+            return response
+
+        self._bump("failed")
+        raise LLMUnavailable(f"Gemini {model_name} call failed after {attempt + 1} attempt(s): {last_error}") from last_error
+
+    def _wait_for_slot(self, reserved: int):
+        queued = time.monotonic()
+        self._bump("waiting")
+        try:
+            self._slots.acquire()
+            self.requests_bucket.acquire()
+            self.tokens_bucket.acquire(reserved)
+        finally:
+            self._bump("waiting", -1)
+        self._queue_wait_ms.append((time.monotonic() - queued) * 1000)
+
+    def stream(self, model_name: str, contents, hedge: bool = False, **kwargs) -> Iterator[str]:
+        """
+        Streaming variant of generate(): yields text pieces as Gemini produces them.
+        The concurrency slot is held until the stream ends; a failure is retried
+        only while nothing has been yielded yet.
+        """
+        if hedge and self.hedge_enabled:
+            return self._stream_hedged(model_name, contents, **kwargs)
+        return self._stream(model_name, contents, **kwargs)
+
+    def _stream(self, model_name: str, contents, **kwargs) -> Iterator[str]:
+        model = self._genai_model(model_name)
+        reserved = _estimate_tokens(contents) + EXPECTED_OUTPUT_TOKENS
+        self._bump("calls")
+        last_error: Optional[BaseException] = None
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(reserved)
+            started = time.monotonic()
+            self._bump("in_flight")
+            yielded = False
+            response = None
+            try:
+                response = model.generate_content(contents, stream=True, **kwargs)
+                for chunk in response:
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        if not yielded:
+                            first_token_ms = (time.monotonic() - started) * 1000
+                            self._first_token_ms.append(first_token_ms)
+                            self._model_first_token_ms[model_name].append(first_token_ms)
+                        yielded = True
+                        yield text
+            except Exception as e:
+                last_error = e
+                if is_rate_limit(e):
+                    self._bump("rate_limited")
+                if yielded or not is_retryable(e) or attempt == self.max_retries:
+                    break
+                delay = self._backoff(attempt)
+                self._bump("retries")
+                logger.warning(f"⏳ Gemini {model_name} stream failed ({e}); retry {attempt + 1}/{self.max_retries} "
+                               f"in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            finally:
+                self._bump("in_flight", -1)
+                self._record_attempt((time.monotonic() - started) * 1000)
+                self._slots.release()
+
+            self._settle_tokens(response, reserved)
+            self._bump("succeeded")
+            return
+
+        self._bump("failed")
+        raise LLMUnavailable(f"Gemini {model_name} stream failed after {attempt + 1} attempt(s): {last_error}") from last_error
+
+    def _record_attempt(self, ms: float):
+        self._latency_ms.append(ms)
+        self._attempt_histogram.observe(ms)
+
+    def hedge_delay_s(self, model_name: str, first_token: bool = False) -> float:
+        """How long to wait before hedging: the hedge_percentile of recent latency for this model."""
+        samples = (self._model_first_token_ms if first_token else self._model_latency_ms)[model_name]
+        if len(samples) < self.hedge_min_samples:
+            return self.hedge_default_delay_s
+        return max(self.hedge_min_delay_s, _percentile(samples, self.hedge_percentile / 100.0) / 1000.0)
+
+    def _may_hedge(self) -> bool:
+        """A duplicate is only worth sending when it can start right away and the hedge budget allows it."""
+        with self._lock:
+            eligible, hedges, in_flight = self._stats["hedge_eligible"], self._stats["hedges"], self._stats["in_flight"]
+        within_rate = hedges < max(1.0, eligible * self.hedge_max_rate)
+        has_capacity = in_flight < self.max_concurrency and self.requests_bucket.available >= 1
+        if not (within_rate and has_capacity):
+            self._bump("hedges_skipped")
+            return False
+        self._bump("hedges")
+        return True
+
+    def _generate_hedged(self, model_name: str, contents, **kwargs):
+        delay = self.hedge_delay_s(model_name)
+        started = time.monotonic()
+        self._bump("hedge_eligible")
+        primary = self._hedge_pool.submit(self._generate, model_name, contents, **kwargs)
+        futures = [primary]
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._may_hedge():
+            logger.info(f"🪃 Hedging Gemini {model_name} call after {delay:.1f}s")
+            futures.append(self._hedge_pool.submit(self._generate, model_name, contents, **kwargs))
+
+        winner, error = None, None
+        for future in as_completed(futures):
+            if future.exception() is None:
+                winner = future
+                break
+            error = future.exception()
+        # A request already in flight cannot be recalled; its response is simply discarded
+        for future in futures:
+            if future is not winner:
+                future.cancel()
+        if len(futures) > 1:
+            self._hedged_histogram.observe((time.monotonic() - started) * 1000)
+        if winner is None:
+            raise error
+        if winner is not primary:
+            self._bump("hedge_wins")
+        return winner.result()
+
+    def _stream_hedged(self, model_name: str, contents, **kwargs) -> Iterator[str]:
+        """Hedge on time to first token; the losing stream is closed, which drops its connection."""
+        delay = self.hedge_delay_s(model_name, first_token=True)
+        started = time.monotonic()
+        self._bump("hedge_eligible")
+        firsts: queue.Queue = queue.Queue()
+
+        def launch(label: str):
+            stream = self._stream(model_name, contents, **kwargs)
+
+            def first_piece():
+                try:
+                    firsts.put((label, stream, next(stream), None))
+                except StopIteration:
+                    firsts.put((label, stream, None, None))
+                except Exception as e:
+                    firsts.put((label, stream, None, e))
+
+            threading.Thread(target=first_piece, name=f"llm-hedge-{label}", daemon=True).start()
+
+        launch("primary")
+        pending = 1
+        try:
+            label, stream, first, error = firsts.get(timeout=delay)
+        except queue.Empty:
+            if self._may_hedge():
+                logger.info(f"🪃 Hedging Gemini {model_name} stream after {delay:.1f}s without a first token")
+                launch("hedge")
+                pending += 1
+            label, stream, first, error = firsts.get()
+        pending -= 1
+        if error is not None and pending:
+            label, stream, first, error = firsts.get()
+            pending -= 1
+        if pending:
+            def close_loser():
+                loser = firsts.get()[1]
+                loser.close()
+
+            threading.Thread(target=close_loser, name="llm-hedge-close", daemon=True).start()
+            self._hedged_histogram.observe((time.monotonic() - started) * 1000)
+        if error is not None:
+            raise error
+        if label == "hedge":
+            self._bump("hedge_wins")
+
+        def pieces():
+            if first is not None:
+                yield first
+                yield from stream
+        return pieces()
+
+    def _settle_tokens(self, response, reserved: int):
+        usage = getattr(response, "usage_metadata", None)
+        used = getattr(usage, "total_token_count", None) if usage else None
+        if not used:
+            self._bump("tokens", reserved)
+            return
+        self._bump("tokens", used)
+        self.tokens_bucket.adjust(reserved - used)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "max_concurrency": self.max_concurrency,
+            "rpm_available": round(self.requests_bucket.available, 1),
+            "tpm_available": int(self.tokens_bucket.available),
+            "queue_wait_ms": {"p50": _percentile(self._queue_wait_ms, 0.5), "p95": _percentile(self._queue_wait_ms, 0.95),
+                              "max": round(max(self._queue_wait_ms), 1) if self._queue_wait_ms else None},
+            "latency_ms": {"p50": _percentile(self._latency_ms, 0.5), "p95": _percentile(self._latency_ms, 0.95),
+                           "max": round(max(self._latency_ms), 1) if self._latency_ms else None},
+            "stream_first_token_ms": {"p50": _percentile(self._first_token_ms, 0.5),
+                                      "p95": _percentile(self._first_token_ms, 0.95)},
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "percentile": self.hedge_percentile,
+                "max_rate": self.hedge_max_rate,
+                "hedge_rate": round(stats["hedges"] / stats["hedge_eligible"], 3) if stats["hedge_eligible"] else 0.0,
+                "delay_s": {name: round(self.hedge_delay_s(name), 2) for name in list(self._model_latency_ms)},
+            },
+            "histograms_ms": {
+                "attempts": self._attempt_histogram.snapshot(),
+                "requests": self._request_histogram.snapshot(),
+                "hedged_requests": self._hedged_histogram.snapshot(),
+            },
+        })
+        return stats
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """The process-wide client, configured from GEMINI_* environment variables."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(
+                api_key=os.getenv("GEMINI_API_KEY"),
+                rpm=int(os.getenv("GEMINI_RPM", "15")),
+                tpm=int(os.getenv("GEMINI_TPM", "1000000")),
+                max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+                max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "4")),
+                hedge_enabled=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+                hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+                hedge_default_delay_s=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_S", "10")),
+                hedge_max_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1")),
+            )
+        return _client
@@ -0,0 +1,118 @@
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from llm_cache import CachedModel
+from llm_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# Ordered cheapest/fastest -> most capable. Only the standard tier is configured by default, so every call
+# uses the app's existing model until lite/pro are opted into with LLM_MODEL_TIERS="lite=...,pro=..."
+TIER_ORDER = ["lite", "standard", "pro"]
+DEFAULT_TIERS = {
+    "lite": "",
+    "standard": "gemini-2.0-flash",
+    "pro": "",
+}
+# Starting tier per task before size and budget adjustments
+TASK_TIERS = {
+    "standup": "lite",
+    "sentiment": "lite",
+    "prioritization": "standard",
+    "summary": "standard",
+}
+BUDGETS = ("fast", "balanced", "accurate")   # same hints as the Whisper model choice
+DEFAULT_SMALL_PROMPT_TOKENS = 1500
+DEFAULT_LARGE_PROMPT_TOKENS = 30000
+# Tasks whose output quality depends on reasoning over a long prompt
+SIZE_SENSITIVE_TASKS = {"summary", "prioritization"}
+
+
+def parse_tiers(value: Optional[str]) -> Dict[str, str]:
+    """
+    Parse "lite=model-a,pro=model-b" on top of the defaults. An empty model
+    ("pro=") disables a tier; unknown tier names are ignored.
+    """
+    tiers = dict(DEFAULT_TIERS)
+    for part in (value or "").split(","):
+        tier, _, model = part.partition("=")
+        if tier.strip() in TIER_ORDER:
+            tiers[tier.strip()] = model.strip()
+    if not tiers.get("standard"):
+        tiers["standard"] = DEFAULT_TIERS["standard"]
+    return tiers
+
+
+class LLMRouter:
+    """
+    Picks the Gemini model for one call from the task, the prompt size and a
+    latency/cost budget. Every decision is returned as a dict so callers can
+    record it next to the result.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, str]] = None, default_budget: str = "balanced",
+                 small_prompt_tokens: int = DEFAULT_SMALL_PROMPT_TOKENS,
+                 large_prompt_tokens: int = DEFAULT_LARGE_PROMPT_TOKENS):
+        self.tiers = tiers or dict(DEFAULT_TIERS)
+        self.default_budget = default_budget if default_budget in BUDGETS else "balanced"
+        self.small_prompt_tokens = small_prompt_tokens
+        self.large_prompt_tokens = large_prompt_tokens
+
+    def route(self, task: str, prompt_tokens: int, budget: Optional[str] = None) -> Dict:
+        budget = (budget or "").lower()
+        budget = budget if budget in BUDGETS else self.default_budget
+        start = TASK_TIERS.get(task, "standard")
+        index = TIER_ORDER.index(start)
+        reason = f"{task} starts at {start}"
+
+        if task in SIZE_SENSITIVE_TASKS and prompt_tokens >= self.large_prompt_tokens:
+            index += 1
+            reason += f", long prompt (~{prompt_tokens} tokens)"
+        elif task in SIZE_SENSITIVE_TASKS and prompt_tokens <= self.small_prompt_tokens:
+            index -= 1
+            reason += f", short prompt (~{prompt_tokens} tokens)"
+        if budget == "fast":
+            index -= 1
+            reason += ", budget=fast"
+        elif budget == "accurate":
+            index += 1
+            reason += ", budget=accurate"
+
+        index = max(0, min(index, len(TIER_ORDER) - 1))
+        # Fall back to the nearest configured tier (a tier can be disabled with "pro=")
+        configured = [i for i, tier in enumerate(TIER_ORDER) if self.tiers.get(tier)]
+        index = min(configured, key=lambda i: (abs(i - index), i))
+        tier = TIER_ORDER[index]
+        return {
+            "task": task,
+            "tier": tier,
+            "model": self.tiers[tier],
+            "prompt_tokens": prompt_tokens,
+            "budget": budget,
+            "reason": reason,
+        }
+
+    def model_for(self, task: str, prompt_tokens: int, template: str, budget: Optional[str] = None,
+                  client=None) -> Tuple[CachedModel, Dict]:
+        """Route one call and return (cached model for the chosen tier, routing decision)."""
+        decision = self.route(task, prompt_tokens, budget)
+        logger.info(f"🧭 {task}: {decision['model']} ({decision['reason']})")
+        client = client or get_client()
+        return CachedModel(client.model(decision["model"]), decision["model"], template=template), decision
+
+
+_router: Optional[LLMRouter] = None
+
+
+def get_router() -> LLMRouter:
+    """The process-wide router, configured from LLM_MODEL_TIERS / LLM_ROUTING_* environment variables."""
+    global _router
+    if _router is None:
+        _router = LLMRouter(
+            tiers=parse_tiers(os.getenv("LLM_MODEL_TIERS")),
+            default_budget=os.getenv("LLM_ROUTING_BUDGET", "balanced"),
+            small_prompt_tokens=int(os.getenv("LLM_ROUTING_SMALL_TOKENS", str(DEFAULT_SMALL_PROMPT_TOKENS))),
+            large_prompt_tokens=int(os.getenv("LLM_ROUTING_LARGE_TOKENS", str(DEFAULT_LARGE_PROMPT_TOKENS))),
+        )
+    return _router
@@ -0,0 +1,179 @@
+import logging
+import re
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from audio_decode import SAMPLE_RATE, duration_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_S = 120.0     # target length of one chunk
+DEFAULT_OVERLAP_S = 4.0      # audio shared by neighbouring chunks, centred on the cut
+SILENCE_SEARCH_S = 15.0      # how far from the target a cut may move to land on silence
+FRAME_S = 0.03
+MAX_SEAM_WORDS = 8           # longest repeated run removed at a seam
+
+
+def frame_energy(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_s: float = FRAME_S) -> np.ndarray:
+    """RMS energy per fixed-size frame."""
+    frame = int(sample_rate * frame_s)
+    count = len(audio) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def find_split_points(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                      window_s: float = DEFAULT_WINDOW_S, search_s: float = SILENCE_SEARCH_S) -> List[int]:
+    """
+    Pick cut positions (in samples) roughly every `window_s` seconds, each moved to
+    the quietest ~300 ms stretch within `search_s` of the target so cuts fall
+    between words rather than inside them.
+    """
+    energy = frame_energy(audio, sample_rate)
+    if len(energy) == 0:
+        return []
+    smoothed = np.convolve(energy, np.ones(10) / 10, mode="same")
+    frame = int(sample_rate * FRAME_S)
+    total_s = duration_seconds(audio, sample_rate)
+
+    cuts: List[int] = []
+    last_cut_s = 0.0
+    target_s = window_s
+    while target_s < total_s - search_s:
+        lo = max(int((last_cut_s + 1.0) / FRAME_S), int((target_s - search_s) / FRAME_S))
+        hi = min(len(smoothed), int((target_s + search_s) / FRAME_S))
+        if hi <= lo:
+            break
+        best = lo + int(np.argmin(smoothed[lo:hi]))
+        cut = best * frame + frame // 2
+        cuts.append(cut)
+        last_cut_s = cut / sample_rate
+        target_s = last_cut_s + window_s
+    return cuts
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _seam_overlap(previous: List[Dict], current: List[Dict]) -> int:
+    """Length of the longest run at the end of `previous` repeated at the start of `current`."""
+    tail = [_normalize_word(w["word"]) for w in previous[-MAX_SEAM_WORDS:]]
+    head = [_normalize_word(w["word"]) for w in current[:MAX_SEAM_WORDS]]
+    for n in range(min(len(tail), len(head)), 0, -1):
+        if tail[-n:] == head[:n]:
+            return n
+    return 0
+
+
+def _window_words(result: Dict, offset_s: float, keep_from_s: float, keep_to_s: float) -> List[Dict]:
+    """
+    Flatten a window's result into words with absolute timestamps, keeping only
+    those that start inside [keep_from_s, keep_to_s). Segments without word
+    timings are treated as one word spanning the segment.
+    """
+    words = []
+    for seg_index, segment in enumerate(result.get("segments", [])):
+        seg_words = segment.get("words") or [
+            {"word": segment.get("text", ""), "start": segment["start"], "end": segment["end"]}
+        ]
+        for w in seg_words:
+            start = offset_s + w["start"]
+            if keep_from_s <= start < keep_to_s:
+                words.append({
+                    "word": w["word"],
+                    "start": round(start, 2),
+                    "end": round(offset_s + w["end"], 2),
+                    "segment": seg_index,
+                })
+    return words
+
+
+def stitch_windows(results: List[Dict], windows: List[Tuple[int, int]], cuts: List[int],
+                   sample_rate: int = SAMPLE_RATE) -> Dict:
+    """
+    Merge per-window results into one transcript. Each cut point decides which
+    window owns the overlapping audio; any words still repeated across a seam
+    are dropped from the later window.
+    """
+    bounds = [0.0] + [c / sample_rate for c in cuts] + [float("inf")]
+    segments: List[Dict] = []
+    all_words: List[Dict] = []
+    removed_at_seams = 0
+
+    for i, (result, (win_start, _)) in enumerate(zip(results, windows)):
+        words = _window_words(result, win_start / sample_rate, bounds[i], bounds[i + 1])
+        if all_words and words:
+            duplicated = _seam_overlap(all_words, words)
+            removed_at_seams += duplicated
+            words = words[duplicated:]
+        all_words.extend(words)
+
+        # Rebuild segments from the surviving words, keeping Whisper's segment grouping
+        current_key, current = None, []
+        for w in words + [None]:
+            key = w["segment"] if w else None
+            if current and key != current_key:
+                segments.append({
+                    "start": current[0]["start"],
+                    "end": current[-1]["end"],
+                    "text": "".join(x["word"] for x in current).strip(),
+                })
+                current = []
+            if w:
+                current_key = key
+                current.append(w)
+
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+    return {
+        "text": " ".join(s["text"] for s in segments).strip(),
+        "segments": segments,
+        "language": results[0].get("language") if results else None,
+        "seam_words_removed": removed_at_seams,
+    }
+
+
+def transcribe_long_audio(engine, audio: np.ndarray, window_s: float = DEFAULT_WINDOW_S,
+                          overlap_s: float = DEFAULT_OVERLAP_S, benchmark: bool = False,
+                          **options) -> Dict:
+    """
+    Transcribe a long recording by splitting it at silences into overlapping
+    windows that run in parallel on the engine's worker processes.
+
+    With benchmark=True the same audio is also sent through a single
+    transcribe call so the speed-up can be reported.
+    """
+    cuts = find_split_points(audio, window_s=window_s)
+    half_overlap = int(overlap_s / 2 * SAMPLE_RATE)
+    bounds = [0] + cuts + [len(audio)]
+    windows = [
+        (max(0, bounds[i] - half_overlap), min(len(audio), bounds[i + 1] + half_overlap))
+        for i in range(len(bounds) - 1)
+    ]
+    logger.info(f"✂️ Long-audio mode: {duration_seconds(audio):.0f}s split into {len(windows)} window(s)")
+
+    started = time.time()
+    options.setdefault("word_timestamps", True)
+    futures = [engine.submit(audio[start:end], **options) for start, end in windows]
+    results = [f.result() for f in futures]
+    stitched = stitch_windows(results, windows, cuts)
+    chunked_s = time.time() - started
+
+    stitched["mode"] = "chunked"
+    stitched["chunks"] = len(windows)
+    stitched["timing"] = {"audio_s": round(duration_seconds(audio), 1), "chunked_s": round(chunked_s, 2)}
+
+    if benchmark:
+        started = time.time()
+        engine.transcribe(audio, **options)
+        single_s = time.time() - started
+        stitched["timing"]["single_s"] = round(single_s, 2)
+        stitched["timing"]["speedup"] = round(single_s / chunked_s, 2) if chunked_s else None
+        logger.info(f"⏱️ Chunked {chunked_s:.1f}s vs single call {single_s:.1f}s "
+                    f"(×{stitched['timing']['speedup']})")
+    return stitched
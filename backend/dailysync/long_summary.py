@@ -0,0 +1,184 @@
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from meeting_summary import JSON_GENERATION_CONFIG, parse_summary_response
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4             # rough average for English text
+DEFAULT_THRESHOLD_TOKENS = 30000
+DEFAULT_CHUNK_TOKENS = 8000
+OVERLAP_SENTENCES = 2           # repeated at each chunk start so items spanning a cut are not lost
+DUPLICATE_SIMILARITY = 0.8
+STOPWORDS = {"a", "an", "the", "to", "of", "for", "and", "on", "in", "with"}
+
+MAP_PROMPT = """
+This is part {index} of {total} of a long meeting transcript. Extract what matters from this part only, as JSON.
+
+Transcript part:
+{chunk}
+
+Required format:
+{{
+    "key_points": ["Short statement of something discussed or decided"],
+    "topics": ["topic1"],
+    "action_items": [{{"task": "Description of the task", "assignee": "Name of person assigned, or null"}}],
+    "important_details": ["Numbers, dates or other details worth keeping"]
+}}
+
+Rules: use null when no assignee is mentioned, do NOT include due dates, output ONLY valid JSON.
+"""
+
+REDUCE_PROMPT = """
+These are notes extracted from consecutive parts of one long meeting. Merge them into a single summary as JSON.
+
+Notes:
+{notes}
+
+Required format:
+{{
+    "summary": "A concise summary of the whole meeting",
+    "topics": ["topic1", "topic2"],
+    "action_items": [{{"task": "Description of the task", "assignee": "Name of person assigned, or null"}}],
+    "important_details": ["Decisions, numbers, dates or other details worth keeping"]
+}}
+
+Rules:
+1. Merge duplicate or overlapping topics, action items and details; keep the assignee when any part names one
+2. Keep every distinct action item
+3. Do NOT include due dates; output ONLY valid JSON
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_transcript(text: str, chunk_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """Pack sentences into chunks of at most `chunk_tokens`, overlapping by a couple of sentences."""
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    sentences: List[str] = []
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        # Whisper output without punctuation can produce one huge "sentence"
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for sentence in sentences:
+        if current and size + len(sentence) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current = current[-OVERLAP_SENTENCES:] if OVERLAP_SENTENCES else []
+            size = sum(len(s) + 1 for s in current)
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _task_tokens(task: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", task.lower())) - STOPWORDS
+
+
+def _same_task(a: set, b: set) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= DUPLICATE_SIMILARITY
+
+
+def same_task(a: str, b: str) -> bool:
+    """True when two action-item descriptions name the same task (token-set similarity)."""
+    return _same_task(_task_tokens(a), _task_tokens(b))
+
+
+def merge_partials(partials: List[Dict]) -> Dict:
+    """Deduplicate the per-chunk notes locally so the reduce prompt stays small."""
+    merged: Dict[str, List] = {"key_points": [], "topics": [], "action_items": [], "important_details": []}
+    seen = {"key_points": set(), "topics": set(), "important_details": set()}
+    task_tokens: List[set] = []
+    for partial in partials:
+        for field in seen:
+            for value in partial.get(field) or []:
+                normalized = " ".join(str(value).lower().split())
+                if normalized and normalized not in seen[field]:
+                    seen[field].add(normalized)
+                    merged[field].append(str(value))
+        for item in partial.get("action_items") or []:
+            if not isinstance(item, dict) or not item.get("task"):
+                continue
+            tokens = _task_tokens(item["task"])
+            match = next((i for i, existing in enumerate(task_tokens) if _same_task(existing, tokens)), None)
+            if match is None:
+                task_tokens.append(tokens)
+                merged["action_items"].append({"task": item["task"], "assignee": item.get("assignee")})
+            elif not merged["action_items"][match].get("assignee") and item.get("assignee"):
+                merged["action_items"][match]["assignee"] = item["assignee"]
+    return merged
+
+
+def _fallback_summary(merged: Dict) -> Dict:
+    """Used when the reduce call fails: the locally merged notes are still a usable summary."""
+    return {
+        "summary": " ".join(merged["key_points"][:5]),
+        "topics": merged["topics"],
+        "action_items": merged["action_items"],
+        "important_details": merged["important_details"],
+    }
+
+
+def summarize_map_reduce(model, transcript: str, chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                         max_workers: int = 4, hedge: bool = False) -> Tuple[Dict, int]:
+    """
+    Summarize a transcript too long for one prompt: extract notes from each chunk in
+    parallel, merge them locally, then run one reduce call that produces the usual
+    summary / topics / action_items / important_details JSON. With `hedge`, the
+    calls may be hedged by the shared LLM client (the slowest chunk sets the pace).
+
+    Returns (summary, number_of_chunks).
+    """
+    call_kwargs = {"hedge": True} if hedge else {}
+    chunks = split_transcript(transcript, chunk_tokens)
+    logger.info(f"🗂️ Map-reduce summary: ~{estimate_tokens(transcript)} tokens in {len(chunks)} chunk(s)")
+    map_model = model.with_template("meeting_summary_map:v1") if hasattr(model, "with_template") else model
+    reduce_model = model.with_template("meeting_summary_reduce:v1") if hasattr(model, "with_template") else model
+
+    def map_chunk(index: int, chunk: str) -> Dict:
+        try:
+            response = map_model.generate_content(
+                MAP_PROMPT.format(index=index + 1, total=len(chunks), chunk=chunk),
+                generation_config=JSON_GENERATION_CONFIG,
+                **call_kwargs,
+            )
+            return json.loads(re.sub(r"```(?:json)?", "", response.text, flags=re.IGNORECASE).strip())
+        except Exception as e:
+            # One bad chunk should not sink the whole summary
+            logger.error(f"Map step failed for chunk {index + 1}/{len(chunks)}: {e}")
+            return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary-map") as pool:
+        partials = list(pool.map(map_chunk, range(len(chunks)), chunks))
+    if not any(partials):
+        raise RuntimeError("Every map step of the map-reduce summary failed")
+
+    merged = merge_partials(partials)
+    try:
+        response = reduce_model.generate_content(
+            REDUCE_PROMPT.format(notes=json.dumps(merged, indent=1)),
+            generation_config=JSON_GENERATION_CONFIG,
+            **call_kwargs,
+        )
+        summary = parse_summary_response(response.text)
+    except Exception as e:
+        logger.error(f"Reduce step failed, using locally merged notes: {e}")
+        summary = parse_summary_response(json.dumps(_fallback_summary(merged)))
+    return summary, len(chunks)
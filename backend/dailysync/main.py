@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import json
 from dotenv import load_dotenv
 import requests
+from notion_mirror import get_notion_mirror
 
 load_dotenv()
 
@@ -18,6 +19,9 @@ NOTION_HEADERS = {
     "Notion-Version": "2022-06-28"
 }
 
+# Shared with the Flask app's mirror (same SQLite file), so a fresh copy is not re-fetched
+notion_mirror = get_notion_mirror()
+
 GITHUB_HEADERS = {
     "Authorization": f"Bearer {os.getenv('TOKEN_GITHUB')}",
     "Accept": "application/vnd.github+json"
@@ -64,15 +68,14 @@ def fetch_github_commits():
 
 def fetch_notion_tasks():
     """Get tasks from Notion grouped by assignee"""
-    url = f"https://api.notion.com/v1/databases/{os.getenv('DATABASE_ID')}/query"
-    response = requests.post(url, headers=NOTION_HEADERS)
-    
-    if response.status_code != 200:
-        print(f"❌ Notion API Error: {response.status_code}")
+    try:
+        pages = notion_mirror.tasks(os.getenv('DATABASE_ID'))
+    except Exception as e:
+        print(f"❌ Notion API Error: {e}")
         return {}
 
     tasks_by_user = {}
-    for page in response.json().get('results', []):
+    for page in pages:
         assignee = page['properties']['Assignee']['rich_text'][0]['text']['content']
         user_info = get_user_mapping(notion_name=assignee)
         
@@ -119,7 +122,8 @@ def generate_standup_summary():
     
     return summaries
 if __name__ == "__main__":
-    from summarize_llm import summarize_user_activity
+    from summarize_llm import model, summarize_user_activity
+    from standup_batch import summarize_standups
     from slack_sender import send_to_slack
     
     print("🔄 Gathering standup data...")
@@ -128,15 +132,13 @@ if __name__ == "__main__":
     if not standup_data:
         print("⚠️ No activity found for any mapped users")
     else:
-        print("📝 Generating summaries...")
-        final_summary = {}
-        for user, activities in standup_data.items():
-            print(f"  - Processing {user}'s activity")
-            if activities["commits"] or activities["tasks"]:
-                final_summary[user] = summarize_user_activity(
-                    activities["commits"],
-                    activities["tasks"]
-                )
+        print(f"📝 Generating summaries for {len(standup_data)} user(s)...")
+        # Batched: several users per Gemini call, per-user call for anyone missing from a reply
+        final_summary = summarize_standups(
+            model.with_template("standup_batch:v1"),
+            standup_data,
+            single=summarize_user_activity,
+        )
         
         if final_summary:
             print("📤 Sending to Slack...")
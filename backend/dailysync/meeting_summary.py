@@ -0,0 +1,122 @@
+import json
+import re
+from typing import Dict, List
+
+# One structured call replaces the old JSON + markdown pair; markdown and Slack text are rendered locally
+SUMMARY_PROMPT = """
+Analyze this meeting transcript and return a structured summary as JSON.
+
+Transcript:
+{transcript}
+
+Required format:
+{{
+    "summary": "A concise summary of the key points discussed",
+    "topics": ["topic1", "topic2"],
+    "action_items": [{{"task": "Description of the task", "assignee": "Name of person assigned, or null"{due_field}}}],
+    "important_details": ["Decisions, numbers, dates or other details worth keeping"]
+}}
+
+Rules:
+1. Extract clear action items with assignees when mentioned; use null when no assignee is mentioned
+2. {due_rule}
+3. Output ONLY valid JSON, with no markdown and no text before or after it
+"""
+
+DUE_FIELD = ', "due": "YYYY-MM-DD if mentioned, otherwise null"'
+DUE_RULE_EXTRACT = "Convert any mentioned due dates to YYYY-MM-DD format; use null when none is mentioned"
+DUE_RULE_OMIT = "Do NOT include due dates - they are added automatically"
+
+# Ask Gemini for JSON directly so the response never needs markdown stripping
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+
+def build_summary_prompt(transcript: str, extract_due_dates: bool = False) -> str:
+    return SUMMARY_PROMPT.format(
+        transcript=transcript,
+        due_field=DUE_FIELD if extract_due_dates else "",
+        due_rule=DUE_RULE_EXTRACT if extract_due_dates else DUE_RULE_OMIT,
+    )
+
+
+def parse_summary_response(raw: str) -> Dict:
+    """Parse the model output into the summary dict, tolerating stray code fences."""
+    cleaned = re.sub(r"```(?:json)?", "", raw, flags=re.IGNORECASE).strip()
+    data = json.loads(cleaned)
+    if not isinstance(data, dict):
+        raise ValueError("Summary response is not a JSON object")
+    data.setdefault("summary", "")
+    data["topics"] = [str(t) for t in data.get("topics") or []]
+    data["important_details"] = [str(d) for d in data.get("important_details") or []]
+    data["action_items"] = [item for item in data.get("action_items") or [] if isinstance(item, dict) and item.get("task")]
+    return data
+
+
+_SUMMARY_FIELD = re.compile(r'"summary"\s*:\s*"')
+
+
+def partial_summary_text(raw: str) -> str:
+    """
+    The "summary" string from a JSON response that is still streaming in, so the
+    text can be shown before the rest of the object (topics, action items) arrives.
+    """
+    match = _SUMMARY_FIELD.search(raw)
+    if not match:
+        return ""
+    chars = []
+    escaped = False
+    for ch in raw[match.end():]:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            break
+        chars.append(ch)
+    body = "".join(chars)
+    # An escape sequence (a lone backslash or a partial \uXXXX) may be cut off at the end of the stream
+    for cut in range(6):
+        try:
+            return json.loads(f'"{body[:len(body) - cut]}"')
+        except ValueError:
+            continue
+    return ""
+
+
+def _action_item_line(item: Dict, emphasis: str) -> str:
+    line = item["task"]
+    if item.get("assignee"):
+        line += f" - {emphasis}{item['assignee']}{emphasis}"
+    if item.get("due"):
+        line += f" (due {item['due']})"
+    return line
+
+
+def _render(summary: Dict, heading: str, bullet: str, emphasis: str) -> str:
+    sections: List[str] = []
+    if summary.get("summary"):
+        sections.append(f"{heading.format('Summary')}\n{summary['summary']}")
+
+    def bullet_section(title: str, lines: List[str]):
+        if lines:
+            sections.append(heading.format(title) + "\n" + "\n".join(f"{bullet} {line}" for line in lines))
+
+    bullet_section("Main Topics", summary.get("topics", []))
+    bullet_section("Action Items", [_action_item_line(i, emphasis) for i in summary.get("action_items", [])])
+    bullet_section("Important Details", summary.get("important_details", []))
+    return "\n\n".join(sections) if sections else "No summary available."
+
+
+def render_markdown(summary: Dict) -> str:
+    """Markdown shown in the web app and extension (the `formatted_text` field)."""
+    return _render(summary, heading="**{}**", bullet="-", emphasis="_")
+
+
+def render_slack(summary: Dict) -> str:
+    """Slack mrkdwn: single-asterisk bold and bullet characters instead of markdown lists."""
+    return _render(summary, heading="*{}*", bullet="•", emphasis="_")
+
+
+def summary_result(structured: Dict) -> Dict:
+    """The shape consumed by the web app, Slack and Notion sync."""
+    return {"structured_data_json": structured, "formatted_text": render_markdown(structured)}
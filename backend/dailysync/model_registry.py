@@ -0,0 +1,132 @@
+import gc
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Approximate in-memory size of the model weights alone (the torch runtime is shared)
+MODEL_WEIGHTS_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 485,
+    "medium": 1500,
+    "large": 3000,
+}
+# Ordered fastest -> most accurate
+TIER_ORDER = ["tiny", "base", "small", "medium", "large"]
+LATENCY_HINTS = {"fast": "tiny", "balanced": "base", "accurate": "small"}
+
+DEFAULT_MODELS = ["tiny", "base", "small"]
+DEFAULT_REGISTRY_BUDGET_MB = 1024
+DEFAULT_IDLE_UNLOAD_S = 900.0
+DEFAULT_DOWNGRADE_AUDIO_S = 1800.0
+
+
+def parse_model_list(value: Optional[str], default_model: str) -> List[str]:
+    """Parse a comma-separated model list, keep known names in tier order and always include the default."""
+    names = [n.strip() for n in (value or "").split(",") if n.strip()] or list(DEFAULT_MODELS)
+    names = [n for n in names if n in MODEL_WEIGHTS_MB]
+    if default_model not in names:
+        names.append(default_model)
+    return sorted(set(names), key=lambda n: TIER_ORDER.index(n) if n in TIER_ORDER else len(TIER_ORDER))
+
+
+def select_model(available: Sequence[str], default_model: str, requested: Optional[str] = None,
+                 latency: Optional[str] = None, audio_s: Optional[float] = None, queue_depth: int = 0,
+                 downgrade_audio_s: float = DEFAULT_DOWNGRADE_AUDIO_S,
+                 downgrade_queue_depth: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Pick the Whisper model for one request. Returns (model_name, reason).
+
+    An explicit model is honoured as-is. Otherwise the latency hint (fast |
+    balanced | accurate) picks the tier, and the server steps down one tier for
+    very long audio and another when the queue is deep.
+    """
+    if requested:
+        if requested in available:
+            return requested, "requested"
+        logger.warning(f"Requested Whisper model '{requested}' is not enabled; choosing automatically")
+
+    tiers = list(available)
+    target = LATENCY_HINTS.get((latency or "").lower(), default_model)
+    if target not in tiers:
+        target = default_model
+    reason = f"latency={latency}" if latency in LATENCY_HINTS else "default"
+
+    index = tiers.index(target)
+    if audio_s is not None and audio_s >= downgrade_audio_s and index > 0:
+        index -= 1
+        reason += f", long audio ({audio_s:.0f}s)"
+    if downgrade_queue_depth and queue_depth >= downgrade_queue_depth and index > 0:
+        index -= 1
+        reason += f", queue depth {queue_depth}"
+    return tiers[index], reason
+
+
+class ModelRegistry:
+    """
+    Loaded Whisper models inside one worker process.
+
+    Models are loaded on first use. When loading another one would exceed
+    `memory_budget_mb`, the least recently used models are unloaded first;
+    `unload_idle()` frees models that have not been used for `idle_timeout_s`.
+    Models in `pinned` (the worker's default) are never unloaded, so the pool
+    stays warm. Not thread-safe: each worker process owns its own registry.
+    """
+
+    def __init__(self, loader: Callable[[str], object], memory_budget_mb: int = DEFAULT_REGISTRY_BUDGET_MB,
+                 idle_timeout_s: float = DEFAULT_IDLE_UNLOAD_S, pinned: Sequence[str] = ()):
+        self.loader = loader
+        self.pinned = set(pinned)
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout_s = idle_timeout_s
+        self._models: "OrderedDict[str, object]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+
+    def get(self, name: str):
+        if name in self._models:
+            self._models.move_to_end(name)
+        else:
+            self._make_room(MODEL_WEIGHTS_MB.get(name, 0))
+            started = time.time()
+            self._models[name] = self.loader(name)
+            logger.info(f"📦 Loaded Whisper '{name}' in {time.time() - started:.1f}s (loaded: {self.loaded()})")
+        self._last_used[name] = time.time()
+        return self._models[name]
+
+    def loaded(self) -> List[str]:
+        return list(self._models)
+
+    def memory_mb(self) -> int:
+        return sum(MODEL_WEIGHTS_MB.get(name, 0) for name in self._models)
+
+    def unload(self, name: str):
+        if self._models.pop(name, None) is None:
+            return
+        self._last_used.pop(name, None)
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        logger.info(f"🗑️ Unloaded Whisper '{name}'")
+
+    def unload_idle(self, now: Optional[float] = None) -> List[str]:
+        if not self.idle_timeout_s:
+            return []
+        cutoff = (now or time.time()) - self.idle_timeout_s
+        idle = [name for name, used in self._last_used.items() if used < cutoff and name not in self.pinned]
+        for name in idle:
+            self.unload(name)
+        return idle
+
+    def _make_room(self, needed_mb: int):
+        while self.memory_mb() + needed_mb > self.memory_budget_mb:
+            evictable = [name for name in self._models if name not in self.pinned]
+            if not evictable:
+                break
+            self.unload(evictable[0])
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from notion_mirror import query_database
+from rate_limit import TokenBucket
+from task_index import dedupe_batch, fingerprint
+
+logger = logging.getLogger(__name__)
+
+PAGES_URL = "https://api.notion.com/v1/pages"
+DEFAULT_LEDGER_PATH = os.path.join(os.path.dirname(__file__), "notion_writes.db")
+NOTION_RPS = 3.0                     # Notion's documented average request rate per integration
+RETRYABLE_CODES = {409, 429, 500, 502, 503, 504}
+
+
+def task_page(database_id: str, task: Dict) -> Dict:
+    """Page payload for one row of the meeting task database."""
+    properties = {
+        "Task": {"title": [{"type": "text", "text": {"content": task["task"]}}]},
+        "Assignee": {"rich_text": [{"type": "text", "text": {"content": task.get("assignee") or "Unassigned"}}]},
+        "Status": {"select": {"name": task.get("status") or "To Do"}},
+    }
+    if task.get("due"):
+        properties["Due"] = {"date": {"start": task["due"]}}
+    return {"parent": {"database_id": database_id}, "properties": properties}
+
+
+def idempotency_key(payload: Dict, scope: str = "") -> str:
+    """Stable key for one page creation: the canonical payload plus an optional scope (e.g. the meeting)."""
+    digest = hashlib.sha256(scope.encode())
+    digest.update(json.dumps(payload, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def task_key(database_id: str, task: Dict, scope: str = "") -> str:
+    """
+    Idempotency key for a meeting task: the database plus the task's identity
+    (normalized text, assignee, meeting). Status and due date are left out, since
+    the due date is computed relative to the day the meeting is processed.
+    """
+    identity = fingerprint(task["task"], task.get("assignee"), scope)
+    return hashlib.sha256(f"{database_id}\x1f{identity}".encode()).hexdigest()
+
+
+class NotionBulkWriter:
+    """
+    Creates (and, for de-duplicated tasks, updates) Notion pages through a small worker pool.
+
+    Requests share one token bucket, so the whole process stays within Notion's
+    average rate. A 429 pauses the bucket for Retry-After seconds, so every worker
+    backs off, not just the one that was throttled. Conflicts, 5xx responses and
+    network errors are retried with jittered exponential backoff. A page creation
+    that failed with a 5xx or network error may still have gone through, so it is
+    only retried after its "find" lookup found no such page.
+
+    Each created page is written to a SQLite ledger under its idempotency key.
+    Running the same batch again, for example after a partial failure, skips the
+    pages that were already created.
+    """
+
+    def __init__(self, headers: Dict, rate: float = NOTION_RPS, burst: Optional[float] = None, max_workers: int = 3,
+                 max_retries: int = 5, base_delay_s: float = 0.5, max_delay_s: float = 30.0,
+                 ledger_path: str = DEFAULT_LEDGER_PATH):
+        self.headers = headers
+        self.bucket = TokenBucket(rate, burst if burst is not None else rate)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.ledger_path = ledger_path
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "created": 0, "updated": 0, "skipped": 0, "duplicates": 0, "missing": 0,
+                       "failed": 0, "retries": 0, "recovered": 0, "rate_limited": 0, "rate_wait_s": 0.0}
+        self._init_ledger()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.ledger_path, timeout=30)
+
+    def _init_ledger(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS created_pages (
+                    key TEXT PRIMARY KEY,
+                    page_id TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _ledger_get(self, key: str) -> Optional[str]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT page_id FROM created_pages WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _ledger_put(self, key: str, page_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO created_pages (key, page_id, created_at) VALUES (?, ?, ?)",
+                         (key, page_id, time.time()))
+
+    def forget_page(self, page_id: str):
+        """Drop ledger entries for a page deleted in Notion, so it can be created again."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM created_pages WHERE page_id = ?", (page_id,))
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+    def _send(self, method: str, url: str, payload: Dict, recover: Optional[Callable[[], Optional[Dict]]] = None):
+        """
+        One request with rate limiting and retries. Returns (page or None, attempts, error or None, status).
+
+        A POST that failed with a 5xx or network error is only retried when `recover`
+        is given and returns None, i.e. Notion did not create the page after all.
+        When it returns the page, that page is the result.
+        """
+        error, status = None, None
+        for attempt in range(self.max_retries + 1):
+            self._count("rate_wait_s", self.bucket.acquire())
+            self._count("requests")
+            try:
+                response = self._session.request(method, url, headers=self.headers, json=payload, timeout=30)
+            except requests.RequestException as e:
+                status, error = None, str(e)
+            else:
+                if response.status_code == 200:
+                    return response.json(), attempt + 1, None, 200
+                status, error = response.status_code, f"{response.status_code}: {response.text[:200]}"
+                if status not in RETRYABLE_CODES:
+                    break
+            if method == "POST" and (status is None or status >= 500):
+                # The response was lost, not necessarily the write
+                if recover is None:
+                    break
+                try:
+                    page = recover()
+                except Exception as e:
+                    logger.warning(f"Could not check whether a failed Notion {method} went through: {e}")
+                    break
+                if page:
+                    self._count("recovered")
+                    return page, attempt + 1, None, 200
+            if attempt == self.max_retries:
+                break
+            self._count("retries")
+            if status == 429:
+                self._count("rate_limited")
+                delay = float(response.headers.get("Retry-After", 1))
+                # Throttle every worker, not only this one
+                self.bucket.pause(delay)
+                logger.warning(f"⏳ Notion rate limited a page write, pausing {delay:.1f}s")
+            else:
+                time.sleep(self._backoff(attempt))
+        logger.error(f"❌ Notion {method} failed after {attempt + 1} attempt(s): {error}")
+        return None, attempt + 1, error, status
+
+    def _create(self, item: Dict) -> Dict:
+        key = item.get("key") or idempotency_key(item["payload"])
+        existing = self._ledger_get(key)
+        if existing:
+            self._count("skipped")
+            return {"key": key, "status": "skipped", "page_id": existing, "attempts": 0, "error": None, "page": None}
+        # Notion's created_time has minute precision
+        since = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+        recover = (lambda: item["find"](since)) if item.get("find") else None
+        page, attempts, error, _ = self._send("POST", PAGES_URL, item["payload"], recover=recover)
+        if page is None:
+            self._count("failed")
+            return {"key": key, "status": "failed", "page_id": None, "attempts": attempts, "error": error,
+                    "page": None}
+        self._ledger_put(key, page["id"])
+        self._count("created")
+        return {"key": key, "status": "created", "page_id": page["id"], "attempts": attempts, "error": None,
+                "page": page}
+
+    def _update(self, item: Dict) -> Dict:
+        page, attempts, error, status = self._send("PATCH", f"{PAGES_URL}/{item['page_id']}", item["payload"])
+        if page is None:
+            # 404: the page was deleted in Notion, so the caller can create it again
+            self._count("failed" if status != 404 else "missing")
+            return {"key": None, "status": "missing" if status == 404 else "failed", "page_id": item["page_id"],
+                    "attempts": attempts, "error": error, "page": None}
+        self._count("updated")
+        return {"key": None, "status": "updated", "page_id": page["id"], "attempts": attempts, "error": None,
+                "page": page}
+
+    def _run(self, fn, items: List[Dict]) -> List[Dict]:
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def find_task_page(self, database_id: str, task: Dict, since: str) -> Optional[Dict]:
+        """A page for `task` (same title and assignee) created in the database on or after `since`, if any."""
+        self._count("rate_wait_s", self.bucket.acquire())
+        self._count("requests")
+        query = {"and": [
+            {"property": "Task", "title": {"equals": task["task"]}},
+            {"property": "Assignee", "rich_text": {"equals": task.get("assignee") or "Unassigned"}},
+            {"timestamp": "created_time", "created_time": {"on_or_after": since}},
+        ]}
+        return next(query_database(database_id, self.headers, query, session=self._session), None)
+
+    def create_pages(self, items: List[Dict]) -> List[Dict]:
+        """
+        Create one page per item ({"payload": page JSON, "key": optional idempotency key,
+        "find": optional lookup called as find(since_iso) that returns the page if it was created anyway}).
+        Without "find", a 5xx or network error on the POST is not retried.
+
+        Returns a result per item, in input order. Each has status
+        created / skipped / failed, plus page_id, attempts, error and the created page.
+        """
+        if not items:
+            return []
+        started = time.time()
+        results = self._run(self._create, items)
+        counts = {status: sum(r["status"] == status for r in results) for status in ("created", "skipped", "failed")}
+        logger.info(f"📝 Notion bulk write: {counts['created']} created, {counts['skipped']} already present, "
+                    f"{counts['failed']} failed in {time.time() - started:.1f}s")
+        return results
+
+    def update_pages(self, items: List[Dict]) -> List[Dict]:
+        """PATCH one page per item ({"page_id": ..., "payload": {"properties": ...}}); statuses updated / missing / failed."""
+        return self._run(self._update, items) if items else []
+
+    def add_tasks(self, database_id: str, tasks: List[Dict], scope: str = "", index=None,
+                  dedup: str = "skip") -> List[Dict]:
+        """
+        Write meeting tasks to the task database, one result per task.
+
+        With a TaskIndex and dedup "skip", a task already written for the same meeting
+        (`scope`) and assignee is reported as "duplicate". With "update", the existing
+        page's title and due date are refreshed instead; its status is left alone.
+        Duplicates inside the batch are collapsed as well.
+        """
+        def create_item(task: Dict) -> Dict:
+            return {"payload": task_page(database_id, task), "key": task_key(database_id, task, scope),
+                    "find": lambda since: self.find_task_page(database_id, task, since)}
+
+        if index is None or dedup == "off":
+            return self.create_pages([create_item(task) for task in tasks])
+
+        results: List[Optional[Dict]] = [None] * len(tasks)
+        creates, updates = [], []
+        for i, (task, earlier) in enumerate(zip(tasks, dedupe_batch(tasks, near=index.near))):
+            if earlier is not None:
+                results[i] = {"status": "duplicate", "duplicate_of": earlier}
+                continue
+            match = index.lookup(database_id, task["task"], task.get("assignee"), scope)
+            if match and dedup == "update":
+                properties = {k: v for k, v in task_page(database_id, task)["properties"].items() if k in ("Task", "Due")}
+                updates.append((i, {"page_id": match["page_id"], "payload": {"properties": properties}}))
+            elif match:
+                self._count("duplicates")
+                results[i] = {"key": None, "status": "duplicate", "page_id": match["page_id"], "match": match["match"],
+                              "attempts": 0, "error": None, "page": None}
+            else:
+                creates.append(i)
+
+        for (i, _), result in zip(updates, self.update_pages([item for _, item in updates])):
+            if result["status"] == "missing":
+                index.forget(result["page_id"])
+                self.forget_page(result["page_id"])
+                creates.append(i)
+            else:
+                results[i] = result
+        created = self.create_pages([create_item(tasks[i]) for i in creates])
+        for i, result in zip(creates, created):
+            results[i] = result
+            if result["page_id"] and result["status"] != "failed":
+                index.record(database_id, result["page_id"], tasks[i]["task"], tasks[i].get("assignee"), scope)
+        for i, result in enumerate(results):
+            if "duplicate_of" in result:
+                self._count("duplicates")
+                original = results[result.pop("duplicate_of")]
+                results[i] = {"key": None, "status": "duplicate", "page_id": original.get("page_id"), "match": "batch",
+                              "attempts": 0, "error": None, "page": None}
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["rate_wait_s"] = round(stats["rate_wait_s"], 2)
+        stats["rate_per_s"] = self.bucket.rate
+        stats["max_workers"] = self.max_workers
+        return stats
+
+
+_writer: Optional[NotionBulkWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_bulk_writer() -> NotionBulkWriter:
+    """The process-wide writer, configured from NOTION_TOKEN and NOTION_WRITE_* environment variables."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = NotionBulkWriter(
+                headers={
+                    "Authorization": f"Bearer {os.getenv('NOTION_TOKEN')}",
+                    "Content-Type": "application/json",
+                    "Notion-Version": "2022-06-28",
+                },
+                rate=float(os.getenv("NOTION_WRITE_RPS", str(NOTION_RPS))),
+                max_workers=int(os.getenv("NOTION_WRITE_WORKERS", "3")),
+                max_retries=int(os.getenv("NOTION_WRITE_MAX_RETRIES", "5")),
+                ledger_path=os.getenv("NOTION_WRITE_LEDGER_PATH", DEFAULT_LEDGER_PATH),
+            )
+        return _writer
@@ -1,7 +1,8 @@
 import json
 import os
 from datetime import datetime
-from create_notiondb import create_meeting_task_database, add_task_to_database
+from create_notiondb import create_meeting_task_database, add_tasks_to_database
+from task_index import meeting_key
 from dotenv import load_dotenv
 import subprocess, sys
 
@@ -26,13 +27,15 @@ def normalize_assignee(name):
     match, score, _ = process.extractOne(name.lower(), KNOWN_NAMES.keys(), scorer=fuzz.ratio)
     return KNOWN_NAMES[match] if score >= 70 else "Unassigned"
 
-def process_meeting_summary(summary_data, meeting_title):
+def process_meeting_summary(summary_data, meeting_title, meeting=None):
     """
     Process the meeting summary from whisper_api and create tasks in Notion.
     
     Args:
         summary_data (dict): The JSON summary from Gemini
         meeting_title (str): The title of the meeting
+        meeting (str): Identity of the meeting (task_index.meeting_key), the de-duplication scope;
+            defaults to the title plus today's date
     """
     try:
         # Parse the summary data (it comes as a string from Gemini)
@@ -44,35 +47,43 @@ def process_meeting_summary(summary_data, meeting_title):
         if not database_id:
             raise Exception("DATABASE_ID not found. Please initialize the database first using the 'Initialize Database' button.")
         
+        if not meeting:
+            meeting = meeting_key(f"{meeting_title}\x1f{datetime.now():%Y-%m-%d}", "title")
+
         # Create the task data structure
         task_data = {
             "github_link": os.getenv("GITHUB_REPO_URL", ""),  # You can set this in .env
+            "meeting_key": meeting,
             "tasks": []
         }
         
-        # Process each action item and send to Notion directly
+        # Build every task first, then create the pages concurrently in one bulk write
         for item in summary_data.get("action_items", []):
             github_link = os.getenv("GITHUB_REPO_URL") or None
             task = {
                 "task": item["task"],
-                "assignee": normalize_assignee(item["assignee"]),
+                "assignee": normalize_assignee(item.get("assignee")),
                 #"assignee": item["assignee"] if item["assignee"] else "Unassigned",
                 "status": "To Do",
-                "due": item["due"] if item["due"] else (datetime.now().strftime("%Y-%m-%d")),
+                "due": item.get("due") or datetime.now().strftime("%Y-%m-%d"),
                 "github_link": github_link
             }
             task_data["tasks"].append(task)
-            # Add task to Notion directly
             print(f"Adding task to Notion: {task['task']} (Assignee: {task['assignee']}, Due: {task['due']})")
-            add_task_to_database(database_id, task)
+
+        # Scoped by meeting, so re-sending the same summary does not create the pages twice
+        results = add_tasks_to_database(database_id, task_data["tasks"], scope=meeting)
+        for task, result in zip(task_data["tasks"], results):
+            task["notion"] = {"status": result["status"], "page_id": result["page_id"], "error": result["error"]}
+        failed = sum(result["status"] == "failed" for result in results)
         
         # Save the task data for reference
         with open("meeting_summary_input.json", "w") as f:
             json.dump(task_data, f, indent=2)
         
         return {
-            "status": "success",
-            "message": f"Created {len(task_data['tasks'])} tasks in Notion",
+            "status": "success" if not failed else "partial",
+            "message": f"Created {len(task_data['tasks']) - failed}/{len(task_data['tasks'])} tasks in Notion",
             "tasks": task_data["tasks"]
         }
             
@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "notion_mirror.db")
+DEFAULT_MAX_AGE_S = 60.0          # readers trigger an incremental sync once the mirror is older than this
+DEFAULT_FULL_SYNC_S = 3600.0      # a full sync also drops pages that were archived or deleted in Notion
+PAGE_SIZE = 100                   # Notion's maximum page_size for database queries
+MAX_RATE_LIMIT_RETRIES = 3
+QUERY_URL = "https://api.notion.com/v1/databases/{database_id}/query"
+
+
+def _title(page: Dict) -> Optional[str]:
+    parts = page.get("properties", {}).get("Task", {}).get("title") or []
+    return "".join(p.get("plain_text") or p.get("text", {}).get("content", "") for p in parts) or None
+
+
+def _assignee(page: Dict) -> Optional[str]:
+    parts = page.get("properties", {}).get("Assignee", {}).get("rich_text") or []
+    return "".join(p.get("plain_text") or p.get("text", {}).get("content", "") for p in parts) or None
+
+
+def _status(page: Dict) -> Optional[str]:
+    select = page.get("properties", {}).get("Status", {}).get("select")
+    return select.get("name") if select else None
+
+
+def notion_filter(status: Optional[str] = None, exclude_status: Optional[str] = None,
+                  assignee: Optional[str] = None, edited_since: Optional[str] = None) -> Optional[Dict]:
+    """Notion query filter for the task database properties, or None for an unfiltered query."""
+    conditions = []
+    if status:
+        conditions.append({"property": "Status", "select": {"equals": status}})
+    if exclude_status:
+        conditions.append({"property": "Status", "select": {"does_not_equal": exclude_status}})
+    if assignee:
+        conditions.append({"property": "Assignee", "rich_text": {"equals": assignee}})
+    if edited_since:
+        conditions.append({"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": edited_since}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"and": conditions}
+
+
+def query_database(database_id: str, headers: Dict, filter: Optional[Dict] = None,
+                   session: Optional[requests.Session] = None) -> Iterator[Dict]:
+    """
+    Every page of a database query, following has_more/next_cursor. Filters are
+    evaluated by Notion, so only matching pages are transferred.
+    """
+    http = session or requests
+    body: Dict = {"page_size": PAGE_SIZE, "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+    if filter:
+        body["filter"] = filter
+    retries = 0
+    while True:
+        response = http.post(QUERY_URL.format(database_id=database_id), headers=headers, json=body, timeout=30)
+        if response.status_code == 429 and retries < MAX_RATE_LIMIT_RETRIES:
+            retries += 1
+            delay = float(response.headers.get("Retry-After", 1))
+            logger.warning(f"⏳ Notion rate limited the task query, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            continue
+        if response.status_code != 200:
+            raise requests.HTTPError(f"Notion query failed ({response.status_code}): {response.text[:200]}",
+                                     response=response)
+        retries = 0
+        data = response.json()
+        yield from data.get("results", [])
+        if not data.get("has_more") or not data.get("next_cursor"):
+            return
+        body["start_cursor"] = data["next_cursor"]
+
+
+class NotionMirror:
+    """
+    Local SQLite copy of Notion task databases.
+
+    The first read of a database bootstraps it with a fully paginated query;
+    later reads sync incrementally with a last_edited_time filter once the copy is
+    older than max_age_s, and a full sync every full_sync_s drops archived pages.
+    Reads are answered from SQLite. When Notion is unreachable the last copy is
+    served and the failure shows up in status().
+    """
+
+    def __init__(self, headers: Dict, db_path: str = DEFAULT_DB_PATH, max_age_s: float = DEFAULT_MAX_AGE_S,
+                 full_sync_s: float = DEFAULT_FULL_SYNC_S):
+        self.headers = headers
+        self.db_path = db_path
+        self.max_age_s = max_age_s
+        self.full_sync_s = full_sync_s
+        self._lock = threading.Lock()        # guards SQLite access
+        self._sync_lock = threading.Lock()   # one sync at a time; concurrent readers wait and reuse it
+        self._session = requests.Session()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    database_id TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    task TEXT,
+                    assignee TEXT,
+                    status TEXT,
+                    last_edited_time TEXT NOT NULL,
+                    page TEXT NOT NULL,
+                    PRIMARY KEY (database_id, page_id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_status ON pages (database_id, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_assignee ON pages (database_id, assignee)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS syncs (
+                    database_id TEXT PRIMARY KEY,
+                    last_sync_at REAL,
+                    last_sync_started_at REAL,
+                    last_full_sync_at REAL,
+                    last_mode TEXT,
+                    last_pages INTEGER,
+                    last_duration_ms REAL,
+                    full_syncs INTEGER NOT NULL DEFAULT 0,
+                    incremental_syncs INTEGER NOT NULL DEFAULT 0,
+                    pages_fetched INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    last_error_at REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(syncs)")}
+            if "last_sync_started_at" not in columns:
+                # Mirrors created before the watermark was stored; the next sync is a full one
+                conn.execute("ALTER TABLE syncs ADD COLUMN last_sync_started_at REAL")
+
+    def _sync_row(self, database_id: str) -> Dict:
+        with self._lock, self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM syncs WHERE database_id = ?", (database_id,)).fetchone()
+        return dict(row) if row else {}
+
+    def _upsert(self, conn: sqlite3.Connection, database_id: str, page: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO pages (database_id, page_id, task, assignee, status, last_edited_time, page) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (database_id, page["id"], _title(page), _assignee(page), _status(page),
+             page.get("last_edited_time") or "", json.dumps(page)),
+        )
+
+    def _store(self, database_id: str, pages: List[Dict], seen: set) -> int:
+        # One transaction per result page; an interrupted sync keeps what it already stored
+        with self._lock, self._connect() as conn:
+            for page in pages:
+                self._upsert(conn, database_id, page)
+                seen.add(page["id"])
+        return len(pages)
+
+    def record_page(self, database_id: str, page: Dict):
+        """Write-through for pages this app created or updated, so the mirror does not wait for the next sync."""
+        if not page.get("id"):
+            return
+        with self._lock, self._connect() as conn:
+            if page.get("archived") or page.get("in_trash"):
+                conn.execute("DELETE FROM pages WHERE database_id = ? AND page_id = ?", (database_id, page["id"]))
+            else:
+                self._upsert(conn, database_id, page)
+
+    @staticmethod
+    def _watermark(state: Dict) -> Optional[str]:
+        """
+        Start of the last successful sync. It is not derived from the mirrored pages:
+        record_page() stores this app's own writes, whose edit times would hide
+        older edits made by others in Notion.
+        """
+        started = state.get("last_sync_started_at")
+        if not started:
+            return None
+        # last_edited_time is rounded to the minute, so re-read the boundary minute (upserts are idempotent)
+        edited = datetime.fromtimestamp(started, timezone.utc) - timedelta(minutes=1)
+        return edited.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def sync(self, database_id: str, full: bool = False) -> Dict:
+        """Pull changes from Notion: a full paginated sync, or only pages edited since the last sync started."""
+        with self._sync_lock:
+            state = self._sync_row(database_id)
+            full = full or not state.get("last_full_sync_at") or \
+                time.time() - state["last_full_sync_at"] >= self.full_sync_s
+            since = None if full else self._watermark(state)
+            mode = "incremental" if since else "full"
+            started = time.time()
+            fetched, seen = 0, set()
+            try:
+                pages = query_database(database_id, self.headers, notion_filter(edited_since=since), self._session)
+                batch: List[Dict] = []
+                for page in pages:
+                    batch.append(page)
+                    if len(batch) == PAGE_SIZE:
+                        fetched += self._store(database_id, batch, seen)
+                        batch = []
+                fetched += self._store(database_id, batch, seen)
+            except Exception as e:
+                logger.error(f"❌ Notion mirror {mode} sync failed after {fetched} page(s): {e}")
+                with self._lock, self._connect() as conn:
+                    conn.execute(
+                        "INSERT INTO syncs (database_id, last_error, last_error_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(database_id) DO UPDATE SET last_error = excluded.last_error, "
+                        "last_error_at = excluded.last_error_at",
+                        (database_id, str(e), time.time()),
+                    )
+                raise
+
+            now = time.time()
+            duration_ms = (now - started) * 1000
+            with self._lock, self._connect() as conn:
+                removed = 0
+                if mode == "full":
+                    # Pages missing from a complete listing were archived or deleted
+                    stale = [row[0] for row in conn.execute(
+                        "SELECT page_id FROM pages WHERE database_id = ?", (database_id,)) if row[0] not in seen]
+                    conn.executemany("DELETE FROM pages WHERE database_id = ? AND page_id = ?",
+                                     [(database_id, page_id) for page_id in stale])
+                    removed = len(stale)
+                conn.execute(
+                    "INSERT INTO syncs (database_id) VALUES (?) ON CONFLICT(database_id) DO NOTHING", (database_id,))
+                conn.execute(
+                    "UPDATE syncs SET last_sync_at = ?, last_sync_started_at = ?, last_mode = ?, last_pages = ?, "
+                    "last_duration_ms = ?, pages_fetched = pages_fetched + ?, last_error = NULL WHERE database_id = ?",
+                    (now, started, mode, fetched, duration_ms, fetched, database_id),
+                )
+                if mode == "full":
+                    conn.execute("UPDATE syncs SET full_syncs = full_syncs + 1, last_full_sync_at = ? "
+                                 "WHERE database_id = ?", (now, database_id))
+                else:
+                    conn.execute("UPDATE syncs SET incremental_syncs = incremental_syncs + 1 WHERE database_id = ?",
+                                 (database_id,))
+            logger.info(f"🔄 Notion mirror {mode} sync: {fetched} page(s) fetched, {removed} removed "
+                        f"in {duration_ms:.0f}ms")
+            return {"mode": mode, "pages_fetched": fetched, "pages_removed": removed,
+                    "duration_ms": round(duration_ms, 1)}
+
+    def _ensure_fresh(self, database_id: str, max_age_s: Optional[float]):
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        state = self._sync_row(database_id)
+        if state.get("last_sync_at") and time.time() - state["last_sync_at"] < max_age_s:
+            return
+        try:
+            self.sync(database_id)
+        except Exception:
+            if not state.get("last_sync_at"):
+                raise
+            # Serve the previous copy; status() reports how old it is
+            logger.warning(f"⚠️ Serving Notion tasks from a mirror {time.time() - state['last_sync_at']:.0f}s old")
+
+    def tasks(self, database_id: str, status: Optional[str] = None, exclude_status: Optional[str] = None,
+              assignee: Optional[str] = None, max_age_s: Optional[float] = None) -> List[Dict]:
+        """
+        Task pages (in Notion's page JSON) from the mirror, syncing first when it is
+        older than max_age_s. Filters use the same fields as notion_filter().
+        """
+        self._ensure_fresh(database_id, max_age_s)
+        sql = "SELECT page FROM pages WHERE database_id = ?"
+        params: List = [database_id]
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if exclude_status:
+            sql += " AND (status IS NULL OR status != ?)"
+            params.append(exclude_status)
+        if assignee:
+            sql += " AND assignee = ?"
+            params.append(assignee)
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY last_edited_time", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def status(self, database_id: Optional[str] = None) -> Dict:
+        """Staleness report per mirrored database: age of the copy, last sync, counters and the last error."""
+        with self._lock, self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            counts = dict(conn.execute("SELECT database_id, COUNT(*) FROM pages GROUP BY database_id").fetchall())
+            rows = [dict(row) for row in conn.execute("SELECT * FROM syncs")]
+        now = time.time()
+        report = {}
+        for row in rows:
+            if database_id and row["database_id"] != database_id:
+                continue
+            age = now - row["last_sync_at"] if row["last_sync_at"] else None
+            report[row["database_id"]] = {
+                "pages": counts.get(row["database_id"], 0),
+                "age_s": round(age, 1) if age is not None else None,
+                "stale": age is None or age >= self.max_age_s,
+                "last_sync_at": datetime.fromtimestamp(row["last_sync_at"]).isoformat() if row["last_sync_at"] else None,
+                "last_full_sync_at": (datetime.fromtimestamp(row["last_full_sync_at"]).isoformat()
+                                      if row["last_full_sync_at"] else None),
+                "last_mode": row["last_mode"],
+                "last_pages": row["last_pages"],
+                "last_duration_ms": round(row["last_duration_ms"], 1) if row["last_duration_ms"] else None,
+                "full_syncs": row["full_syncs"],
+                "incremental_syncs": row["incremental_syncs"],
+                "pages_fetched": row["pages_fetched"],
+                "last_error": row["last_error"],
+            }
+        return {"max_age_s": self.max_age_s, "full_sync_s": self.full_sync_s, "databases": report}
+
+
+_mirror: Optional[NotionMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_notion_mirror() -> NotionMirror:
+    """The process-wide mirror, configured from NOTION_TOKEN and NOTION_MIRROR_* environment variables."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = NotionMirror(
+                headers={
+                    "Authorization": f"Bearer {os.getenv('NOTION_TOKEN')}",
+                    "Content-Type": "application/json",
+                    "Notion-Version": "2022-06-28",
+                },
+                db_path=os.getenv("NOTION_MIRROR_PATH", DEFAULT_DB_PATH),
+                max_age_s=float(os.getenv("NOTION_MIRROR_MAX_AGE_S", str(DEFAULT_MAX_AGE_S))),
+                full_sync_s=float(os.getenv("NOTION_MIRROR_FULL_SYNC_S", str(DEFAULT_FULL_SYNC_S))),
+            )
+        return _mirror
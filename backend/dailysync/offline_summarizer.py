@@ -0,0 +1,186 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional
+
+from long_summary import same_task
+
+USER_MAPPING_PATH = os.path.join(os.path.dirname(__file__), "user_mapping.json")
+
+SUMMARY_SENTENCES = 5
+MAX_TOPICS = 5
+MAX_DETAILS = 6
+MAX_TASK_WORDS = 18
+DAMPING = 0.85
+ITERATIONS = 30
+CONVERGENCE = 1e-6
+COMMON_WORD_RATIO = 0.25   # words in more than this share of sentences do not link sentences
+MAX_WORD_SENTENCES = 40    # ... nor do words repeated this often, which keeps long meetings fast
+
+STOPWORDS = set("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further get got had has have having he her here hers him
+his how i if in into is it its itself just let like me more most my no nor not now of off on once only or other our
+ours out over own really right same she should so some such than that the their them then there these they this
+those through to too under until up very was we well were what when where which while who whom why will with would
+yeah yes you your yours okay ok um uh gonna wanna going think know mean thing things kind sort lot
+""".split())
+
+# "Bob will ...", "Bob is going to ...", "Bob needs to ...", "Bob, can you ...", "Bob to ..."
+ASSIGNED_PATTERN = r"\b(?P<name>{names})\b,?\s+(?:will|shall|is going to|'s going to|needs to|has to|should|to|can you|could you|please|would you)\s+(?P<task>.+)"
+ASKED_PATTERN = r"\b(?:can|could|would) you\s*,?\s*(?P<task>.+?),?\s+(?P<name>{names})\b"
+UNASSIGNED_PATTERNS = [
+    re.compile(r"\b(?:action item|todo|to-do|follow[- ]up)s?\s*(?:is|:|-)\s*(?P<task>.+)", re.IGNORECASE),
+    re.compile(r"\b(?:we|someone|somebody) (?:need|needs|have|has|should|must) to\s+(?P<task>.+)", re.IGNORECASE),
+    re.compile(r"\b(?:I'll|I will|I'm going to|let me)\s+(?P<task>.+)", re.IGNORECASE),
+    re.compile(r"\blet's\s+(?P<task>(?:make sure|schedule|send|update|fix|review|prepare|set up|create|finish|follow)\b.+)",
+               re.IGNORECASE),
+]
+DETAIL_CUES = re.compile(
+    r"\b(?:decided|agreed|deadline|due|budget|launch|release|by (?:monday|tuesday|wednesday|thursday|friday|tomorrow|"
+    r"next week|end of)|\d+(?:[.,]\d+)?\s*(?:%|percent|k|dollars|users|days|weeks|hours)|\$\d)", re.IGNORECASE)
+
+
+def load_people(path: str = USER_MAPPING_PATH) -> Dict[str, str]:
+    """Map every known name (Notion name, Slack display name, GitHub user) to the Notion name."""
+    try:
+        with open(path) as f:
+            mapping = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    people = {}
+    for key, user in mapping.items():
+        canonical = user.get("notion_name") or key
+        for alias in (key, user.get("notion_name"), user.get("slack_display_name"), user.get("github_username")):
+            if alias:
+                people[alias.lower()] = canonical
+                # "025_Anshley Mukherjee" is also addressed as "Anshley"
+                first = re.sub(r"^[\W\d_]+", "", alias).split(" ")[0]
+                if len(first) > 2:
+                    people.setdefault(first.lower(), canonical)
+    return people
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text.strip()) if len(s.split()) >= 3]
+
+
+def _words(sentence: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9']+", sentence.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def rank_sentences(sentences: List[str]) -> List[float]:
+    """TextRank: PageRank over sentences linked by shared content words."""
+    words = [set(_words(s)) for s in sentences]
+    by_word = defaultdict(set)
+    for i, ws in enumerate(words):
+        for w in ws:
+            by_word[w].add(i)
+    max_df = max(2, min(int(len(sentences) * COMMON_WORD_RATIO), MAX_WORD_SENTENCES))
+
+    # Sparse similarity: only sentence pairs that share an informative word
+    overlaps = Counter()
+    for members in by_word.values():
+        if 2 <= len(members) <= max_df:
+            overlaps.update(combinations(sorted(members), 2))
+    lengths = [math.log(len(ws) + 1) for ws in words]
+    edges: Dict[int, Dict[int, float]] = defaultdict(dict)
+    for (i, j), overlap in overlaps.items():
+        edges[i][j] = edges[j][i] = overlap / (lengths[i] + lengths[j])
+
+    n = len(sentences)
+    scores = [1.0 / n] * n if n else []
+    totals = {i: sum(links.values()) for i, links in edges.items()}
+    incoming = [[(j, w / totals[j]) for j, w in edges[i].items() if totals[j]] for i in range(n)]
+    for _ in range(ITERATIONS):
+        updated = [(1 - DAMPING) / n + DAMPING * sum(scores[j] * w for j, w in links) for links in incoming]
+        converged = max((abs(a - b) for a, b in zip(updated, scores)), default=0.0) < CONVERGENCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def _clean_task(text: str) -> str:
+    text = re.split(r"(?<=[.!?])\s|\s+(?:and then|but|because|so that)\s", text.strip())[0]
+    text = re.sub(r"^(?:also|please|just|go ahead and)\s+", "", text.strip(" ,.?!"), flags=re.IGNORECASE)
+    words = text.split()
+    text = " ".join(words[:MAX_TASK_WORDS])
+    return text[:1].upper() + text[1:]
+
+
+def extract_action_items(sentences: List[str], people: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """Pattern-based action items; assignees are matched against the known team names."""
+    people = load_people() if people is None else people
+    name_alt = "|".join(sorted((re.escape(n) for n in people), key=len, reverse=True))
+    assigned = re.compile(ASSIGNED_PATTERN.format(names=name_alt), re.IGNORECASE) if name_alt else None
+    asked = re.compile(ASKED_PATTERN.format(names=name_alt), re.IGNORECASE) if name_alt else None
+
+    items: List[Dict] = []
+    for sentence in sentences:
+        task, assignee = None, None
+        for pattern in (assigned, asked):
+            match = pattern.search(sentence) if pattern else None
+            if match:
+                task, assignee = match.group("task"), people[match.group("name").lower()]
+                break
+        if task is None:
+            for pattern in UNASSIGNED_PATTERNS:
+                match = pattern.search(sentence)
+                if match:
+                    task = match.group("task")
+                    break
+        if not task:
+            continue
+        task = _clean_task(task)
+        if len(task.split()) < 2:
+            continue
+        existing = next((item for item in items if same_task(item["task"], task)), None)
+        if existing is None:
+            # Same keys as a Gemini action item; the transcript patterns do not extract dates
+            items.append({"task": task, "assignee": assignee, "due": None})
+        elif not existing["assignee"] and assignee:
+            existing["assignee"] = assignee
+    return items
+
+
+def extract_topics(sentences: List[str], limit: int = MAX_TOPICS) -> List[str]:
+    counts = Counter()
+    for sentence in sentences:
+        tokens = _words(sentence)
+        counts.update(t for t in tokens if len(t) > 3)
+        counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    ranked = [(term, count * (1.5 if " " in term else 1.0)) for term, count in counts.items() if count > 1]
+    topics: List[str] = []
+    for term, _ in sorted(ranked, key=lambda tc: -tc[1]):
+        # Skip a word already covered by a chosen phrase (or the other way round)
+        if any(term in t or t in term for t in topics):
+            continue
+        topics.append(term)
+        if len(topics) == limit:
+            break
+    return topics
+
+
+def summarize_offline(transcript: str, people: Optional[Dict[str, str]] = None,
+                      max_sentences: int = SUMMARY_SENTENCES) -> Dict:
+    """
+    Summarize a transcript without any network call, in the same JSON shape as
+    the Gemini summary: summary / topics / action_items / important_details.
+    """
+    sentences = split_sentences(transcript)
+    if not sentences:
+        return {"summary": transcript.strip(), "topics": [], "action_items": [], "important_details": []}
+    scores = rank_sentences(sentences)
+    top = sorted(sorted(range(len(sentences)), key=lambda i: -scores[i])[:max_sentences])
+    chosen = set(top)
+    details = [s for i, s in enumerate(sentences) if i not in chosen and DETAIL_CUES.search(s)]
+    return {
+        "summary": " ".join(sentences[i] for i in top),
+        "topics": extract_topics(sentences),
+        "action_items": extract_action_items(sentences, people),
+        "important_details": details[:MAX_DETAILS],
+    }
@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: holds up to `capacity` tokens and refills at
+    `rate` tokens per second. `acquire()` blocks until enough tokens are
+    available, so callers are smoothed to the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @classmethod
+    def per_minute(cls, amount: float) -> "TokenBucket":
+        return cls(rate=amount / 60.0, capacity=amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Take `amount` tokens, waiting as long as needed. Requests larger than the
+        bucket are clamped to its capacity. Returns the seconds spent waiting;
+        raises TimeoutError if `timeout` elapses first.
+        """
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return time.monotonic() - started
+                wait = (amount - self._tokens) / self.rate
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for rate limit")
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    def adjust(self, delta: float):
+        """Return (positive) or charge (negative) tokens after the real cost is known."""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nothing is granted for `seconds` (e.g. after a Retry-After)."""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    @property
+    def available(self) -> float:
+        with self._cond:
+            self._refill()
+            return self._tokens
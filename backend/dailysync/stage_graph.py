@@ -0,0 +1,175 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SkipStage(Exception):
+    """Raised by a stage function to mark the stage as skipped (e.g. integration not configured)."""
+
+
+class StageFailed(Exception):
+    """Raised by StageGraph.run() when a critical stage fails; carries the partial run."""
+
+    def __init__(self, stage: str, error: BaseException, run: "StageRun"):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.run = run
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], after: Iterable[str] = (),
+                 critical: bool = False):
+        self.name = name
+        self.func = func
+        self.after = list(after)
+        self.critical = critical
+
+
+class StageRun:
+    """Outcome of one graph run: results, errors, per-stage status and timings."""
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.status: Dict[str, str] = {}
+        self.durations_ms: Dict[str, float] = {}
+        self.started_at: Dict[str, float] = {}
+        self.wall_ms = 0.0
+
+    def summary(self, graph: "StageGraph") -> Dict:
+        path, path_ms = graph.critical_path(self.durations_ms)
+        return {
+            "status": self.status,
+            "durations_ms": self.durations_ms,
+            "errors": self.errors,
+            "wall_ms": round(self.wall_ms, 1),
+            "sum_of_stages_ms": round(sum(self.durations_ms.values()), 1),
+            "critical_path": path,
+            "critical_path_ms": round(path_ms, 1),
+        }
+
+
+class StageGraph:
+    """
+    Dependency graph of pipeline stages executed on a shared, bounded pool.
+
+    A stage starts as soon as every stage it runs `after` has succeeded, so
+    independent stages overlap and the run takes roughly the critical path
+    instead of the sum. A failing stage only skips its dependents; if the stage
+    is `critical`, nothing new is started and StageFailed is raised once the
+    stages already in flight have finished.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Any], after: Iterable[str] = (),
+            critical: bool = False) -> "StageGraph":
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        self.stages[name] = Stage(name, func, after, critical)
+        return self
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.after:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+        self.topological_order()
+
+    def topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle in stage graph at '{name}'")
+            state[name] = 1
+            for dep in self.stages[name].after:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def critical_path(self, durations_ms: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest chain of dependent stages by measured duration."""
+        best: Dict[str, float] = {}
+        prev: Dict[str, Optional[str]] = {}
+        for name in self.topological_order():
+            deps = [d for d in self.stages[name].after if d in best]
+            parent = max(deps, key=lambda d: best[d], default=None)
+            best[name] = durations_ms.get(name, 0.0) + (best[parent] if parent else 0.0)
+            prev[name] = parent
+        if not best:
+            return [], 0.0
+        end = max(best, key=best.get)
+        path = [end]
+        while prev[path[-1]]:
+            path.append(prev[path[-1]])
+        return list(reversed(path)), best[end]
+
+    def run(self, executor: Executor, on_start: Optional[Callable[[str], None]] = None,
+            on_finish: Optional[Callable[[str, str, Optional[str]], None]] = None) -> StageRun:
+        """
+        Execute the graph. `on_start(name)` and `on_finish(name, status, error)` are
+        called from the coordinating thread; status is done | failed | skipped.
+        """
+        self._validate()
+        run = StageRun()
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        aborted: Optional[StageFailed] = None
+        started = time.time()
+
+        def finish(name: str, status: str, error: Optional[str] = None):
+            run.status[name] = status
+            if error:
+                run.errors[name] = error
+            if on_finish:
+                on_finish(name, status, error)
+
+        while pending or running:
+            for name, stage in list(pending.items()):
+                dep_status = [run.status.get(dep) for dep in stage.after]
+                if aborted or any(s in ("failed", "skipped") for s in dep_status):
+                    del pending[name]
+                    finish(name, "skipped", None)
+                elif all(s == "done" for s in dep_status):
+                    del pending[name]
+                    if on_start:
+                        on_start(name)
+                    run.started_at[name] = time.time()
+                    running[executor.submit(stage.func, run.results)] = name
+            if not running:
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                run.durations_ms[name] = round((time.time() - run.started_at[name]) * 1000, 1)
+                error = future.exception()
+                if error is None:
+                    run.results[name] = future.result()
+                    finish(name, "done")
+                elif isinstance(error, SkipStage):
+                    logger.info(f"⏭️ Stage '{name}' skipped: {error}")
+                    finish(name, "skipped", None)
+                else:
+                    logger.error(f"❌ Stage '{name}' failed: {error}")
+                    finish(name, "failed", str(error))
+                    if self.stages[name].critical and not aborted:
+                        aborted = StageFailed(name, error, run)
+
+        run.wall_ms = (time.time() - started) * 1000
+        if aborted:
+            raise aborted
+        return run
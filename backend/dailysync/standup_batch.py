@@ -0,0 +1,106 @@
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from long_summary import estimate_tokens
+from meeting_summary import JSON_GENERATION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_TOKENS = 6000
+MAX_USERS_PER_BATCH = 15   # keeps each reply well inside the output token limit
+
+STANDUP_FORMAT = """✅ What I did:
+- [List completed items]
+
+🚧 In progress:
+- [List WIP items]
+
+❌ Blockers:
+- [List blockers or "None"]"""
+
+BATCH_PROMPT = """Generate a concise standup update for each team member below.
+
+Each update must use this exact format (no bullet numbers, no extra lines):
+
+{format}
+
+Team activity (JSON, keyed by user ID):
+{activity}
+
+Return ONLY a JSON object mapping every user ID above to that user's update text, e.g. {{"U123": "✅ What I did:\\n- ..."}}."""
+
+
+def clean_standup_text(text: str) -> str:
+    """Same clean-up as the per-user call: dash bullets and no blank lines."""
+    text = text.strip().replace("• ", "- ")
+    return "\n".join(line.strip() for line in text.split("\n") if line.strip())
+
+
+def split_batches(activity: Dict[str, Dict], max_tokens: int = DEFAULT_BATCH_TOKENS,
+                  max_users: int = MAX_USERS_PER_BATCH) -> List[Dict[str, Dict]]:
+    """Group users so each batch prompt stays within the token budget."""
+    batches: List[Dict[str, Dict]] = []
+    current: Dict[str, Dict] = {}
+    size = estimate_tokens(BATCH_PROMPT)
+    base = size
+    for user_id, data in activity.items():
+        cost = estimate_tokens(json.dumps({user_id: data}))
+        if current and (size + cost > max_tokens or len(current) >= max_users):
+            batches.append(current)
+            current, size = {}, base
+        current[user_id] = data
+        size += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _run_batch(model, batch: Dict[str, Dict], **kwargs) -> Dict[str, str]:
+    prompt = BATCH_PROMPT.format(format=STANDUP_FORMAT, activity=json.dumps(batch, indent=1, ensure_ascii=False))
+    response = model.generate_content(prompt, generation_config=JSON_GENERATION_CONFIG, **kwargs)
+    data = json.loads(re.sub(r"```(?:json)?", "", response.text, flags=re.IGNORECASE).strip())
+    if not isinstance(data, dict):
+        raise ValueError("Batched standup response is not a JSON object")
+    return {str(k): v for k, v in data.items() if isinstance(v, str) and v.strip()}
+
+
+def summarize_standups(model, activity: Dict[str, Dict], single: Callable[[List[str], List[str]], str],
+                       max_batch_tokens: int = DEFAULT_BATCH_TOKENS, max_workers: int = 4,
+                       bypass_cache: bool = False) -> Dict[str, str]:
+    """
+    Generate standup updates for many users in a few structured LLM calls.
+
+    `activity` maps user ID -> {"commits": [...], "tasks": [...]}. Users are sent in
+    token-budgeted batches (in parallel); anyone missing from a reply, or in a batch
+    whose call failed, falls back to `single(commits, tasks)`.
+    """
+    activity = {uid: data for uid, data in activity.items() if data.get("commits") or data.get("tasks")}
+    if not activity:
+        return {}
+    updates: Dict[str, str] = {}
+    if model is not None:
+        batches = split_batches(activity, max_batch_tokens)
+        kwargs = {"bypass_cache": True} if bypass_cache else {}
+        logger.info(f"🧾 Generating {len(activity)} standup update(s) in {len(batches)} batch(es)")
+
+        def run(batch):
+            try:
+                return _run_batch(model, batch, **kwargs)
+            except Exception as e:
+                logger.error(f"❌ Batched standup call failed for {len(batch)} user(s): {e}")
+                return {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="standup-batch") as pool:
+            for result in pool.map(run, batches):
+                updates.update({uid: clean_standup_text(text) for uid, text in result.items() if uid in activity})
+
+    missing = [uid for uid in activity if uid not in updates]
+    if missing and model is not None:
+        logger.warning(f"⚠️ {len(missing)} user(s) missing from batched reply - falling back to per-user calls")
+    for uid in missing:
+        updates[uid] = single(activity[uid].get("commits", []), activity[uid].get("tasks", []))
+    # Keep the caller's user order
+    return {uid: updates[uid] for uid in activity}
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_ATTEMPTS = 3  # a failed update is retried with the next flushes, then dropped
+
+
+class StatusUpdateBuffer:
+    """
+    Collects Notion status changes during a polling cycle and writes them at the end.
+
+    Repeated updates to the same page are coalesced into one; the last status wins.
+    flush() sends the remaining PATCHes as one bounded concurrent batch through the
+    bulk writer, so they share its rate limit and retries. An update that still
+    fails stays pending for up to MAX_FLUSH_ATTEMPTS flushes, so the next poll
+    retries it, and a new status for that page replaces it ("coalesced").
+    Metrics are cumulative across cycles.
+    """
+
+    def __init__(self, writer, on_written: Optional[Callable[[Dict], None]] = None,
+                 max_attempts: int = MAX_FLUSH_ATTEMPTS):
+        self.writer = writer
+        self.on_written = on_written
+        self.max_attempts = max_attempts
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "coalesced": 0, "flushes": 0, "written": 0, "failed": 0, "retained": 0,
+                       "flush_ms_total": 0.0, "last_flush_ms": None, "last_flush_size": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def set_status(self, page_id: str, status: str, name: Optional[str] = None):
+        with self._lock:
+            self._stats["queued"] += 1
+            if page_id in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[page_id] = {"status": status, "name": name, "attempts": 0}
+
+    def flush(self) -> List[Dict]:
+        """Write every pending update; returns one writer result per page (updated / missing / failed) plus its name."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return []
+        started = time.time()
+        items = [{"page_id": page_id, "payload": {"properties": {"Status": {"select": {"name": update["status"]}}}}}
+                 for page_id, update in pending.items()]
+        results = self.writer.update_pages(items)
+        elapsed_ms = (time.time() - started) * 1000
+
+        written, retry = 0, {}
+        for result in results:
+            update = pending[result["page_id"]]
+            result["name"] = update["name"]
+            if result["status"] == "updated":
+                written += 1
+                logger.info(f"✅ Task '{update['name'] or result['page_id']}' marked as {update['status']}.")
+                if self.on_written:
+                    self.on_written(result["page"])
+            else:
+                logger.error(f"❌ Failed to update task '{update['name'] or result['page_id']}': {result['error']}")
+                # A page deleted in Notion ("missing") will not come back; anything else is worth another try
+                if result["status"] == "failed" and update["attempts"] + 1 < self.max_attempts:
+                    retry[result["page_id"]] = dict(update, attempts=update["attempts"] + 1)
+        with self._lock:
+            for page_id, update in retry.items():
+                # A status queued while this flush ran is newer than the one that failed
+                self._pending.setdefault(page_id, update)
+            self._stats["retained"] += len(retry)
+            self._stats["flushes"] += 1
+            self._stats["written"] += written
+            self._stats["failed"] += len(results) - written
+            self._stats["flush_ms_total"] += elapsed_ms
+            self._stats["last_flush_ms"] = round(elapsed_ms, 1)
+            self._stats["last_flush_size"] = len(results)
+        logger.info(f"📤 Flushed {len(results)} status update(s) in {elapsed_ms:.0f}ms "
+                    f"({written} written, {len(results) - written} failed)")
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        stats["flush_ms_total"] = round(stats["flush_ms_total"], 1)
+        stats["coalesced_pct"] = round(100.0 * stats["coalesced"] / stats["queued"], 1) if stats["queued"] else 0.0
+        return stats
@@ -1,14 +1,14 @@
-import os
 import json
-import google.generativeai as genai
 from dotenv import load_dotenv
+from llm_router import get_router
+from long_summary import estimate_tokens
+from standup_batch import DEFAULT_BATCH_TOKENS
 
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
-
-model = genai.GenerativeModel("gemini-2.0-flash")
+# Standups route to the lite tier when LLM_MODEL_TIERS configures one, otherwise to the standard model;
+# main.py reuses this model for batched standups, so it is routed at the batch size
+model = get_router().model_for("standup", DEFAULT_BATCH_TOKENS, "standup:v1")[0]
 
 def summarize_user_activity(user_commits, user_tasks):
     prompt = f"""Generate a concise standup update in this exact format (no bullet numbers, no extra lines):
@@ -27,7 +27,8 @@ GitHub Commits: {user_commits}
 Notion Tasks: {user_tasks}"""
 
     try:
-        response = model.generate_content(prompt)
+        user_model, _ = get_router().model_for("standup", estimate_tokens(prompt), "standup:v1")
+        response = user_model.generate_content(prompt)
         # Clean up the response
         summary = response.text.strip()
         # Remove any existing bullet points from LLM output
@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from long_summary import STOPWORDS, same_task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "task_index.db")
+DEDUP_MODES = ("off", "skip", "update")
+
+
+def normalize_task(task: str) -> str:
+    """Order-insensitive task text: lower-cased content words, sorted ("Fix the login bug!" -> "bug fix login")."""
+    return " ".join(sorted(set(re.findall(r"[a-z0-9]+", (task or "").lower())) - STOPWORDS))
+
+
+def normalize_assignee(assignee: Optional[str]) -> str:
+    name = " ".join((assignee or "").lower().split())
+    return "" if name in ("", "unassigned", "none", "null") else name
+
+
+def fingerprint(task: str, assignee: Optional[str], meeting: str = "") -> str:
+    key = "\x1f".join((normalize_task(task), normalize_assignee(assignee), " ".join((meeting or "").lower().split())))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def meeting_key(content: Union[bytes, str], kind: str = "audio") -> str:
+    """
+    Identity of one meeting, used as the de-duplication scope: e.g. "audio:<hash of
+    the decoded PCM>" for an upload, so a re-upload of the same recording is the
+    same meeting, or "live:<hash of the session id>". Titles are not enough: most
+    uploads share the default "Untitled Meeting".
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    return f"{kind}:{hashlib.sha256(content).hexdigest()[:16]}"
+
+
+def summary_meeting_key(data: Dict) -> str:
+    """
+    Meeting identity of a meeting_summary_input.json document: the key recorded when
+    it was written, or a hash of its tasks for files written before keys were stored.
+    """
+    if data.get("meeting_key"):
+        return data["meeting_key"]
+    tasks = sorted(f"{normalize_task(t.get('task'))}\x1f{normalize_assignee(t.get('assignee'))}"
+                   for t in data.get("tasks", []))
+    return meeting_key("\n".join(tasks), "file")
+
+
+class TaskIndex:
+    """
+    Local index of the task pages this app created, keyed by a fingerprint of the
+    normalized task text, assignee and meeting. The Notion write path checks it
+    before creating a page, so re-uploading or re-processing a meeting does not
+    create duplicates. In near mode, a rephrased item from the same meeting and
+    assignee also matches if its token-set similarity passes the map-reduce
+    merge threshold (long_summary.same_task).
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, near: bool = True):
+        self.db_path = db_path
+        self.near = near
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "exact_hits": 0, "near_hits": 0, "recorded": 0}
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    database_id TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    task TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    assignee TEXT NOT NULL,
+                    meeting TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (database_id, fingerprint)
+                )
+            """)
+            # Near-duplicate candidates are the tasks of the same meeting and assignee
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_scope ON tasks (database_id, meeting, assignee)")
+
+    def lookup(self, database_id: str, task: str, assignee: Optional[str], meeting: str = "",
+               near: Optional[bool] = None) -> Optional[Dict]:
+        """The indexed page for this task, as {page_id, task, match: exact | near}, or None."""
+        near = self.near if near is None else near
+        with self._lock, self._connect() as conn:
+            self._stats["lookups"] += 1
+            row = conn.execute("SELECT page_id, task FROM tasks WHERE database_id = ? AND fingerprint = ?",
+                               (database_id, fingerprint(task, assignee, meeting))).fetchone()
+            if row:
+                self._stats["exact_hits"] += 1
+                return {"page_id": row[0], "task": row[1], "match": "exact"}
+            if not near:
+                return None
+            candidates = conn.execute(
+                "SELECT page_id, task, normalized FROM tasks WHERE database_id = ? AND meeting = ? AND assignee = ?",
+                (database_id, " ".join((meeting or "").lower().split()), normalize_assignee(assignee)),
+            ).fetchall()
+        normalized = normalize_task(task)
+        for page_id, indexed_task, indexed_normalized in candidates:
+            if same_task(normalized, indexed_normalized):
+                with self._lock:
+                    self._stats["near_hits"] += 1
+                return {"page_id": page_id, "task": indexed_task, "match": "near"}
+        return None
+
+    def record(self, database_id: str, page_id: str, task: str, assignee: Optional[str], meeting: str = ""):
+        with self._lock, self._connect() as conn:
+            self._stats["recorded"] += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks (database_id, fingerprint, page_id, task, normalized, assignee, meeting, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (database_id, fingerprint(task, assignee, meeting), page_id, task, normalize_task(task),
+                 normalize_assignee(assignee), " ".join((meeting or "").lower().split()), time.time()),
+            )
+
+    def forget(self, page_id: str):
+        """Drop a page that no longer exists in Notion, so the next write recreates it."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM tasks WHERE page_id = ?", (page_id,))
+
+    def stats(self) -> Dict:
+        with self._lock, self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            stats = dict(self._stats)
+        return {"entries": entries, "near": self.near, **stats}
+
+
+def dedupe_batch(tasks: List[Dict], near: bool = True) -> List[Optional[int]]:
+    """For each task, the index of an earlier task in the same batch it duplicates, or None."""
+    duplicates: List[Optional[int]] = []
+    for i, task in enumerate(tasks):
+        match = None
+        for j in range(i):
+            if duplicates[j] is not None or \
+                    normalize_assignee(tasks[j].get("assignee")) != normalize_assignee(task.get("assignee")):
+                continue
+            a, b = normalize_task(tasks[j]["task"]), normalize_task(task["task"])
+            if a == b or (near and same_task(a, b)):
+                match = j
+                break
+        duplicates.append(match)
+    return duplicates
+
+
+def get_dedup_mode() -> str:
+    """NOTION_DEDUP_MODE, falling back to "skip" (with a warning) when it is not one of DEDUP_MODES."""
+    mode = os.getenv("NOTION_DEDUP_MODE", "skip").strip().lower()
+    if mode not in DEDUP_MODES:
+        logger.warning(f"⚠️ Unknown NOTION_DEDUP_MODE '{mode}' (expected {', '.join(DEDUP_MODES)}), using 'skip'")
+        return "skip"
+    return mode
+
+
+_index: Optional[TaskIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_task_index() -> TaskIndex:
+    """The process-wide index, configured from NOTION_TASK_INDEX_PATH / NOTION_DEDUP_NEAR."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TaskIndex(
+                db_path=os.getenv("NOTION_TASK_INDEX_PATH", DEFAULT_DB_PATH),
+                near=os.getenv("NOTION_DEDUP_NEAR", "true").lower() == "true",
+            )
+        return _index
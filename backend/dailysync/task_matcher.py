@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+
+def task_name(page: Dict) -> Optional[str]:
+    """Lower-cased task title of a Notion page, as matched against commit messages."""
+    parts = page.get("properties", {}).get("Task", {}).get("title") or []
+    name = "".join(p.get("plain_text") or p.get("text", {}).get("content", "") for p in parts).strip().lower()
+    return name or None
+
+
+class TaskMatcher:
+    """
+    Aho-Corasick automaton over task names.
+
+    Matching keeps the old rule (a task matches when its name is a substring of the
+    lower-cased commit message) but scans each message once for every task at the
+    same time, so a poll costs O(total message length + matches) instead of
+    O(tasks × commits) substring searches.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]      # pattern ids ending exactly at this node
+        self._out_link: List[int] = [0]        # nearest suffix node with output (0 = none)
+        self._keys: List[List[Hashable]] = []  # pattern id -> keys (several tasks can share a name)
+        self._ids: Dict[str, int] = {}
+        self._built = False
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Dict]) -> "TaskMatcher":
+        """Matcher over Notion task pages, keyed by page ID."""
+        matcher = cls()
+        for page in pages:
+            name = task_name(page)
+            if name:
+                matcher.add(name, page["id"])
+        return matcher.build()
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._keys)
+
+    def add(self, name: str, key: Hashable) -> "TaskMatcher":
+        name = name.strip().lower()
+        if not name:
+            return self
+        if name in self._ids:
+            self._keys[self._ids[name]].append(key)
+            return self
+        node = 0
+        for ch in name:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._out_link.append(0)
+            node = nxt
+        self._ids[name] = len(self._keys)
+        self._keys.append([key])
+        self._out[node].append(self._ids[name])
+        self._built = False
+        return self
+
+    def build(self) -> "TaskMatcher":
+        """Compute failure and output links breadth-first."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._out_link[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[child] = fail
+                self._out_link[child] = fail if self._out[fail] else self._out_link[fail]
+                queue.append(child)
+        self._built = True
+        return self
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Keys of every task whose name occurs in text."""
+        return set(self.match_batch([text]))
+
+    def match_batch(self, messages: Iterable[str]) -> Dict[Hashable, List[int]]:
+        """
+        Scan several commit messages in one pass. Returns {key: [indices of the
+        messages that mention it]} for every matched task.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        hits: Dict[int, List[int]] = {}
+        for index, message in enumerate(messages):
+            node = 0
+            for ch in (message or "").lower():
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                found = node if out[node] else out_link[node]
+                while found:
+                    for pattern in out[found]:
+                        seen = hits.setdefault(pattern, [])
+                        if not seen or seen[-1] != index:
+                            seen.append(index)
+                    found = out_link[found]
+        matches: Dict[Hashable, List[int]] = {}
+        for pattern, indices in hits.items():
+            for key in self._keys[pattern]:
+                matches[key] = indices
+        return matches
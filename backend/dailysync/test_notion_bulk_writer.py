@@ -0,0 +1,88 @@
+"""
+A page creation whose response was lost must not be sent twice. Run with
+`python test_notion_bulk_writer.py` (or pytest). Notion is replaced by a fake
+session, so no token is needed.
+"""
+
+import os
+import tempfile
+
+import requests
+
+from notion_bulk_writer import NotionBulkWriter
+
+TASKS = [{"task": "Fix the login redirect", "assignee": "Shreya", "due": "2026-10-25"}]
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+
+class FakeNotion:
+    """Creates every page it is sent, but can fail the first responses after the write."""
+
+    def __init__(self, lost_responses=0, error_status=None):
+        self.lost_responses = lost_responses
+        self.error_status = error_status
+        self.pages = []
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        page = {"id": f"page-{len(self.pages)}", "properties": json["properties"]}
+        self.pages.append(page)
+        if self.lost_responses:
+            self.lost_responses -= 1
+            if self.error_status:
+                return Response(self.error_status, {"message": "gateway timeout"})
+            raise requests.ConnectionError("connection reset")
+        return Response(200, page)
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        # Database query used by the writer's lookup before a retry
+        title = json["filter"]["and"][0]["title"]["equals"]
+        found = [p for p in self.pages if p["properties"]["Task"]["title"][0]["text"]["content"] == title]
+        return Response(200, {"results": found, "has_more": False})
+
+
+def writer_with(notion, tmp):
+    writer = NotionBulkWriter({}, rate=1000, max_retries=3, base_delay_s=0,
+                              ledger_path=os.path.join(tmp, "writes.db"))
+    writer._session = notion
+    return writer
+
+
+def test_lost_create_response_is_not_duplicated():
+    for notion in (FakeNotion(lost_responses=1), FakeNotion(lost_responses=1, error_status=504)):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = writer_with(notion, tmp)
+            result = writer.add_tasks("test-database", TASKS, scope="meeting")[0]
+            again = writer.add_tasks("test-database", TASKS, scope="meeting")[0]
+        assert len(notion.pages) == 1, notion.pages
+        assert result["status"] == "created" and result["page_id"] == "page-0", result
+        assert again["status"] == "skipped", again
+        assert writer.stats()["recovered"] == 1
+
+
+def test_create_without_lookup_is_not_retried():
+    notion = FakeNotion(lost_responses=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = writer_with(notion, tmp)
+        result = writer.create_pages([{"payload": {"properties": {"Task": {}}}, "key": "k"}])[0]
+    assert len(notion.pages) == 1, notion.pages
+    assert result["status"] == "failed" and result["attempts"] == 1, result
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            try:
+                check()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                print(f"❌ {name}: {e}")
@@ -0,0 +1,87 @@
+"""
+Checks for the VAD pre-pass on synthetic audio. Run with `python test_vad.py`
+(or pytest). Needs only numpy.
+"""
+
+import numpy as np
+
+from audio_decode import SAMPLE_RATE
+from vad import apply_vad
+
+
+def speech_like(seconds: float, rms: float, rng) -> np.ndarray:
+    """Voiced 'syllables' of ~0.25 s with uneven loudness and dips between them, at roughly `rms`."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    syllable_gain = rng.uniform(0.2, 1.5, int(seconds * 4) + 1)[(t * 4).astype(int)]
+    envelope = syllable_gain * (0.55 + 0.45 * np.sin(2 * np.pi * 4 * t))
+    voice = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t + rng.uniform(0, np.pi))
+    signal = envelope * voice
+    return (signal * rms / np.sqrt(np.mean(signal ** 2))).astype(np.float32)
+
+
+def build(pattern, speech_rms: float, noise_rms: float, seed: int = 0):
+    """Concatenate (kind, seconds) parts over constant background noise; returns audio and a speech mask."""
+    rng = np.random.default_rng(seed)
+    parts, mask = [], []
+    for kind, seconds in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        parts.append(speech_like(seconds, speech_rms, rng) if kind == "speech" else np.zeros(n, np.float32))
+        mask.append(np.full(n, kind == "speech"))
+    audio = np.concatenate(parts)
+    audio += rng.normal(0, noise_rms, len(audio)).astype(np.float32)
+    return audio, np.concatenate(mask)
+
+
+def kept_share(result, mask) -> float:
+    kept = np.zeros(len(mask), dtype=bool)
+    for start, end in result.regions:
+        kept[start:end] = True
+    return kept[mask].mean()
+
+
+def test_quiet_speaker_over_background_noise():
+    # Speaker only ~6 dB above a steady fan/air-conditioning hum, with normal pauses
+    pattern = [("speech", 4), ("silence", 0.8), ("speech", 3), ("silence", 0.5), ("speech", 5), ("silence", 0.9)] * 4
+    audio, mask = build(pattern, speech_rms=0.02, noise_rms=0.01)
+    result = apply_vad(audio)
+    assert kept_share(result, mask) > 0.99, f"quiet speech was cut: kept {kept_share(result, mask):.1%}"
+
+
+def test_long_silences_are_still_removed():
+    pattern = [("speech", 6), ("silence", 4)] * 5
+    audio, mask = build(pattern, speech_rms=0.1, noise_rms=0.002)
+    result = apply_vad(audio)
+    assert kept_share(result, mask) > 0.99
+    assert result.stats()["removed_pct"] > 25, result.stats()
+
+
+def test_mostly_silent_recording_is_trimmed():
+    # 80% silence over room noise, e.g. a call left running between short exchanges
+    pattern = [("speech", 3), ("silence", 12)] * 3
+    audio, mask = build(pattern, speech_rms=0.1, noise_rms=0.01)
+    result = apply_vad(audio)
+    assert kept_share(result, mask) > 0.99
+    assert result.stats()["removed_pct"] > 70, result.stats()
+    assert result.suspect_gaps == 0
+
+
+def test_missed_quiet_speaker_is_kept():
+    # A second speaker far from the microphone, below the speech threshold most of the time
+    pattern = [("speech", 5), ("silence", 4), ("quiet", 5), ("silence", 4), ("speech", 5)]
+    audio, _ = build([(kind if kind != "quiet" else "silence", s) for kind, s in pattern], 0.1, 0.01)
+    quiet_mask = np.concatenate([np.full(int(s * SAMPLE_RATE), kind == "quiet") for kind, s in pattern])
+    audio[quiet_mask] += speech_like(5, 0.004, np.random.default_rng(3))
+    result = apply_vad(audio)
+    assert result.suspect_gaps >= 1, result.stats()
+    assert kept_share(result, quiet_mask) > 0.9, f"quiet speaker was cut: kept {kept_share(result, quiet_mask):.1%}"
+    assert result.stats()["removed_pct"] > 20, result.stats()
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            try:
+                check()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                print(f"❌ {name}: {e}")
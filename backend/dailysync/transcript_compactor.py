@@ -0,0 +1,99 @@
+import re
+from typing import Dict, List, Tuple
+
+from long_summary import estimate_tokens
+
+# Pure disfluencies: dropping them never changes what was said
+FILLERS = {"um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "mm", "mhm", "mm-hmm", "uh-huh"}
+# Discourse fillers, only removed when set off by commas ("so, you know, we ...")
+COMMA_FILLERS = re.compile(r",\s*(?:you know|i mean|like|basically|actually)\s*,", re.IGNORECASE)
+# Words that are legitimately doubled ("I know that that works", "we had had it")
+ALLOWED_DOUBLES = {"that", "had"}
+MAX_LOOP_WORDS = 16   # longest phrase checked for back-to-back repetition
+
+
+def _norm(word: str) -> str:
+    return re.sub(r"[^\w'-]", "", word.lower())
+
+
+def _remove_fillers(words: List[str]) -> Tuple[List[str], int]:
+    kept: List[str] = []
+    removed = 0
+    for word in words:
+        if _norm(word) in FILLERS:
+            removed += 1
+            tail = re.sub(r"^[\w'-]+", "", word)
+            if tail and kept and tail[0] in ".?!":
+                # Keep sentence punctuation that was attached to the filler ("so um." -> "so.")
+                kept[-1] = kept[-1].rstrip(",;:") + tail[0]
+            elif tail.startswith(",") and kept and kept[-1].endswith(","):
+                # "will, um, fix" -> "will fix"
+                kept[-1] = kept[-1][:-1]
+            continue
+        kept.append(word)
+    return kept, removed
+
+
+def _collapse_repeats(words: List[str]) -> Tuple[List[str], int]:
+    """
+    Collapse a phrase repeated back to back ("we need to we need to", or a Whisper
+    loop of "Thank you. Thank you. Thank you.") to a single copy. The shortest
+    repeating phrase wins, so a loop collapses to one copy and not to two.
+    """
+    normalized = [_norm(w) for w in words]
+    kept: List[str] = []
+    collapsed = 0
+    i = 0
+    while i < len(words):
+        for n in range(1, min(MAX_LOOP_WORDS, (len(words) - i) // 2) + 1):
+            phrase = normalized[i:i + n]
+            if not any(phrase) or (n == 1 and (phrase[0] in ALLOWED_DOUBLES or phrase[0].isdigit())):
+                continue
+            repeats = 1
+            while normalized[i + repeats * n:i + (repeats + 1) * n] == phrase:
+                repeats += 1
+            if repeats > 1:
+                # Keep the last copy: it carries the punctuation that ends the run
+                kept.extend(words[i + (repeats - 1) * n:i + repeats * n])
+                collapsed += (repeats - 1) * n
+                i += repeats * n
+                break
+        else:
+            kept.append(words[i])
+            i += 1
+    return kept, collapsed
+
+
+def compact_transcript(text: str) -> Tuple[str, Dict]:
+    """
+    Shrink a Whisper transcript before it goes into an LLM prompt: drop filler
+    words, collapse stutters and repetition loops, and normalize whitespace.
+    Content words are never rewritten.
+
+    Returns (compacted_text, stats) where stats reports the estimated tokens saved.
+    """
+    original = text or ""
+    text = COMMA_FILLERS.sub(",", original)
+    text = re.sub(r"([,;:])(?:\s*\1)+", r"\1", text)   # ",," left behind by removals
+    text = re.sub(r"\.{4,}", "...", text)
+    words, fillers_removed = _remove_fillers(text.split())
+    repeated_words = 0
+    while True:
+        # A second pass catches loops that only line up once inner stutters are gone
+        words, collapsed = _collapse_repeats(words)
+        repeated_words += collapsed
+        if not collapsed:
+            break
+    compacted = " ".join(words)
+    compacted = re.sub(r"\s+([,.;:?!])", r"\1", compacted)
+    compacted = re.sub(r"(^|[.?!]\s+),\s*", r"\1", compacted).strip(" ,")
+
+    before, after = estimate_tokens(original), estimate_tokens(compacted)
+    return compacted, {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "saved_pct": round(100.0 * (before - after) / before, 1) if before else 0.0,
+        "fillers_removed": fillers_removed,
+        "repeated_words_removed": repeated_words,
+    }
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "transcription_cache.db")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def audio_hash(audio: np.ndarray):
+    """SHA-256 of the decoded PCM, read in place through the buffer protocol (no copy of the audio)."""
+    digest = hashlib.sha256()
+    digest.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B"))
+    return digest
+
+
+def audio_cache_key(audio: np.ndarray, model_name: str, options: Dict, pcm_hash=None) -> str:
+    """
+    Content address of a transcription: decoded PCM + model + decode options.
+    Pass `pcm_hash` (from audio_hash) when the audio was already hashed, so it is not read again.
+    """
+    digest = (pcm_hash or audio_hash(audio)).copy()
+    digest.update(model_name.encode())
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    On-disk cache of Whisper results keyed by a hash of the decoded audio.
+
+    Entries live in SQLite and are evicted least-recently-used first once the
+    stored results exceed max_bytes. Hit/miss counters are persisted too, so the
+    hit rate on /cache/stats covers more than the current process.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    audio_bytes INTEGER NOT NULL,
+                    audio_seconds REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: float = 1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, audio_bytes, audio_seconds FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                self._bump(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self._bump(conn, "hits")
+            self._bump(conn, "audio_bytes_saved", row[1])
+            self._bump(conn, "audio_seconds_saved", row[2])
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict, audio_bytes: int, audio_seconds: float):
+        payload = json.dumps(result)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, result, size, audio_bytes, audio_seconds, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload), audio_bytes, audio_seconds, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump(conn, "evictions", evicted)
+        logger.info(f"🧹 Transcription cache evicted {evicted} entr{'y' if evicted == 1 else 'ies'}")
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict:
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "evictions": int(counters.get("evictions", 0)),
+            "audio_bytes_saved": int(counters.get("audio_bytes_saved", 0)),
+            "audio_seconds_saved": round(counters.get("audio_seconds_saved", 0.0), 1),
+        }
@@ -0,0 +1,307 @@
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence
+
+from model_registry import DEFAULT_IDLE_UNLOAD_S, DEFAULT_REGISTRY_BUDGET_MB, MODEL_WEIGHTS_MB, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident memory of one CPU worker process per Whisper model (weights + torch runtime)
+MODEL_MEMORY_MB = {
+    "tiny": 400,
+    "base": 550,
+    "small": 1100,
+    "medium": 2600,
+    "large": 5200,
+}
+WARMUP_SAMPLES = 16000  # one second of silence at 16 kHz
+
+
+def _total_memory_mb() -> Optional[int]:
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024))
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def worker_memory_mb(model_name: str, models: Optional[Sequence[str]] = None,
+                     registry_budget_mb: Optional[int] = None) -> int:
+    """
+    Peak resident memory of one worker: the torch runtime plus the most model
+    weights its ModelRegistry can hold at once. That is the tiers in `models` up to
+    `registry_budget_mb`, but never less than the pinned default model plus the
+    largest other tier, which the registry loads even when they exceed the budget.
+    """
+    resident = MODEL_MEMORY_MB.get(model_name, MODEL_MEMORY_MB["base"])
+    default_weights = MODEL_WEIGHTS_MB.get(model_name, 0)
+    extra = [MODEL_WEIGHTS_MB.get(name, 0) for name in set(models or []) - {model_name}]
+    runtime = resident - default_weights
+    total = default_weights + sum(extra)
+    held = total if registry_budget_mb is None else min(total, registry_budget_mb)
+    return max(resident, runtime + max(held, default_weights + max(extra, default=0)))
+
+
+def default_worker_count(model_name: str, memory_budget_mb: Optional[int] = None,
+                         models: Optional[Sequence[str]] = None, registry_budget_mb: Optional[int] = None) -> int:
+    """
+    Number of warm workers to run: one per CPU core, capped by how many workers fit
+    in the memory budget (defaults to half of physical memory), each sized for
+    every tier it may keep loaded (see worker_memory_mb).
+    """
+    cpu_count = os.cpu_count() or 1
+    if memory_budget_mb is None:
+        total = _total_memory_mb()
+        memory_budget_mb = total // 2 if total else 4096
+    per_worker = worker_memory_mb(model_name, models, registry_budget_mb)
+    return max(1, min(cpu_count, memory_budget_mb // per_worker))
+
+
+def _worker_main(worker_id: int, model_name: str, torch_threads: int, registry_budget_mb: int,
+                 idle_unload_s: float, task_queue: mp.Queue, result_queue: mp.Queue):
+    """
+    Entry point of a worker process: load the default model, then serve jobs until
+    told to stop. Other tiers are loaded on demand and unloaded when idle.
+    """
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    import whisper
+
+    # The default model stays loaded for the worker's lifetime; only the extra tiers are evicted
+    registry = ModelRegistry(whisper.load_model, registry_budget_mb, idle_unload_s, pinned=[model_name])
+    model = registry.get(model_name)
+    # A first inference allocates buffers and primes kernels; pay for it before reporting ready
+    try:
+        import numpy as np
+        model.transcribe(np.zeros(WARMUP_SAMPLES, dtype=np.float32), fp16=False)
+    except Exception as e:
+        logger.warning(f"Whisper worker {worker_id} warm-up inference failed: {e}")
+    result_queue.put(("ready", worker_id, None, registry.loaded()))
+    poll_s = min(idle_unload_s, 60.0) if idle_unload_s else None
+
+    while True:
+        try:
+            task = task_queue.get(timeout=poll_s)
+        except queue.Empty:
+            if registry.unload_idle():
+                result_queue.put(("models", worker_id, None, registry.loaded()))
+            continue
+        if task is None:
+            break
+        task_id, audio, task_model, options = task
+        result_queue.put(("started", worker_id, task_id, None))
+        loaded_before = registry.loaded()
+        try:
+            result = registry.get(task_model).transcribe(audio, **options)
+            result_queue.put(("result", worker_id, task_id, result))
+        except Exception as e:
+            result_queue.put(("error", worker_id, task_id, f"{type(e).__name__}: {e}"))
+        registry.unload_idle()
+        if registry.loaded() != loaded_before:
+            result_queue.put(("models", worker_id, None, registry.loaded()))
+
+
+class TranscriptionEngine:
+    """
+    Pool of pre-started Whisper worker processes.
+
+    Each worker loads the model once and pulls audio jobs from a shared queue, so
+    concurrent transcriptions run on separate cores instead of queueing behind the
+    GIL on the request thread. `audio` may be a file path or a 16 kHz float32 array.
+
+    `model_name` is the default tier; any name in `models` can be requested per
+    call and is loaded lazily into each worker's ModelRegistry.
+    """
+
+    def __init__(self, model_name: str = "base", num_workers: Optional[int] = None,
+                 memory_budget_mb: Optional[int] = None, models: Optional[Sequence[str]] = None,
+                 registry_budget_mb: int = DEFAULT_REGISTRY_BUDGET_MB,
+                 idle_unload_s: float = DEFAULT_IDLE_UNLOAD_S):
+        self.model_name = model_name
+        self.models = list(models or [model_name])
+        if model_name not in self.models:
+            self.models.append(model_name)
+        self.registry_budget_mb = registry_budget_mb
+        self.idle_unload_s = idle_unload_s
+        self.num_workers = num_workers or default_worker_count(model_name, memory_budget_mb, self.models,
+                                                               registry_budget_mb)
+        cpu_count = os.cpu_count() or 1
+        self.torch_threads = max(1, cpu_count // self.num_workers)
+
+        self._ctx = mp.get_context("spawn")
+        self._task_queue = None
+        self._result_queue = None
+        self._processes: Dict[int, mp.Process] = {}
+        self._futures: Dict[int, Future] = {}
+        self._in_flight: Dict[int, int] = {}  # worker_id -> task_id
+        self._ready_workers = set()
+        self._loaded_models: Dict[int, List[str]] = {}
+        self._task_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._running = False
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "worker_restarts": 0}
+
+    # --- Lifecycle ---
+    def start(self):
+        """Spawn the worker processes. Safe to call more than once."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._task_queue = self._ctx.Queue()
+            self._result_queue = self._ctx.Queue()
+            for worker_id in range(self.num_workers):
+                self._spawn_worker(worker_id)
+        self._collector = threading.Thread(target=self._collect_results, name="transcription-collector", daemon=True)
+        self._collector.start()
+        logger.info(f"🎧 Transcription engine started: {self.num_workers} worker(s) × Whisper '{self.model_name}' "
+                    f"({self.torch_threads} torch thread(s) each)")
+
+    def stop(self, timeout: float = 10.0):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            for _ in self._processes:
+                self._task_queue.put(None)
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = {}
+
+    def _spawn_worker(self, worker_id: int):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.model_name, self.torch_threads, self.registry_budget_mb, self.idle_unload_s,
+                  self._task_queue, self._result_queue),
+            name=f"whisper-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    # --- Public API ---
+    @property
+    def ready(self) -> bool:
+        return bool(self._ready_workers)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one worker has loaded its model and finished warm-up."""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.ready:
+            if not self._running or not self._processes:
+                return False
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.2)
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker (not counting those being transcribed)."""
+        with self._lock:
+            return max(0, len(self._futures) - len(self._in_flight))
+
+    def submit(self, audio, model: Optional[str] = None, **options) -> Future:
+        """Queue audio for transcription and return a Future resolving to Whisper's result dict."""
+        model = model or self.model_name
+        if model not in self.models:
+            raise ValueError(f"Whisper model '{model}' is not enabled (available: {', '.join(self.models)})")
+        if not self._running:
+            self.start()
+        future: Future = Future()
+        with self._lock:
+            if not self._processes:
+                raise RuntimeError(f"No Whisper workers available (model '{self.model_name}' failed to load)")
+            task_id = next(self._task_ids)
+            self._futures[task_id] = future
+            self._stats["submitted"] += 1
+        self._task_queue.put((task_id, audio, model, options))
+        return future
+
+    def transcribe(self, audio, timeout: Optional[float] = None, **options) -> Dict:
+        return self.submit(audio, **options).result(timeout=timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "models": self.models,
+                "loaded_models": {str(wid): names for wid, names in self._loaded_models.items()},
+                "workers": self.num_workers,
+                "ready_workers": len(self._ready_workers),
+                "busy_workers": len(self._in_flight),
+                "pending": len(self._futures),
+                **self._stats,
+            }
+
+    # --- Result collection ---
+    def _collect_results(self):
+        while self._running:
+            try:
+                kind, worker_id, task_id, payload = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                self._check_workers()
+                continue
+
+            with self._lock:
+                if kind == "ready":
+                    self._ready_workers.add(worker_id)
+                    self._loaded_models[worker_id] = payload
+                    continue
+                if kind == "models":
+                    self._loaded_models[worker_id] = payload
+                    continue
+                if kind == "started":
+                    self._in_flight[worker_id] = task_id
+                    continue
+                self._in_flight.pop(worker_id, None)
+                future = self._futures.pop(task_id, None)
+                if kind == "result":
+                    self._stats["completed"] += 1
+                else:
+                    self._stats["failed"] += 1
+            if future is None:
+                continue
+            if kind == "result":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        """Replace workers that died (e.g. OOM-killed) and fail the job they were running."""
+        with self._lock:
+            if not self._running:
+                return
+            dead = [wid for wid, proc in self._processes.items() if not proc.is_alive()]
+            failed: List[Future] = []
+            for worker_id in dead:
+                task_id = self._in_flight.pop(worker_id, None)
+                if task_id is not None and task_id in self._futures:
+                    failed.append(self._futures.pop(task_id))
+                    self._stats["failed"] += 1
+                if worker_id not in self._ready_workers:
+                    # Died before the model finished loading; respawning would just crash-loop
+                    logger.error(f"❌ Whisper worker {worker_id} failed to load model '{self.model_name}'")
+                    del self._processes[worker_id]
+                    continue
+                logger.error(f"💥 Whisper worker {worker_id} exited unexpectedly - restarting it")
+                self._ready_workers.discard(worker_id)
+                self._loaded_models.pop(worker_id, None)
+                self._stats["worker_restarts"] += 1
+                self._spawn_worker(worker_id)
+            if not self._processes:
+                failed.extend(self._futures.values())
+                self._futures.clear()
+        for future in failed:
+            future.set_exception(RuntimeError("Whisper worker process died during transcription"))
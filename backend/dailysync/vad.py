@@ -0,0 +1,171 @@
+import bisect
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from audio_decode import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Import webrtcvad with error handling (optional, refines the energy detector)
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+    webrtcvad = None
+
+FRAME_S = 0.03
+MIN_SPEECH_S = 0.25     # shorter bursts are clicks, not speech
+MIN_SILENCE_S = 1.5     # only pauses at least this long are cut; shorter ones stay inside a speech region
+PAD_S = 0.3             # context kept around every region so words are not clipped
+ABSOLUTE_FLOOR = 0.004  # ~ -48 dBFS; anything quieter is silence regardless of the noise floor
+NOISE_MARGIN = 1.5      # ~ +3.5 dB over the noise floor; quiet speech over steady noise sits barely above it
+NEAR_THRESHOLD = 0.75   # frames within ~2.5 dB below the threshold may still be a quiet speaker
+SUSPECT_SHARE = 0.2     # a run inside a gap with at least this share of near-threshold frames is kept, not cut
+SUSPECT_MIN_S = 1.0     # shorter near-threshold runs are noise bursts
+
+
+class NoSpeechDetected(Exception):
+    """Raised when an upload contains no speech at all, so the model call can be skipped."""
+
+
+class VadResult:
+    """
+    Speech-only audio plus the map needed to translate timestamps in it back
+    to the original recording.
+    """
+
+    def __init__(self, audio: np.ndarray, regions: List[Tuple[int, int]], original_samples: int,
+                 sample_rate: int = SAMPLE_RATE, suspect_gaps: int = 0):
+        self.audio = audio
+        self.suspect_gaps = suspect_gaps
+        self.regions = regions
+        self.sample_rate = sample_rate
+        self.original_samples = original_samples
+        # Start of each region inside the condensed audio, in seconds
+        self._out_starts: List[float] = []
+        position = 0
+        for start, end in regions:
+            self._out_starts.append(position / sample_rate)
+            position += end - start
+
+    def to_original_time(self, t: float) -> float:
+        if not self.regions:
+            return t
+        index = max(0, bisect.bisect_right(self._out_starts, t) - 1)
+        return self.regions[index][0] / self.sample_rate + (t - self._out_starts[index])
+
+    def remap_result(self, result: Dict) -> Dict:
+        """Rewrite segment and word timestamps of a Whisper result in place."""
+        for segment in result.get("segments", []):
+            for word in segment.get("words") or []:
+                word["start"] = round(self.to_original_time(word["start"]), 2)
+                word["end"] = round(self.to_original_time(word["end"]), 2)
+            segment["start"] = round(self.to_original_time(segment["start"]), 2)
+            segment["end"] = round(self.to_original_time(segment["end"]), 2)
+        return result
+
+    def stats(self) -> Dict:
+        original_s = self.original_samples / self.sample_rate
+        speech_s = len(self.audio) / self.sample_rate
+        return {
+            "original_s": round(original_s, 1),
+            "speech_s": round(speech_s, 1),
+            "removed_s": round(original_s - speech_s, 1),
+            "removed_pct": round(100 * (1 - speech_s / original_s), 1) if original_s else 0.0,
+            "regions": len(self.regions),
+            "suspect_gaps": self.suspect_gaps,
+        }
+
+
+def _frame_energy(audio: np.ndarray, frame: int, noise_margin: float) -> Tuple[np.ndarray, float]:
+    """RMS per frame and the speech threshold for this recording."""
+    count = len(audio) // frame
+    frames = audio[:count * frame].reshape(count, frame)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    # Adaptive threshold: just above the recording's own noise floor, so a quiet speaker is not cut
+    noise_floor = float(np.percentile(energy, 10)) if count else 0.0
+    return energy, max(ABSOLUTE_FLOOR, noise_floor * noise_margin)
+
+
+def _webrtc_flags(audio: np.ndarray, frame: int, sample_rate: int) -> np.ndarray:
+    vad = webrtcvad.Vad(2)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+    count = len(audio) // frame
+    return np.array([vad.is_speech(pcm[i * frame * 2:(i + 1) * frame * 2], sample_rate) for i in range(count)])
+
+
+def _detect(audio: np.ndarray, sample_rate: int, noise_margin: float,
+            suspect_share: float) -> Tuple[List[Tuple[int, int]], int]:
+    frame = int(sample_rate * FRAME_S)
+    if len(audio) < frame:
+        return [], 0
+    energy, threshold = _frame_energy(audio, frame, noise_margin)
+    flags = energy > threshold
+    if WEBRTCVAD_AVAILABLE:
+        flags &= _webrtc_flags(audio, frame, sample_rate)
+
+    regions: List[List[int]] = []
+    min_gap = int(MIN_SILENCE_S / FRAME_S)
+    for index in np.flatnonzero(flags):
+        if regions and index - regions[-1][1] <= min_gap:
+            regions[-1][1] = index + 1
+        else:
+            regions.append([index, index + 1])
+    min_len = int(MIN_SPEECH_S / FRAME_S)
+    regions = [r for r in regions if r[1] - r[0] >= min_len]
+
+    # Each gap is checked on its own: a stretch that hovers just below the threshold is
+    # more likely a quiet speaker the detector missed than silence, so it is kept
+    near = energy >= threshold * NEAR_THRESHOLD
+    bounds = [0] + [edge for region in regions for edge in region] + [len(energy)]
+    suspect: List[List[int]] = []
+    for gap_start, gap_end in zip(bounds[::2], bounds[1::2]):
+        runs: List[List[int]] = []
+        for index in gap_start + np.flatnonzero(near[gap_start:gap_end]):
+            if runs and index - runs[-1][1] <= min_gap:
+                runs[-1][1] = index + 1
+            else:
+                runs.append([index, index + 1])
+        suspect += [run for run in runs if run[1] - run[0] >= SUSPECT_MIN_S / FRAME_S
+                    and near[run[0]:run[1]].mean() >= suspect_share]
+    regions = sorted(regions + suspect)
+
+    pad = int(PAD_S * sample_rate)
+    padded: List[Tuple[int, int]] = []
+    for start, end in regions:
+        s, e = max(0, start * frame - pad), min(len(audio), end * frame + pad)
+        if padded and s <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], e)
+        else:
+            padded.append((s, e))
+    return padded, len(suspect)
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, noise_margin: float = NOISE_MARGIN,
+                  suspect_share: float = SUSPECT_SHARE) -> List[Tuple[int, int]]:
+    """Return (start, end) sample ranges that contain speech, padded and merged."""
+    return _detect(audio, sample_rate, noise_margin, suspect_share)[0]
+
+
+def apply_vad(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, noise_margin: float = NOISE_MARGIN,
+              suspect_share: float = SUSPECT_SHARE) -> VadResult:
+    """
+    Keep only the speech regions of `audio`. Raises NoSpeechDetected when nothing
+    is left, which also stops Whisper from hallucinating text over silence.
+
+    A gap where at least `suspect_share` of the frames sit just below the threshold
+    is kept as a suspected quiet speaker; clearly silent gaps are still cut.
+    """
+    regions, suspect_gaps = _detect(audio, sample_rate, noise_margin, suspect_share)
+    if not regions:
+        raise NoSpeechDetected("No speech detected in the recording")
+    speech = np.concatenate([audio[start:end] for start, end in regions])
+    result = VadResult(speech, regions, len(audio), sample_rate, suspect_gaps=suspect_gaps)
+    stats = result.stats()
+    logger.info(f"🔇 VAD removed {stats['removed_s']}s of {stats['original_s']}s "
+                f"({stats['removed_pct']}%) across {stats['regions']} speech region(s), "
+                f"{suspect_gaps} near-threshold gap(s) kept")
+    return result
@@ -1,7 +1,5 @@
 from flask import Flask, request, jsonify
-import whisper
 import os
-import google.generativeai as genai
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import logging
@@ -11,12 +9,26 @@ import sys
 import json
 import re
 from dotenv import load_dotenv
-import tempfile
 import shutil
+import threading
+
+# Load environment variables from .env file before anything reads them (engine, Slack, dailysync modules)
+load_dotenv()
 
 # Add the dailysync directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "dailysync"))
 from notion_integration import process_meeting_summary
+from task_index import meeting_key
+from transcription_cache import audio_hash
+from transcription_engine import TranscriptionEngine
+from audio_decode import UnsupportedAudioFormat, check_ffmpeg, decode_audio_stream, duration_seconds
+from model_registry import parse_model_list, select_model
+from llm_client import get_client
+from llm_router import get_router
+from long_summary import estimate_tokens
+from transcript_compactor import compact_transcript
+from offline_summarizer import summarize_offline
+from meeting_summary import JSON_GENERATION_CONFIG, build_summary_prompt, parse_summary_response, render_slack, summary_result
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,21 +36,49 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Initialize Whisper model
-model = whisper.load_model("base")
+# Pool of warm Whisper worker processes (spawned on first use or at startup below)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+engine = TranscriptionEngine(
+    model_name=WHISPER_MODEL,
+    num_workers=int(os.getenv("WHISPER_WORKERS", "0")) or None,
+    memory_budget_mb=int(os.getenv("WHISPER_MEMORY_BUDGET_MB", "0")) or None,
+    models=parse_model_list(os.getenv("WHISPER_MODELS"), WHISPER_MODEL),
+    registry_budget_mb=int(os.getenv("WHISPER_REGISTRY_BUDGET_MB", "1024")),
+    idle_unload_s=float(os.getenv("WHISPER_IDLE_UNLOAD_S", "900")),
+)
 
 # Initialize Slack client
 slack_client = WebClient(token=os.getenv("SLACK_BOT_TOKEN")) if os.getenv("SLACK_BOT_TOKEN") else None
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-# Load environment variables from .env file
-load_dotenv()
+# Filled in by the background warm-up started in __main__
+ffmpeg_ready = False
+
+def warm_up():
+    global ffmpeg_ready
+    ffmpeg_ready = check_ffmpeg()
+    if engine.wait_ready():
+        logger.info("🔥 Whisper workers warmed up")
+
+@app.route("/health")
+def health():
+    return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
+
+@app.route("/ready")
+def ready():
+    checks = {"model": engine.ready, "ffmpeg": ffmpeg_ready}
+    is_ready = all(checks.values())
+    return jsonify({
+        "ready": is_ready,
+        "checks": checks,
+        "integrations": {"slack": bool(slack_client), "gemini": bool(os.getenv("GEMINI_API_KEY"))},
+    }), 200 if is_ready else 503
+
+@app.route("/llm/stats")
+def llm_stats():
+    return jsonify(get_client().stats())
 
 @app.route("/transcribe", methods=["POST"])
 def transcribe():
-    audio_path = None
     try:
         if "file" not in request.files:
             return jsonify({"error": "No file uploaded"}), 400
@@ -47,22 +87,35 @@ def transcribe():
         meeting_title = request.form.get("meetingTitle", "Untitled Meeting")
         slack_enabled = request.form.get("slackEnabled", "false").lower() == "true"
         notion_enabled = request.form.get("notionEnabled", "false").lower() == "true"
+        whisper_model = request.form.get("whisperModel", "").lower() or None
+        latency = request.form.get("latency", "").lower() or None
+        model, model_reason = select_model(
+            engine.models, engine.model_name, requested=whisper_model, latency=latency,
+            queue_depth=engine.queue_depth, downgrade_queue_depth=2 * engine.num_workers,
+        )
 
-        # Create a temporary file with proper extension
-        temp_dir = tempfile.gettempdir()
-        audio_path = os.path.join(temp_dir, f"temp_audio_{uuid.uuid4()}.wav")
-        audio_file.save(audio_path)
+        # Decode the upload straight from the request stream (format sniffed from its header)
+        try:
+            audio = decode_audio_stream(audio_file.stream)
+        except UnsupportedAudioFormat as e:
+            return jsonify({"error": str(e)}), 415
+        logger.info(f"Decoded {duration_seconds(audio):.1f}s of audio in memory")
+        # A re-upload of the same recording is the same meeting for Notion de-duplication
+        meeting = meeting_key(audio_hash(audio).hexdigest())
 
-        logger.info(f"Audio file saved to: {audio_path}")
         # Transcription using Whisper
-        logger.info("Starting transcription with Whisper...")
-        result = model.transcribe(audio_path)
+        logger.info(f"Starting transcription with Whisper '{model}' ({model_reason})...")
+        result = engine.transcribe(audio, model=model)
         transcription = result["text"]
         logger.info("Transcription completed")
 
+        # Strip fillers and repetition loops before the transcript reaches Gemini or Slack
+        compacted, compaction = compact_transcript(transcription)
+        logger.info(f"Transcript compacted: {compaction['tokens_before']} -> {compaction['tokens_after']} tokens")
+
         # Generate summary using Gemini
         logger.info("Generating summary with Gemini...")
-        summary = generate_summary(transcription)
+        summary = generate_summary(compacted, budget=latency)
         logger.info("Summary generated")
 
         # Create response data
@@ -71,6 +124,8 @@ def transcribe():
             "title": meeting_title,
             "timestamp": datetime.now().isoformat(),
             "transcript": transcription,
+            "compacted_transcript": compacted,
+            "compaction": compaction,
             "summary": summary
         }
 
@@ -91,10 +146,10 @@ def transcribe():
         try:
             if summary["structured_data_json"] is not None:
                 # Update meeting_summary_input.json with new data
-                update_meeting_summary_json(summary["structured_data_json"], meeting_title)
+                update_meeting_summary_json(summary["structured_data_json"], meeting_title, meeting)
                 
                 # Process meeting summary (this will create database if needed)
-                notion_result = process_meeting_summary(summary["structured_data_json"], meeting_title)
+                notion_result = process_meeting_summary(summary["structured_data_json"], meeting_title, meeting)
                 data["notionTasks"] = notion_result
                 logger.info("✅ Notion tasks processed")
             else:
@@ -109,95 +164,47 @@ def transcribe():
     except Exception as e:
         logger.error(f"Error in transcription: {str(e)}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        # Clean up the temporary file
-        if audio_path and os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-                logger.info(f"Cleaned up temporary file: {audio_path}")
-            except Exception as e:
-                logger.warning(f"Could not remove temporary file {audio_path}: {e}")
 
-def generate_summary(text):
+def generate_offline_summary(text):
+    """Local fallback when Gemini is not configured or fails, so tasks still reach Notion."""
+    structured_data_json = summarize_offline(text)
+    return {"structured_data": json.dumps(structured_data_json), "mode": "offline",
+            **summary_result(structured_data_json)}
+
+def generate_summary(text, budget=None):
+    if not os.getenv("GEMINI_API_KEY"):
+        logger.warning("GEMINI_API_KEY not set - using the offline summarizer")
+        return generate_offline_summary(text)
     try:
-        model = genai.GenerativeModel('models/gemini-1.5-flash')
-        
-        # First get the structured JSON for Notion
-        json_prompt = f"""
-Please analyze this meeting transcript and provide a structured summary in the following JSON format:
-
-Transcript:
-{text}
-
-Required format:
-{{
-    "summary": "A concise summary of the key points discussed",
-    "topics": ["topic1", "topic2", ...],
-    "action_items": [
-        {{
-            "task": "Description of the task",
-            "assignee": "Name of person assigned (if mentioned)",
-            "due": "YYYY-MM-DD (if mentioned, otherwise null)"
-        }},
-        ...
-    ],
-    "important_details": ["detail1", "detail2", ...]
-}}
-
-Rules:
-1. Extract clear action items with assignees when mentioned
-2. Convert any mentioned dates to YYYY-MM-DD format
-3. If no assignee is mentioned for a task, use null
-4. If no due date is mentioned for a task, use null
-5. Make sure the output is valid JSON
-6. Do NOT use markdown, do NOT use bullet points, ONLY output valid JSON as specified. Do not include any text before or after the JSON.
-
-Please provide the response in the exact JSON format specified above.
-"""
-        json_response = model.generate_content(json_prompt)
-        structured_data = json_response.text if hasattr(json_response, 'text') else str(json_response)
-
-        # Remove any code block markers (```json ... ```, or ``` ... ```) anywhere in the string
-        structured_data_clean = re.sub(r"```(?:json)?", "", structured_data, flags=re.IGNORECASE)
-        structured_data_clean = structured_data_clean.replace("```", "").strip()
-        print("Final cleaned Gemini output:", structured_data_clean)
+        # Shared rate-limited, retrying Gemini client (configured from GEMINI_* env vars);
+        # the model tier is routed by prompt size and the latency hint (LLM_MODEL_TIERS / LLM_ROUTING_*)
+        prompt = build_summary_prompt(text, extract_due_dates=True)
+        model, routing = get_router().model_for("summary", estimate_tokens(prompt), "meeting_summary_due:v2",
+                                                budget=budget)
+
+        # A single structured call; the Slack/markdown text is rendered locally from the JSON
+        response = model.generate_content(
+            prompt,
+            generation_config=JSON_GENERATION_CONFIG,
+            hedge=True,
+        )
+        structured_data = response.text if hasattr(response, 'text') else str(response)
+
         try:
-            structured_data_json = json.loads(structured_data_clean)
-        except json.JSONDecodeError as e:
-            print("Gemini did not return valid JSON. Raw output:")
-            print(structured_data)
-            structured_data_json = None
-
-        # Then get the formatted text for Slack
-        text_prompt = f"""
-Please analyze this meeting transcript and provide a detailed summary:
-
-Transcript:
-{text}
-
-Please provide:
-1. A concise summary of the key points discussed
-2. Main topics covered
-3. Any action items or decisions made
-4. Important details or numbers mentioned
-
-Format the response in a clear, structured way, using markdown for bold headings and bullet points where appropriate.
-"""
-        text_response = model.generate_content(text_prompt)
-        formatted_text = text_response.text if hasattr(text_response, 'text') else str(text_response)
-
-        return {
-            "structured_data": structured_data,
-            "structured_data_json": structured_data_json,
-            "formatted_text": formatted_text
-        }
+            structured_data_json = parse_summary_response(structured_data)
+        except (json.JSONDecodeError, ValueError):
+            logger.error(f"Gemini did not return valid JSON. Raw output: {structured_data}")
+            return {
+                "structured_data": structured_data,
+                "structured_data_json": None,
+                "formatted_text": "Error generating summary.",
+                "routing": routing,
+            }
+
+        return {"structured_data": structured_data, "routing": routing, **summary_result(structured_data_json)}
     except Exception as e:
-        logger.error(f"Error generating summary: {str(e)}")
-        return {
-            "structured_data": "Error generating summary.",
-            "structured_data_json": None,
-            "formatted_text": "Error generating summary."
-        }
+        logger.error(f"Error generating summary: {str(e)} - using the offline summarizer")
+        return {**generate_offline_summary(text), "llm_error": str(e)}
 
 def send_to_slack(data):
     try:
@@ -208,10 +215,11 @@ def send_to_slack(data):
         if not channel_id:
             return None
 
-        # Format message using the formatted text summary
+        # Render Slack mrkdwn from the structured summary (fall back to the stored text)
+        structured = data['summary'].get('structured_data_json')
         message = f"*Meeting Summary: {data['title']}*\n\n"
-        message += data['summary']['formatted_text']  # Use the formatted text version
-        message += f"\n\n*Full Transcript:*\n```{data['transcript']}```"
+        message += render_slack(structured) if structured else data['summary']['formatted_text']
+        message += f"\n\n*Full Transcript:*\n```{data.get('compacted_transcript') or data['transcript']}```"
 
         # Send to Slack
         response = slack_client.chat_postMessage(
@@ -225,12 +233,13 @@ def send_to_slack(data):
         logger.error(f"Error sending to Slack: {str(e)}")
         return None
 
-def update_meeting_summary_json(summary_data, meeting_title):
+def update_meeting_summary_json(summary_data, meeting_title, meeting=None):
     """Update the meeting_summary_input.json file with new meeting data"""
     try:
         # Create the task data structure
         task_data = {
             "github_link": os.getenv("GITHUB_REPO_URL", "https://github.com/sahelikundu22/for_testing"),
+            "meeting_key": meeting,
             "tasks": []
         }
         
@@ -238,9 +247,9 @@ def update_meeting_summary_json(summary_data, meeting_title):
         for item in summary_data.get("action_items", []):
             task = {
                 "task": item["task"],
-                "assignee": item["assignee"] if item["assignee"] else "Unassigned",
+                "assignee": item.get("assignee") or "Unassigned",
                 "status": "To Do",
-                "due": item["due"] if item["due"] else None,
+                "due": item.get("due"),
                 "github_link": os.getenv("GITHUB_REPO_URL")
             }
             task_data["tasks"].append(task)
@@ -258,4 +267,7 @@ def update_meeting_summary_json(summary_data, meeting_title):
         return None
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    engine.start()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    # The reloader would start a second engine in its child process
+    app.run(debug=True, use_reloader=False)
@@ -22,6 +22,13 @@ let micStream = null;
 let mixedStream = null;
 let audioContext = null;
 
+// Live streaming transcription state
+let liveSession = null;
+let liveEvents = null;
+let liveSegments = [];
+let chunkSeq = 0;
+let chunkUploads = Promise.resolve();
+
 // Dynamically detect Flask backend URL (tries 127.0.0.1 then localhost and caches)
 let FLASK_BACKEND_URL = null;
 
@@ -344,12 +351,19 @@ async function startRecording() {
     mediaRecorder.ondataavailable = event => {
       console.log("Data available:", event.data.size, "bytes");
       audioChunks.push(event.data);
+      if (liveSession && event.data.size > 0) {
+        sendLiveChunk(event.data);
+      }
     };
     
     mediaRecorder.onstop = () => {
       console.log("Recording stopped, processing audio...");
       const audioBlob = new Blob(audioChunks, { type: "audio/webm" });
-      uploadAudio(audioBlob);
+      if (liveSession) {
+        stopLiveSession(audioBlob);
+      } else {
+        uploadAudio(audioBlob);
+      }
       cleanupStreams();
     };
     
@@ -360,6 +374,9 @@ async function startRecording() {
       cleanupStreams();
     };
     
+    // Stream chunks to the backend while recording (falls back to one upload at the end)
+    liveSession = await startLiveSession(meetingTitleInput.value || "Untitled Meeting");
+    
     mediaRecorder.start(1000); // Collect data every second
     setRecordingUI(true);
     hideSummarySection();
@@ -380,25 +397,8 @@ function stopRecording() {
   if (mediaRecorder) {
     mediaRecorder.stop();
     setRecordingUI(false);
+    // Real progress arrives from the job's event stream (see followJob)
     showStatus("🔄 Processing audio...", "processing");
-    
-    // Add processing animation
-    const processingSteps = [
-      "🔄 Processing audio...",
-      "🎵 Analyzing audio content...",
-      "🤖 Generating AI summary...",
-      "✨ Finalizing results..."
-    ];
-    
-    let stepIndex = 0;
-    const stepInterval = setInterval(() => {
-      if (stepIndex < processingSteps.length) {
-        showStatus(processingSteps[stepIndex], "processing");
-        stepIndex++;
-      } else {
-        clearInterval(stepInterval);
-      }
-    }, 1000);
   }
 }
 
@@ -452,50 +452,185 @@ function uploadAudio(audioBlob) {
   formData.append("slackEnabled", "false"); // Default value since checkbox doesn't exist
   formData.append("notionEnabled", "false"); // Default value since checkbox doesn't exist
   
-  // Add upload progress animation
-  const uploadSteps = [
-    "📤 Uploading audio file...",
-    "🎵 Transcribing audio...",
-    "🤖 Analyzing content...",
-    "📝 Generating summary...",
-    "✨ Finalizing results..."
-  ];
-  
-  let currentStep = 0;
-  const stepInterval = setInterval(() => {
-    if (currentStep < uploadSteps.length) {
-      showStatus(uploadSteps[currentStep], "processing");
-      currentStep++;
-    }
-  }, 800);
-  
   (async () => {
     const base = await getBackendBase();
-    return fetch(`${base}/transcribe`, {
+    const response = await fetch(`${base}/transcribe`, {
       method: "POST",
       body: formData,
     });
+    const queued = await response.json();
+    if (!response.ok || !queued.job_id) {
+      throw new Error(queued.error || "Upload failed");
+    }
+    showStatus("⏳ Queued for processing...", "processing");
+    return followJob(base, queued.job_id, stage => {
+      showStatus(JOB_STAGE_LABELS[stage] || `🔄 ${stage}...`, "processing");
+    }, showStreamingSummary);
   })()
-    .then(response => response.json())
-    .then(data => {
-      clearInterval(stepInterval);
-      
-      if (data.summary && data.summary.formatted_text && !data.summary.formatted_text.startsWith("Error")) {
-        showSummarySection(data.summary.formatted_text);
-        showStatus("✅ Summary ready! Edit and post to Slack!", "success");
-        showToast("Summary generated successfully! ✨", "success");
-      } else {
-        showStatus("❌ Could not generate summary.", "error");
-        showToast("Could not generate summary.", "error");
-      }
-    })
+    .then(showJobResult)
     .catch(error => {
-      clearInterval(stepInterval);
+      console.error("Error processing audio:", error);
       showStatus("❌ Error processing audio.", "error");
       showToast("Error processing audio.", "error");
     });
 }
 
+function showJobResult(data) {
+  if (data.summary && data.summary.formatted_text && !data.summary.formatted_text.startsWith("Error")) {
+    showSummarySection(data.summary.formatted_text);
+    showStatus("✅ Summary ready! Edit and post to Slack!", "success");
+    showToast("Summary generated successfully! ✨", "success");
+  } else {
+    showStatus("❌ Could not generate summary.", "error");
+    showToast("Could not generate summary.", "error");
+  }
+}
+
+// --- Live streaming transcription ---
+async function startLiveSession(title) {
+  try {
+    const base = await getBackendBase();
+    const response = await fetch(`${base}/stream/start`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ meetingTitle: title })
+    });
+    if (!response.ok) return null;
+    const session = await response.json();
+    
+    liveSegments = [];
+    chunkSeq = 0;
+    chunkUploads = Promise.resolve();
+    liveEvents = new EventSource(`${base}${session.events_url}`);
+    liveEvents.addEventListener("segment", event => {
+      liveSegments.push(JSON.parse(event.data).text);
+      showLiveTranscript("");
+    });
+    liveEvents.addEventListener("partial", event => {
+      showLiveTranscript(JSON.parse(event.data).text);
+    });
+    return { base, ...session };
+  } catch (error) {
+    console.warn("Live transcription unavailable, recording will be uploaded at the end:", error);
+    return null;
+  }
+}
+
+function showLiveTranscript(partialText) {
+  summarySection.classList.remove("hidden");
+  summaryEdit.value = [...liveSegments, partialText].filter(Boolean).join(" ");
+  summaryEdit.scrollTop = summaryEdit.scrollHeight;
+}
+
+function sendLiveChunk(blob) {
+  const session = liveSession;
+  const seq = chunkSeq++;
+  // Chain uploads so chunks reach the server in order
+  chunkUploads = chunkUploads
+    .then(() => fetch(`${session.base}${session.chunk_url}`, {
+      method: "POST",
+      headers: { "X-Chunk-Seq": String(seq), "Content-Type": blob.type || "audio/webm" },
+      body: blob
+    }))
+    .catch(error => console.error("Live chunk upload failed:", error));
+}
+
+async function stopLiveSession(fallbackBlob) {
+  const session = liveSession;
+  liveSession = null;
+  try {
+    await chunkUploads;
+    showStatus("📝 Finalizing transcript...", "processing");
+    const response = await fetch(`${session.base}${session.stop_url}`, { method: "POST" });
+    const queued = await response.json();
+    if (!response.ok || !queued.job_id) {
+      throw new Error(queued.error || "Could not finalize live transcript");
+    }
+    const data = await followJob(session.base, queued.job_id, stage => {
+      showStatus(JOB_STAGE_LABELS[stage] || `🔄 ${stage}...`, "processing");
+    }, showStreamingSummary);
+    showJobResult(data);
+  } catch (error) {
+    console.error("Live session failed, uploading full recording instead:", error);
+    uploadAudio(fallbackBlob);
+  } finally {
+    if (liveEvents) {
+      liveEvents.close();
+      liveEvents = null;
+    }
+  }
+}
+
+// --- Background job polling ---
+const JOB_STAGE_LABELS = {
+  queued: "⏳ Queued for processing...",
+  starting: "🔄 Processing audio...",
+  transcribe: "🎵 Transcribing audio...",
+  summarize: "🤖 Generating AI summary...",
+  slack: "📤 Posting to Slack...",
+  notion: "📝 Syncing tasks to Notion..."
+};
+
+// Follow a job over Server-Sent Events: stage changes, the summary text as Gemini writes it,
+// then the result. Falls back to polling if the event stream cannot be opened.
+function followJob(base, jobId, onStage, onSummary) {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(`${base}/jobs/${jobId}/events`);
+    let settled = false;
+    const settle = (callback, value) => {
+      settled = true;
+      events.close();
+      callback(value);
+    };
+    events.addEventListener("stage", event => {
+      const data = JSON.parse(event.data);
+      if (data.status === "running") onStage(data.stage);
+    });
+    let streaming = false;
+    // The local provisional summary shows instantly; Gemini's streamed text replaces it
+    events.addEventListener("provisional", event => {
+      if (!streaming) onSummary(JSON.parse(event.data).summary.formatted_text);
+    });
+    events.addEventListener("summary", event => {
+      streaming = true;
+      onSummary(JSON.parse(event.data).text);
+    });
+    events.addEventListener("done", event => settle(resolve, JSON.parse(event.data).result));
+    events.addEventListener("failed", event => {
+      settle(reject, new Error(JSON.parse(event.data).error || "Job failed"));
+    });
+    events.onerror = () => {
+      if (settled) return;
+      settle(() => waitForJob(base, jobId, onStage).then(resolve, reject));
+    };
+  });
+}
+
+function showStreamingSummary(text) {
+  if (!text) return;
+  summarySection.classList.remove("hidden");
+  summaryEdit.value = text;
+  summaryEdit.scrollTop = summaryEdit.scrollHeight;
+}
+
+async function waitForJob(base, jobId, onStage, intervalMs = 1500) {
+  let lastStage = null;
+  while (true) {
+    const response = await fetch(`${base}/jobs/${jobId}`);
+    const job = await response.json();
+    if (!response.ok) {
+      throw new Error(job.error || "Could not fetch job status");
+    }
+    if (job.status === "succeeded") return job.result;
+    if (job.status === "failed") throw new Error(job.error || "Job failed");
+    if (job.stage !== lastStage) {
+      lastStage = job.stage;
+      onStage(job.stage);
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+}
+
 // --- Enhanced Post to Slack ---
 if (postToSlackBtn) {
   postToSlackBtn.addEventListener("click", () => {
@@ -19,6 +19,13 @@ const checkCommitsBtn = document.getElementById("checkCommits");
 const sendStandupBtn = document.getElementById("sendStandup");
 const initDbBtn = document.getElementById("initDb");
 
+// Live streaming transcription state
+let liveSession = null;
+let liveEvents = null;
+let liveSegments = [];
+let chunkSeq = 0;
+let chunkUploads = Promise.resolve();
+
 // Dynamically detect Flask backend URL (tries 127.0.0.1 then localhost)
 let FLASK_BACKEND_URL = null;
 
@@ -169,15 +176,24 @@ async function startRecording() {
         
         mediaRecorder.ondataavailable = event => {
             audioChunks.push(event.data);
+            if (liveSession && event.data.size > 0) {
+                sendLiveChunk(event.data);
+            }
         };
         
         mediaRecorder.onstop = () => {
-            const audioBlob = new Blob(audioChunks, { type: "audio/wav" });
-            uploadAudio(audioBlob);
+            const audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType || "audio/webm" });
+            if (liveSession) {
+                stopLiveSession(audioBlob);
+            } else {
+                uploadAudio(audioBlob);
+            }
             stream.getTracks().forEach(track => track.stop());
         };
         
-        mediaRecorder.start();
+        // Stream timesliced chunks while recording (falls back to one upload at the end)
+        liveSession = await startLiveSession(meetingTitleInput.value || "Untitled Meeting");
+        mediaRecorder.start(1000);
         setRecordingUI(true);
         hideSummarySection();
     } catch (error) {
@@ -215,28 +231,161 @@ function uploadAudio(audioBlob) {
     
     (async () => {
         const base = await getBackendBase();
-        return fetch(`${base}/transcribe`, {
+        const response = await fetch(`${base}/transcribe`, {
             method: "POST",
             body: formData,
         });
-    })()
-    .then(response => response.json())
-    .then(data => {
-        if (data.summary && data.summary.formatted_text && !data.summary.formatted_text.startsWith("Error")) {
-            showSummarySection(data.summary.formatted_text);
-            showStatus("Summary ready. Edit and post to Slack!", "success");
-            showToast("Summary generated!", "success");
-        } else {
-            showStatus("Could not generate summary.", "error");
-            showToast("Could not generate summary.", "error");
+        const queued = await response.json();
+        if (!response.ok || !queued.job_id) {
+            throw new Error(queued.error || "Upload failed");
         }
-    })
+        return followJob(base, queued.job_id, stage => {
+            showStatus(`Processing audio… (${stage})`);
+        }, showStreamingSummary);
+    })()
+    .then(showJobResult)
     .catch(error => {
         showStatus("Error processing audio.", "error");
         showToast("Error processing audio.", "error");
     });
 }
 
+function showJobResult(data) {
+    if (data.summary && data.summary.formatted_text && !data.summary.formatted_text.startsWith("Error")) {
+        showSummarySection(data.summary.formatted_text);
+        showStatus("Summary ready. Edit and post to Slack!", "success");
+        showToast("Summary generated!", "success");
+    } else {
+        showStatus("Could not generate summary.", "error");
+        showToast("Could not generate summary.", "error");
+    }
+}
+
+// --- Live streaming transcription ---
+async function startLiveSession(title) {
+    try {
+        const base = await getBackendBase();
+        const response = await fetch(`${base}/stream/start`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ meetingTitle: title })
+        });
+        if (!response.ok) return null;
+        const session = await response.json();
+
+        liveSegments = [];
+        chunkSeq = 0;
+        chunkUploads = Promise.resolve();
+        liveEvents = new EventSource(`${base}${session.events_url}`);
+        liveEvents.addEventListener("segment", event => {
+            liveSegments.push(JSON.parse(event.data).text);
+            showSummarySection(liveSegments.join(" "));
+        });
+        liveEvents.addEventListener("partial", event => {
+            showSummarySection([...liveSegments, JSON.parse(event.data).text].filter(Boolean).join(" "));
+        });
+        return { base, ...session };
+    } catch (error) {
+        return null;
+    }
+}
+
+function sendLiveChunk(blob) {
+    const session = liveSession;
+    const seq = chunkSeq++;
+    // Chain uploads so chunks reach the server in order
+    chunkUploads = chunkUploads
+        .then(() => fetch(`${session.base}${session.chunk_url}`, {
+            method: "POST",
+            headers: { "X-Chunk-Seq": String(seq), "Content-Type": blob.type || "audio/webm" },
+            body: blob
+        }))
+        .catch(error => console.error("Live chunk upload failed:", error));
+}
+
+async function stopLiveSession(fallbackBlob) {
+    const session = liveSession;
+    liveSession = null;
+    try {
+        await chunkUploads;
+        showStatus("Finalizing transcript…");
+        const response = await fetch(`${session.base}${session.stop_url}`, { method: "POST" });
+        const queued = await response.json();
+        if (!response.ok || !queued.job_id) {
+            throw new Error(queued.error || "Could not finalize live transcript");
+        }
+        const data = await followJob(session.base, queued.job_id, stage => {
+            showStatus(`Processing audio… (${stage})`);
+        }, showStreamingSummary);
+        showJobResult(data);
+    } catch (error) {
+        uploadAudio(fallbackBlob);
+    } finally {
+        if (liveEvents) {
+            liveEvents.close();
+            liveEvents = null;
+        }
+    }
+}
+
+// Follow a job over Server-Sent Events: stage changes, the summary text as Gemini writes it,
+// then the result. Falls back to polling if the event stream cannot be opened.
+function followJob(base, jobId, onStage, onSummary) {
+    return new Promise((resolve, reject) => {
+        const events = new EventSource(`${base}/jobs/${jobId}/events`);
+        let settled = false;
+        const settle = (callback, value) => {
+            settled = true;
+            events.close();
+            callback(value);
+        };
+        events.addEventListener("stage", event => {
+            const data = JSON.parse(event.data);
+            if (data.status === "running") onStage(data.stage);
+        });
+        let streaming = false;
+        // The local provisional summary shows instantly; Gemini's streamed text replaces it
+        events.addEventListener("provisional", event => {
+            if (!streaming) onSummary(JSON.parse(event.data).summary.formatted_text);
+        });
+        events.addEventListener("summary", event => {
+            streaming = true;
+            onSummary(JSON.parse(event.data).text);
+        });
+        events.addEventListener("done", event => settle(resolve, JSON.parse(event.data).result));
+        events.addEventListener("failed", event => {
+            settle(reject, new Error(JSON.parse(event.data).error || "Job failed"));
+        });
+        events.onerror = () => {
+            if (settled) return;
+            settle(() => waitForJob(base, jobId, onStage).then(resolve, reject));
+        };
+    });
+}
+
+function showStreamingSummary(text) {
+    if (text) showSummarySection(text);
+}
+
+// Poll a background transcription job until it finishes and return its result
+async function waitForJob(base, jobId, onStage, intervalMs = 1500) {
+    let lastStage = null;
+    while (true) {
+        const response = await fetch(`${base}/jobs/${jobId}`);
+        const job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.error || "Could not fetch job status");
+        }
+        if (job.status === "succeeded") return job.result;
+        if (job.status === "failed") throw new Error(job.error || "Job failed");
+        if (job.stage !== lastStage) {
+            lastStage = job.stage;
+            onStage(job.stage);
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 // --- Post to Slack ---
 postToSlackBtn.addEventListener("click", () => {
     const summary = summaryEdit.value;
@@ -272,11 +272,15 @@ class MeetingDashboard {
                 body: formData,
             });
             
-            const data = await response.json();
+            const queued = await response.json();
+            if (!response.ok || !queued.job_id) {
+                throw new Error(queued.error || 'Upload failed');
+            }
+            const data = await this.followJob(base, queued.job_id);
             
             if (data.summary && data.summary.formatted_text) {
                 this.showNotification('Meeting processed successfully!', 'success');
-                // Add final summary to transcription
+                // Replace the streamed preview with the final summary
                 this.addSummaryToTranscription(data.summary.formatted_text);
             }
             
@@ -286,8 +290,63 @@ class MeetingDashboard {
         }
     }
 
+    // Stream stage changes and the summary text over SSE; poll if the stream cannot be opened
+    followJob(base, jobId) {
+        return new Promise((resolve, reject) => {
+            const events = new EventSource(`${base}/jobs/${jobId}/events`);
+            let settled = false;
+            const settle = (callback, value) => {
+                settled = true;
+                events.close();
+                callback(value);
+            };
+            events.addEventListener('stage', event => {
+                const data = JSON.parse(event.data);
+                if (data.status === 'running') {
+                    this.meetingStatus.textContent = `Processing audio... (${data.stage})`;
+                }
+            });
+            let streaming = false;
+            // The local provisional summary shows instantly; Gemini's streamed text replaces it
+            events.addEventListener('provisional', event => {
+                if (!streaming) this.addSummaryToTranscription(JSON.parse(event.data).summary.formatted_text);
+            });
+            events.addEventListener('summary', event => {
+                streaming = true;
+                this.addSummaryToTranscription(JSON.parse(event.data).text);
+            });
+            events.addEventListener('done', event => settle(resolve, JSON.parse(event.data).result));
+            events.addEventListener('failed', event => {
+                settle(reject, new Error(JSON.parse(event.data).error || 'Job failed'));
+            });
+            events.onerror = () => {
+                if (settled) return;
+                settle(() => this.waitForJob(base, jobId).then(resolve, reject));
+            };
+        });
+    }
+
+    async waitForJob(base, jobId, intervalMs = 1500) {
+        while (true) {
+            const response = await fetch(`${base}/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error || 'Could not fetch job status');
+            }
+            if (job.status === 'succeeded') return job.result;
+            if (job.status === 'failed') throw new Error(job.error || 'Job failed');
+            this.meetingStatus.textContent = `Processing audio... (${job.stage})`;
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
     addSummaryToTranscription(summary) {
-        const summaryDiv = document.createElement('div');
+        // Streamed updates and the final summary reuse the same block
+        let summaryDiv = this.transcriptionContent.querySelector('.ai-summary');
+        if (!summaryDiv) {
+            summaryDiv = document.createElement('div');
+            summaryDiv.className = 'ai-summary';
+        }
         summaryDiv.style.cssText = `
             background: rgba(102, 126, 234, 0.2);
             border: 1px solid #667eea;